@@ -0,0 +1,385 @@
+'''Benchmarks for the visualisation pipeline, run as
+python benchmark.py <name> [n]'''
+import gc
+import os
+import sys
+import time
+import tempfile
+import pickle
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from constants import BAR_TECH_COLOR_DICT
+from data import format_stacked_bar_pwr
+from figures import clear_templates
+from delta import split_delta, split_delta_total
+from read import (
+    POWER_FILTER,
+    _read_csv_with_schema,
+    _schema_for,
+    stream_filtered
+    )
+from utils import format_technology_col
+from chunked import OUT_OF_CORE, chunk_rows, technology_totals
+from shared import SharedTable, SharedTableRegistry, release_attached
+
+def rss_mb():
+    '''Resident set size of this process in MB. Uses psutil if installed,
+    otherwise /proc (Linux) or the peak RSS from resource.'''
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1e6
+
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except OSError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        return rss / 1e6 if sys.platform == 'darwin' else rss / 1e3
+
+def scenario_capacity(seed, countries = ('IDN', 'MYS', 'THA', 'VNM')):
+    '''Synthetic capacity table in the format of ResultSet.capacity.'''
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_product([list(BAR_TECH_COLOR_DICT), countries,
+                                        range(2025, 2051)],
+                                       names = ['TECH', 'COUNTRY', 'YEAR'])
+
+    return pd.DataFrame({'VALUE' : rng.random(len(index)) * 10},
+                        index = index).reset_index()
+
+def bench_figures(n = 100):
+    '''Render one capacity chart per scenario for n scenarios and report RSS
+    after every figure, sampled as is and after gc.collect(). The figures 
+    are freed when the formatter returns but are cyclic garbage until the 
+    collector runs, so only the collected samples show what a figure keeps.
+    Both stay flat after the first few figures (fonts and caches warm up).'''
+    results = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        for collect in [False, True]:
+            clear_templates()
+            gc.collect()
+            rss = []
+            start = time.perf_counter()
+            for i in range(n):
+                format_stacked_bar_pwr(scenario_capacity(i), out_dir, 'New capacity',
+                                       'Technology', f'scenario_{i}',
+                                       BAR_TECH_COLOR_DICT, 'GW', None)
+                if collect:
+                    gc.collect()
+                rss.append(rss_mb())
+            results['with gc' if collect else 'without gc'] = (time.perf_counter() - start,
+                                                               rss)
+
+    print(f'{n} figures')
+    for mode, (seconds, rss) in results.items():
+        warm = rss[min(10, n - 1)]
+        print(f'{mode:<10} {seconds / n * 1000:5.0f} ms per figure, RSS first '
+              f'{rss[0]:.1f} MB, after warm-up {warm:.1f} MB, last {rss[-1]:.1f} MB, '
+              f'max {max(rss):.1f} MB, growth after warm-up '
+              f'{(rss[-1] - warm) / max(n - 11, 1) * 1000:.1f} kB per figure')
+
+    return {mode : rss for mode, (seconds, rss) in results.items()}
+
+def bench_templates(n = 50):
+    '''Per-figure latency of format_stacked_bar_pwr for n scenarios, with the
+    figure built from scratch for every scenario (the template is dropped
+    before each call) and with the template reused (only the bars are
+    updated). Both include saving the figure.'''
+    frames = [scenario_capacity(i) for i in range(n)]
+    timings = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        for mode in ['rebuild', 'template']:
+            clear_templates()
+            seconds = []
+            for i, df in enumerate(frames):
+                if mode == 'rebuild':
+                    clear_templates()
+
+                start = time.perf_counter()
+                format_stacked_bar_pwr(df, out_dir, 'New capacity', 'Technology',
+                                       f'{mode}_{i}', BAR_TECH_COLOR_DICT, 'GW', None)
+                seconds.append(time.perf_counter() - start)
+
+            # The first figure is built in both modes.
+            timings[mode] = np.array(seconds[1:]) * 1000
+
+    for mode, ms in timings.items():
+        print(f'{mode:<9} median {np.median(ms):6.1f} ms, mean {ms.mean():6.1f} ms '
+              f'per figure')
+    print(f'Speed-up: {np.median(timings["rebuild"]) / np.median(timings["template"]):.2f}x')
+
+    return timings
+
+def node_delta(nodes = 100, years = range(2023, 2051), techs = 20, seed = 0):
+    '''Synthetic NODE x TECH x YEAR delta in the format of
+    calculate_results_delta, with about a third of the cells missing.'''
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_product([[f'N{i:04d}' for i in range(nodes)],
+                                        [f'T{i:02d}' for i in range(techs)],
+                                        years],
+                                       names = ['NODE', 'TECH', 'YEAR'])
+    df = pd.DataFrame({'DELTA' : rng.normal(size = len(index)).round(2)},
+                      index = index)
+
+    return df.loc[(df['DELTA'] != 0) & (rng.random(len(df)) > 0.3)]
+
+def _split_delta_loops(df_in1, df_in2, years, spatial):
+    '''The per-entry preparation of format_stacked_bar_pwr_delta_spatial
+    before delta.py: boolean filters, a groupby per entry and missing years
+    and technologies added row by row.'''
+    frames = {}
+    for entry in df_in1.index.get_level_values(spatial).unique():
+        df1 = df_in1.loc[(df_in1['DELTA'] < 0) & 
+                         (df_in1.index.get_level_values(spatial) == entry)]
+        df2 = df_in1.loc[(df_in1['DELTA'] > 0) & 
+                         (df_in1.index.get_level_values(spatial) == entry)]
+
+        df1 = df1.groupby(['YEAR', 'TECH'], observed = True)['DELTA'].sum().unstack().fillna(0)
+        df2 = df2.groupby(['YEAR', 'TECH'], observed = True)['DELTA'].sum().unstack().fillna(0)
+
+        for idx in years:
+            if not df1.empty and idx not in df1.index:
+                df1.loc[idx] = 0
+            if not df2.empty and idx not in df2.index:
+                df2.loc[idx] = 0
+
+        df3 = df_in2.loc[(df_in2['DELTA'] < 0) & 
+                         (df_in2.index.get_level_values(spatial) == entry)]
+        df4 = df_in2.loc[(df_in2['DELTA'] > 0) & 
+                         (df_in2.index.get_level_values(spatial) == entry)]
+
+        df3 = df3.groupby(['TECH'], observed = True)['DELTA'].sum()
+        df4 = df4.groupby(['TECH'], observed = True)['DELTA'].sum()
+
+        for idx in df_in2.index.get_level_values('TECH'):
+            if idx not in df3.index:
+                df3.loc[idx] = 0
+            if idx not in df4.index:
+                df4.loc[idx] = 0
+
+        frames[entry] = (df1.sort_index(), df2.sort_index(),
+                         pd.DataFrame(df3.sort_index()).transpose(),
+                         pd.DataFrame(df4.sort_index()).transpose())
+
+    return frames
+
+def bench_delta(n = 5, nodes = 100):
+    '''Preparation of the frames of a NODE delta chart (nodes x 28 years x
+    20 technologies) with the per-entry loops and with delta.py, best of n.'''
+    years = range(2023, 2051)
+    df_in1 = node_delta(nodes, years)
+    df_in2 = df_in1.groupby(['NODE', 'TECH'], observed = True)[['DELTA']].sum()
+
+    def grid():
+        return (split_delta(df_in1, index_values = years, spatial = 'NODE'),
+                split_delta_total(df_in2, spatial = 'NODE'))
+
+    timings = {}
+    for mode, func in [('loops', lambda: _split_delta_loops(df_in1, df_in2, years, 'NODE')),
+                       ('grid', grid)]:
+        seconds = []
+        for _ in range(n):
+            start = time.perf_counter()
+            func()
+            seconds.append(time.perf_counter() - start)
+        timings[mode] = min(seconds) * 1000
+
+    print(f'{len(df_in1)} rows, {nodes} nodes x {len(years)} years x 20 technologies')
+    for mode, ms in timings.items():
+        print(f'{mode:<6} {ms:8.1f} ms')
+    print(f'Speed-up: {timings["loops"] / timings["grid"]:.1f}x')
+
+    return timings
+
+def activity_csv(path, rows, seed = 0):
+    '''Synthetic TotalTechnologyAnnualActivity.csv with rows rows, a third 
+    of them power technologies and the rest MIN, RNW, ELC and TRN codes as 
+    in the global model.'''
+    rng = np.random.default_rng(seed)
+    countries = [f'C{i:02d}' for i in range(60)]
+    codes = [f'PWR{tech}{country}XX01' for tech in list(BAR_TECH_COLOR_DICT)[:10]
+             for country in countries]
+    codes += [f'{sector}{tech}{country}' for sector in ('MIN', 'RNW', 'ELC')
+              for tech in ('COA', 'GAS', 'OIL', 'BIO') for country in countries]
+    codes += [f'TRN{a}XX{b}XX' for a in countries[:40] for b in countries[:10]]
+    weights = np.where(pd.Index(codes).str.startswith('PWR'), 1 / 600, 2 / 1120)
+
+    pd.DataFrame({'REGION' : 'GLOBAL',
+                  'TECHNOLOGY' : rng.choice(codes, rows, p = weights / weights.sum()),
+                  'YEAR' : rng.integers(2021, 2071, rows),
+                  'VALUE' : rng.random(rows).round(3)}).to_csv(path, index = False)
+
+def bench_stream(rows = 2000000):
+    '''Read a synthetic activity table of rows rows and sum its power 
+    technologies by TECH, COUNTRY and YEAR (as ResultSet.generation), by 
+    parsing the whole file and by filtering while parsing (stream_filtered, 
+    years 2023-2050). Reports time and peak traced memory.'''
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'TotalTechnologyAnnualActivity.csv')
+        activity_csv(path, rows)
+        years = (2023, 2050)
+
+        def full():
+            df = _read_csv_with_schema(path, _schema_for(path))
+            return format_technology_col(df.loc[df['YEAR'].between(*years)], 
+                                         node = False)
+
+        def stream():
+            df = stream_filtered(path, POWER_FILTER['prefixes'], 
+                                 POWER_FILTER['exclude'], years = years, 
+                                 columns = POWER_FILTER['columns'],
+                                 chunksize = POWER_FILTER['chunksize'])
+            return format_technology_col(df, node = False)
+
+        results = {}
+        for mode, func in [('full', full), ('stream', stream)]:
+            tracemalloc.start()
+            start = time.perf_counter()
+            df = func()
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+            results[mode] = (seconds, peak, df)
+
+    pd.testing.assert_frame_equal(results['full'][2], results['stream'][2],
+                                  check_categorical = False)
+
+    print(f'{rows} rows, chunks of {POWER_FILTER["chunksize"]}')
+    for mode, (seconds, peak, df) in results.items():
+        print(f'{mode:<6} {seconds:6.2f} s {peak:8.1f} MB peak')
+
+    return {mode : result[:2] for mode, result in results.items()}
+
+def bench_outofcore(rows = 2000000, max_mb = 64):
+    '''Sum the power technologies of a synthetic activity table of rows rows 
+    by TECH, NODE and YEAR from the whole table and out-of-core under a 
+    ceiling of max_mb (technology_totals). Reports time and peak traced 
+    memory.'''
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'TotalTechnologyAnnualActivity.csv')
+        activity_csv(path, rows)
+
+        settings = OUT_OF_CORE.copy()
+        OUT_OF_CORE.update(max_mb = max_mb, chunksize = None)
+        chunksize = chunk_rows(path)
+
+        results = {}
+        try:
+            for mode, func in [('full', lambda: format_technology_col(
+                                   _read_csv_with_schema(path, _schema_for(path)), 
+                                   node = True)),
+                               ('chunked', lambda: technology_totals(path, node = True))]:
+                tracemalloc.start()
+                start = time.perf_counter()
+                df = func()
+                seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+                results[mode] = (seconds, peak, df)
+        finally:
+            OUT_OF_CORE.update(settings)
+
+    pd.testing.assert_frame_equal(results['full'][2], results['chunked'][2],
+                                  check_categorical = False)
+
+    print(f'{rows} rows, {max_mb} MB ceiling, chunks of {chunksize}, '
+          f'{len(results["full"][2])} groups')
+    for mode, (seconds, peak, df) in results.items():
+        print(f'{mode:<7} {seconds:6.2f} s {peak:8.1f} MB peak')
+
+    return {mode : result[:2] for mode, result in results.items()}
+
+def _value_sum(df):
+    return sum(float(df[col].sum()) for col in df.columns if col.startswith('VALUE'))
+
+def _receive(payload):
+    '''Worker side of bench_shared: unpickle the payload, attaching to the
+    shared frame if it holds a SharedTable, then read every VALUE. Returns
+    the seconds of each and the sum read.'''
+    start = time.perf_counter()
+    df = pickle.loads(payload)
+    if isinstance(df, SharedTable):
+        df = df.frame()
+    middle = time.perf_counter()
+    total = _value_sum(df)
+    end = time.perf_counter()
+
+    del df
+    release_attached()
+
+    return middle - start, end - middle, total
+
+def bench_shared(mb = 1024):
+    '''Pass a table of about mb MB (TECHNOLOGY, YEAR and six VALUE columns) 
+    to a worker process as a pickled copy and as a SharedTable. Times the 
+    parent side (pickle, or copy into shared memory), the worker side in the 
+    worker (unpickle or attach, then a first read of the values, which 
+    faults in the shared pages) and the round trip seen by the parent, 
+    which includes sending the payload.'''
+    rows = mb * 1024 ** 2 // 52
+    rng = np.random.default_rng(0)
+    codes = [f'PWR{tech}C{i:02d}XX01' for tech in list(BAR_TECH_COLOR_DICT)[:10]
+             for i in range(60)]
+    df = pd.DataFrame({'TECHNOLOGY' : pd.Categorical.from_codes(
+                           rng.integers(0, len(codes), rows, dtype = np.int16), codes),
+                       'YEAR' : rng.integers(2021, 2071, rows, dtype = np.int16)})
+    for i in range(6):
+        df[f'VALUE{i}'] = rng.random(rows)
+    size = df.memory_usage(index = True).sum() / 1024 ** 2
+    expected = _value_sum(df)
+
+    timings = {}
+    with SharedTableRegistry() as registry:
+        for mode, share in [('pickle', lambda: df), ('shared', lambda: registry.share(df))]:
+            start = time.perf_counter()
+            payload = pickle.dumps(share(), protocol = pickle.HIGHEST_PROTOCOL)
+            parent = time.perf_counter() - start
+
+            # A worker started after the segment is created, as in the
+            # renderer, and before timing.
+            with ProcessPoolExecutor(max_workers = 1) as executor:
+                executor.submit(_receive, pickle.dumps(df.head())).result()
+
+                start = time.perf_counter()
+                load, read, total = executor.submit(_receive, payload).result()
+                timings[mode] = (parent, load, read, time.perf_counter() - start,
+                                 len(payload))
+            del payload
+
+            assert np.isclose(total, expected), f'{mode}: {total} != {expected}'
+
+    print(f'{rows} rows, {size:.0f} MB')
+    print(f'{"mode":<7} {"parent":>9} {"load":>9} {"read":>9} {"round trip":>11} '
+          f'{"payload":>12}')
+    for mode, (parent, load, read, trip, nbytes) in timings.items():
+        print(f'{mode:<7} {parent * 1000:7.1f}ms {load * 1000:7.1f}ms '
+              f'{read * 1000:7.1f}ms {trip * 1000:9.1f}ms {nbytes:>10} B')
+
+    return timings
+
+BENCHMARKS = {
+    'figures' : bench_figures,
+    'templates' : bench_templates,
+    'delta' : bench_delta,
+    'stream' : bench_stream,
+    'outofcore' : bench_outofcore,
+    'shared' : bench_shared,
+    }
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        sys.exit(f'Usage: python benchmark.py [{"|".join(BENCHMARKS)}] [n]')
+
+    BENCHMARKS[sys.argv[1]](*[int(arg) for arg in sys.argv[2:]])
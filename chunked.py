@@ -0,0 +1,215 @@
+'''Out-of-core aggregation of large result files: the sums of
+format_technology_col and format_annual_emissions computed over chunks of
+the CSV, with the partial sums kept in an accumulator keyed by integer
+codes'''
+import numpy as np
+import pandas as pd
+
+from read import (
+    POWER_FILTER,
+    SchemaError,
+    _filter_mask,
+    _schema_for
+    )
+
+'''Out-of-core mode, off by default. max_mb is the ceiling on the memory of
+parsing a chunk, the accumulated sums and the temporaries of adding a chunk
+to them. chunksize, the rows parsed at a time, is derived from max_mb and
+the line length of the file unless set.'''
+OUT_OF_CORE = {'enabled' : False, 'max_mb' : 512, 'chunksize' : None}
+
+'''Share of max_mb a chunk may take while it is parsed, and the memory of
+parsing a row as a multiple of its line length (the text buffer, the
+tokenized fields and the parsed columns, measured at about 1.5 for the
+result files).'''
+CHUNK_SHARE = 0.25
+PARSE_FACTOR = 4
+
+'''Memory of the temporaries of CodeAccumulator.add per row, accumulated or
+added: the concatenated keys and sums, and the sort order, sorted keys,
+group flags and inverse of np.unique.'''
+TEMPORARY_BYTES = 48
+
+def set_out_of_core(enabled, max_mb = None, chunksize = None):
+    OUT_OF_CORE['enabled'] = enabled
+    if max_mb is not None:
+        OUT_OF_CORE['max_mb'] = max_mb
+    if chunksize is not None:
+        OUT_OF_CORE['chunksize'] = chunksize
+
+def out_of_core_enabled():
+    return OUT_OF_CORE['enabled']
+
+class MemoryLimitError(MemoryError):
+    pass
+
+def _factorized(series):
+    '''(codes, labels) of a column, through the category codes if it is a
+    categorical.'''
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+
+    return pd.factorize(series)
+
+class CodeAccumulator:
+    '''Sums of VALUE by keys (e.g. TECH, COUNTRY and YEAR), added chunk by
+    chunk. Every key label is given an integer code the first time it is
+    seen, the codes of a row are packed into a single int64 and the sums
+    are kept as two arrays, the sorted packed keys and their sums (16 bytes
+    per group).
+
+    Adding a chunk that would take the chunk, the sums and the temporaries
+    of adding it over max_mb raises a MemoryLimitError.'''
+
+    def __init__(self, keys : list, max_mb = 512):
+        self.keys = list(keys)
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.bits = 63 // len(self.keys)
+        self._codes = [{} for _ in self.keys]
+        self._dtypes = [None] * len(self.keys)
+        self._packed = np.empty(0, dtype = np.int64)
+        self._sums = np.empty(0, dtype = float)
+
+    @property
+    def nbytes(self):
+        return self._packed.nbytes + self._sums.nbytes
+
+    def _check(self, rows, nbytes):
+        # Peak of add: the sums, the chunk and the temporaries over the
+        # accumulated and added rows.
+        needed = (self.nbytes + nbytes +
+                  TEMPORARY_BYTES * (len(self._packed) + rows))
+        if needed > self.max_bytes:
+            raise MemoryLimitError(
+                f'Aggregating by {self.keys} needs {needed / 1024 ** 2:.2f} MB, '
+                f'over the ceiling of {self.max_bytes / 1024 ** 2:.2f} MB')
+
+    def _encode(self, i, codes, labels):
+        # Codes of the labels found in this chunk, broadcast to its rows.
+        known = self._codes[i]
+        lookup = np.full(len(labels) + 1, -1, dtype = np.int64)
+        for j in np.flatnonzero(np.bincount(codes[codes >= 0], minlength = len(labels))):
+            lookup[j] = known.setdefault(labels[j], len(known))
+
+        if len(known) >= 2 ** self.bits:
+            raise MemoryLimitError(f'More than {2 ** self.bits} values of {self.keys[i]}')
+
+        if self._dtypes[i] is None:
+            self._dtypes[i] = np.asarray(labels).dtype
+
+        return lookup[codes]
+
+    def add(self, keys : list, values, nbytes = 0):
+        '''Add the values of a chunk, with keys a (codes, labels) pair per
+        key (see _factorized) and nbytes the memory of the chunk. Rows with
+        a missing key (code -1) are dropped, as by groupby.'''
+        self._check(len(values), nbytes)
+
+        encoded = [self._encode(i, codes, labels) for i, (codes, labels) in enumerate(keys)]
+        values = np.asarray(values, dtype = float)
+        valid = np.logical_and.reduce([codes >= 0 for codes in encoded])
+        if not valid.all():
+            encoded = [codes[valid] for codes in encoded]
+            values = values[valid]
+
+        packed = np.zeros(len(values), dtype = np.int64)
+        for i, codes in enumerate(encoded):
+            packed |= codes << (self.bits * i)
+
+        packed = np.concatenate([self._packed, packed])
+        sums = np.concatenate([self._sums, values])
+        self._packed, inverse = np.unique(packed, return_inverse = True)
+        self._sums = np.bincount(inverse, weights = sums,
+                                 minlength = len(self._packed))
+
+    def frame(self, categorical = True):
+        '''The sums as a frame with a column per key and VALUE, sorted by the
+        keys as a groupby would. Keys with string labels are categoricals
+        unless categorical is False.'''
+        columns, ranks = {}, []
+        mask = 2 ** self.bits - 1
+        for i, key in enumerate(self.keys):
+            labels = np.array(list(self._codes[i]), dtype = self._dtypes[i])
+            order = np.argsort(labels, kind = 'stable')
+            rank = np.empty(len(labels), dtype = np.int64)
+            rank[order] = np.arange(len(labels))
+
+            codes = (self._packed >> (self.bits * i)) & mask
+            ranks.append(rank[codes])
+            if categorical and labels.dtype == object:
+                columns[key] = pd.Categorical.from_codes(rank[codes], labels[order])
+            else:
+                columns[key] = labels[codes]
+
+        df = pd.DataFrame(columns)
+        df['VALUE'] = self._sums
+        order = np.lexsort(ranks[::-1]) if ranks else []
+
+        return df.iloc[order].reset_index(drop = True)
+
+def chunk_rows(file_path):
+    '''Rows of file_path parsed at a time: OUT_OF_CORE['chunksize'] if set,
+    otherwise as many as fit in CHUNK_SHARE of max_mb while parsing, from
+    the mean length of the first lines.'''
+    if OUT_OF_CORE['chunksize'] is not None:
+        return OUT_OF_CORE['chunksize']
+
+    with open(file_path, 'rb') as f:
+        sample = f.read(2 ** 16)
+    line_bytes = len(sample) / max(sample.count(b'\n'), 1)
+
+    return max(int(OUT_OF_CORE['max_mb'] * 1024 ** 2 * CHUNK_SHARE /
+                   (line_bytes * PARSE_FACTOR)), 1000)
+
+def _chunks(file_path, columns : list):
+    schema = _schema_for(file_path)
+    chunksize = chunk_rows(file_path)
+    try:
+        yield from pd.read_csv(file_path, usecols = columns,
+                               dtype = {col : schema[col] for col in columns},
+                               chunksize = chunksize)
+    except (ValueError, TypeError) as e:
+        raise SchemaError(f'{file_path} does not match the registered schema '
+                          f'{schema}: {e}') from e
+
+def technology_totals(file_path, node : bool):
+    '''format_technology_col of a result file (e.g. NewCapacity.csv)
+    computed over its chunks, with the rows filtered as in
+    read.POWER_FILTER.'''
+    spatial = 'NODE' if node else 'COUNTRY'
+    accumulator = CodeAccumulator(['TECH', spatial, 'YEAR'], OUT_OF_CORE['max_mb'])
+
+    for chunk in _chunks(file_path, ['TECHNOLOGY', 'YEAR', 'VALUE']):
+        nbytes = int(chunk.memory_usage(deep = True).sum())
+        chunk = chunk.loc[_filter_mask(chunk, POWER_FILTER['prefixes'],
+                                       POWER_FILTER['exclude'],
+                                       POWER_FILTER['years'])]
+
+        codes, technologies = _factorized(chunk['TECHNOLOGY'])
+        technologies = technologies.astype(str)
+        accumulator.add([(codes, technologies.str[3:6]),
+                         (codes, technologies.str[6:11] if node else technologies.str[6:9]),
+                         _factorized(chunk['YEAR'])],
+                        chunk['VALUE'].to_numpy(), nbytes)
+
+    return accumulator.frame()
+
+def emission_totals(file_path, country : bool):
+    '''format_annual_emissions of a result file (e.g. AnnualEmissions.csv)
+    computed over its chunks. With country the VALUE is summed by COUNTRY 
+    and YEAR (the rows of format_annual_emissions when every country has a 
+    single EMISSION), sorted by COUNTRY and YEAR.'''
+    keys = ['COUNTRY', 'YEAR'] if country else ['YEAR']
+    accumulator = CodeAccumulator(keys, OUT_OF_CORE['max_mb'])
+
+    for chunk in _chunks(file_path, ['EMISSION', 'YEAR', 'VALUE'] if country 
+                         else ['YEAR', 'VALUE']):
+        chunk_keys = [_factorized(chunk['YEAR'])]
+        if country:
+            codes, emissions = _factorized(chunk['EMISSION'])
+            chunk_keys.insert(0, (codes, emissions.astype(str).str[3:6]))
+
+        accumulator.add(chunk_keys, chunk['VALUE'].to_numpy(),
+                        int(chunk.memory_usage(deep = True).sum()))
+
+    return accumulator.frame(categorical = False)
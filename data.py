@@ -1,21 +1,50 @@
 '''Functions as input to visualisations'''
 import os
-from matplotlib import pyplot as plt
 from matplotlib.ticker import FormatStrFormatter
 from matplotlib.patches import Patch
-import numpy as np
 import pandas as pd
 import math
-import cartopy.io.shapereader as shpreader
-import cartopy.crs as ccrs
 import cartopy.feature as cfeature
-from typing import Dict
 
 from utils import (
     get_years,
-    make_space_above
+    make_space_above,
+    pivot_by_country,
+    split_by_country
     )
 
+from figures import (
+    subplots,
+    figure,
+    managed_figure,
+    get_template,
+    stacked_bars
+    )
+
+from templates import (
+    StackedBarChart,
+    BarLineChart,
+    MultiPlotCountryChart
+    )
+
+from delta import (
+    split_delta,
+    split_delta_total,
+    horizon_delta,
+    multi_scenario_delta,
+    sensitivity_delta,
+    geo_sensitivity_delta,
+    gen_shares_delta
+    )
+
+from maps import (
+    LABEL_ADJUST,
+    map_extent,
+    draw_basemap,
+    add_node_overlay
+    )
+
+@managed_figure
 def format_stacked_bar_pwr(df, out_dir, chart_title, 
                            legend_title, file_name, 
                            color_dict, unit, 
@@ -29,31 +58,14 @@ def format_stacked_bar_pwr(df, out_dir, chart_title,
     else:
         path = out_dir
 
-    df = df.groupby(['YEAR', 'TECH'])['VALUE'].sum().unstack().fillna(0)
-    
-    fig, ax = plt.subplots()
-
-    # Initialize the bottom at zero for the first set of bars.
-    bottom = np.zeros(len(df))
+    df = df.groupby(['YEAR', 'TECH'], observed = True)['VALUE'].sum().unstack().fillna(0)
     
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df.columns):
-      ax.bar(df.index, df[col], bottom=bottom, 
-             label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom += np.array(df[col])
-    
-    ax.set_title(chart_title)
-    ax.set_ylabel(unit)
-    ax.legend(bbox_to_anchor=(1, 1.02), frameon = False, 
-              reverse = True, title = legend_title)
-    
-    ax.margins(x=0)
-    if country:
-        plt.close(fig)
+    fig = get_template(StackedBarChart).draw(df, color_dict, chart_title, 
+                                             legend_title, unit)
 
     return fig.savefig(os.path.join(path, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_stacked_bar_demand(df, out_dir, chart_title, 
                               legend_title, file_name, 
                               color_dict, unit):
@@ -63,27 +75,12 @@ def format_stacked_bar_demand(df, out_dir, chart_title,
     
     df = df.groupby(['YEAR', 'FUEL'])['VALUE'].sum().unstack().fillna(0)
 
-    fig, ax = plt.subplots()
-
-    # Initialize the bottom at zero for the first set of bars.
-    bottom = np.zeros(len(df))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df.columns):
-      ax.bar(df.index, df[col], bottom=bottom, 
-             label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom += np.array(df[col])
-    
-    ax.set_title(chart_title)
-    ax.set_ylabel(unit)
-    ax.legend(bbox_to_anchor=(1, 1.02), frameon = False, 
-              reverse = True, title = legend_title)
-    
-    ax.margins(x=0)
+    fig = get_template(StackedBarChart).draw(df, color_dict, chart_title, 
+                                             legend_title, unit)
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_stacked_bar_gen_shares(df, out_dir, chart_title, 
                                   legend_title, file_name, 
                                   color_dict, unit, 
@@ -103,104 +100,47 @@ def format_stacked_bar_gen_shares(df, out_dir, chart_title,
     df['Other'] = 100 - df['Renewable'] - df['Fossil']
     df = df[['YEAR', 'Renewable', 'Fossil', 'Other']].groupby(['YEAR']).sum()
     
-    fig, ax = plt.subplots()
-
-    # Initialize the bottom at zero for the first set of bars.
-    bottom = np.zeros(len(df))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df.columns):
-      ax.bar(df.index, df[col], bottom=bottom, 
-             label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom += np.array(df[col])
-    
-    ax.set_title(chart_title)
-    ax.set_ylabel(unit)
-    ax.legend(bbox_to_anchor=(1, 1.02), frameon = False, 
-              reverse = True, title = legend_title)
-    
-    ax.margins(x=0)
-    if country:
-        plt.close(fig)
+    fig = get_template(StackedBarChart).draw(df, color_dict, chart_title, 
+                                             legend_title, unit)
 
     return fig.savefig(os.path.join(path, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_stacked_bar_gen_shares_delta(df_in1, df_in2, df_in3, df_in4, 
                                         out_dir, chart_title, legend_title, 
                                         file_name, color_dict, unit):
     
-    for df in [df_in1, df_in2]:
-        df.rename(columns = {'RENEWABLE' : 'Renewable',
-                             'FOSSIL' : 'Fossil'}, inplace = True)
+    df_in1, df_in2 = [df.rename(columns = {'RENEWABLE' : 'Renewable',
+                                           'FOSSIL' : 'Fossil'})
+                      for df in [df_in1, df_in2]]
     
     # Calculate Delta's for timeseries (ts)
-    df_in1['Other'] = 100 - df_in1['Renewable'] - df_in1['Fossil']
+    df_in1 = df_in1.assign(Other = 100 - df_in1['Renewable'] - df_in1['Fossil'])
     df_in1 = df_in1[['YEAR', 'Renewable', 'Fossil', 'Other']].groupby(['YEAR']).sum()
     
-    df_in2['Other'] = 100 - df_in2['Renewable'] - df_in2['Fossil']
+    df_in2 = df_in2.assign(Other = 100 - df_in2['Renewable'] - df_in2['Fossil'])
     df_in2 = df_in2[['YEAR', 'Renewable', 'Fossil', 'Other']].groupby(['YEAR']).sum()
     
     df_ts_in = df_in2 - df_in1
     
     # Calculate Delta's for horizon (hz)
-    for df in [df_in3, df_in4]:
-        df['Metric'] = df['Metric'].replace({'Renewable energy share' : 'Renewable',
-                          'Fossil energy share' : 'Fossil'})
-
-        df.set_index('Metric', inplace = True)
-        df.drop(columns = ['Unit'], inplace = True)
-        df.loc['Other'] = 100 - df.loc[df.index == 'Renewable'
-                                       ].iloc[0] - df.loc[df.index == 'Fossil'
-                                                          ].iloc[0]
-                                                          
-    df_hz_in = df_in4 - df_in3
-    df_hz_in = df_hz_in.transpose()[['Renewable', 'Fossil', 'Other']]
+    df_hz_in = gen_shares_delta(df_in3, df_in4)
     
-    fig, axs = plt.subplots(1, 2, squeeze = False,
+    fig, axs = subplots(1, 2, squeeze = False,
                             gridspec_kw = {'width_ratios' : [1, 10]})
 
     # SET TIMESERIES SUBPLOT
     df1 = df_ts_in.clip(upper = 0)
     df2 = df_ts_in.clip(lower = 0)
 
-    # Initialize the bottom at zero for the first set of bars.
-    bottom1 = np.zeros(len(df1))
-    bottom2 = np.zeros(len(df2))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-
-    for i, col in enumerate(df1.columns):
-      axs[0, 1].bar(df1.index, df1[col], bottom=bottom1, 
-             label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom1 += np.array(df1[col])
-      
-    for i, col in enumerate(df2.columns):
-      axs[0, 1].bar(df2.index, df2[col], bottom=bottom2, 
-                   color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom2 += np.array(df2[col])
+    stacked_bars(axs[0, 1], df_ts_in, color_dict, split = True)
       
     # SET HORIZON SUBPLOT
     df3 = df_hz_in.clip(upper = 0)
     df4 = df_hz_in.clip(lower = 0)
     
-    # Initialize the bottom at zero for the first set of bars.
-    bottom3 = np.zeros(len(df3))
-    bottom4 = np.zeros(len(df4))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    
-    for i, col in enumerate(df3.columns):
-      axs[0, 0].bar('Total', df3[col], bottom=bottom3, 
-                    color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom3 += np.array(df3[col])
-      
-    for i, col in enumerate(df4.columns):
-      axs[0, 0].bar('Total', df4[col], bottom=bottom4, 
-                    color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom4 += np.array(df4[col])
+    stacked_bars(axs[0, 0], df_hz_in, color_dict, x = ['Total'], split = True, 
+                 label = False)
    
     fig.legend(bbox_to_anchor=(0.8, 0.05), frameon = False, 
               reverse = True, title = legend_title, ncols = 3)
@@ -220,15 +160,66 @@ def format_stacked_bar_gen_shares_delta(df_in1, df_in2, df_in3, df_in4,
     axs[0, 0].axhline(y=0, color='black', linestyle='-', linewidth = 0.1)
     
     # Adjust subplot whitespace
-    plt.subplots_adjust(wspace=0.3)
+    fig.subplots_adjust(wspace=0.3)
     
     # Add plot title
     if chart_title:
         make_space_above(axs, topmargin=0.3) 
-        plt.suptitle(chart_title)
+        fig.suptitle(chart_title)
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+def _stacked_bar_countries(frames, countries, out_dir, chart_title, 
+                           legend_title, file_name, 
+                           color_dict, unit):
+    
+    # Countries with the same years and technologies are drawn on the same 
+    # figure, only its bars are updated.
+    template = get_template(StackedBarChart)
+    for country in countries:
+        if country not in frames:
+            continue
+        
+        fig = template.draw(frames[country], color_dict, f'{country} {chart_title}', 
+                            legend_title, unit)
+        
+        fig.savefig(os.path.join(out_dir, country, file_name), bbox_inches = 'tight')
+
+@managed_figure
+def format_stacked_bar_pwr_country(df, out_dir, chart_title, 
+                                   legend_title, file_name, 
+                                   color_dict, unit, 
+                                   countries):
+    '''format_stacked_bar_pwr for every country in countries, with the table 
+    pivoted by country once.'''
+    frames = pivot_by_country(df, columns = 'TECH')
+
+    _stacked_bar_countries(frames, countries, out_dir, chart_title, 
+                           legend_title, file_name, 
+                           color_dict, unit)
+
+@managed_figure
+def format_stacked_bar_gen_shares_country(df, out_dir, chart_title, 
+                                          legend_title, file_name, 
+                                          color_dict, unit, 
+                                          countries):
+    '''format_stacked_bar_gen_shares for every country in countries, with the 
+    table split by country once.'''
+    df = df.rename(columns = {'RENEWABLE' : 'Renewable',
+                              'FOSSIL' : 'Fossil'})
+    
+    df['Other'] = 100 - df['Renewable'] - df['Fossil']
+    df = df.groupby(['COUNTRY', 'YEAR'], observed = True)[
+        ['Renewable', 'Fossil', 'Other']].sum()
+    
+    frames = {country : frame.droplevel('COUNTRY') 
+              for country, frame in df.groupby(level = 'COUNTRY', observed = True)}
+
+    _stacked_bar_countries(frames, countries, out_dir, chart_title, 
+                           legend_title, file_name, 
+                           color_dict, unit)
+
+@managed_figure
 def format_bar_line(df1, df2, out_dir, chart_title, 
                     legend_title, file_name, 
                     color_dict, unit1, 
@@ -246,31 +237,12 @@ def format_bar_line(df1, df2, out_dir, chart_title,
     df1.set_index('YEAR', inplace = True)
     df2.set_index('YEAR', inplace = True)
     
-    fig, ax1 = plt.subplots()
-    
-    ax1.bar(df1.index, df1['VALUE'], label= unit1, 
-           color = color_dict.get('bar'), edgecolor = 'black', linewidth = 0.3)
-    
-    ax2 = ax1.twinx()
-    
-    ax2.plot(df2.index, df2['VALUE'], label= unit2, 
-             color = color_dict.get('line'))
-
-    ax1.set_title(chart_title)
-    ax1.set_ylabel(unit1)
-    ax2.set_ylabel(unit2)
-    ax1.legend(bbox_to_anchor=(0.5, -0.05), frameon = False, 
-               title = legend_title)
-    
-    ax2.legend(bbox_to_anchor=(0.8, -0.05), frameon = False, 
-               title = legend_title)
-    
-    ax1.margins(x=0)
-    if country:
-        plt.close(fig)
+    fig = get_template(BarLineChart).draw(df1, df2, color_dict, chart_title, 
+                                          legend_title, unit1, unit2)
 
     return fig.savefig(os.path.join(path, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_bar_delta(df1, df2, out_dir, 
                      chart_title, legend_title, 
                      file_name, color_dict, 
@@ -295,7 +267,7 @@ def format_bar_delta(df1, df2, out_dir,
     # Calculate model horizon Delta
     df3 = df.sum().fillna(0)
     
-    fig, axs = plt.subplots(1, 2, squeeze = False,
+    fig, axs = subplots(1, 2, squeeze = False,
                             gridspec_kw = {'width_ratios' : [1, 10]})
     
     axs[0, 1].bar(df.index, df['VALUE'], 
@@ -311,18 +283,16 @@ def format_bar_delta(df1, df2, out_dir,
     axs[0, 0].set_ylabel(unit)
     
     # Adjust subplot whitespace
-    plt.subplots_adjust(wspace=0.3)
+    fig.subplots_adjust(wspace=0.3)
     
     # Add plot title
     if chart_title:
         make_space_above(axs, topmargin=0.3) 
-        plt.suptitle(chart_title)
+        fig.suptitle(chart_title)
     
-    if country:
-        plt.close(fig)
-
     return fig.savefig(os.path.join(path, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_line_multi_country(df, out_dir, chart_title, 
                               legend_title, file_name, 
                               color_dict, unit):
@@ -331,7 +301,7 @@ def format_line_multi_country(df, out_dir, chart_title,
 
     df = df.groupby(['YEAR', 'COUNTRY'])['VALUE'].sum().unstack().fillna(0)
     
-    fig, ax = plt.subplots()
+    fig, ax = subplots()
     
     for i, col in enumerate(df.columns):
         ax.plot(df.index, df[col], label = col, 
@@ -347,6 +317,7 @@ def format_line_multi_country(df, out_dir, chart_title,
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_line_emission_limit(df, out_dir, chart_title, 
                               legend_title, file_name, 
                               color_dict, unit):
@@ -358,7 +329,7 @@ def format_line_emission_limit(df, out_dir, chart_title,
     df1 = df.loc[:, df.le(100).all()]
     df2 = df.drop(columns = list(df1.columns))
 
-    fig, axs = plt.subplots(1, 2, squeeze = False,
+    fig, axs = subplots(1, 2, squeeze = False,
                             gridspec_kw = {'width_ratios' : [1, 1]},
                             figsize = (5, 3))
     
@@ -382,6 +353,7 @@ def format_line_emission_limit(df, out_dir, chart_title,
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_stacked_bar_line_emissions(df1, df2, out_dir, chart_title, 
                                       legend_title, file_name, 
                                       color_dict, unit1, unit2):
@@ -389,17 +361,9 @@ def format_stacked_bar_line_emissions(df1, df2, out_dir, chart_title,
     df1 = df1.groupby(['YEAR', 'COUNTRY'])['VALUE'].sum().unstack().fillna(0)
     df2.set_index('YEAR', inplace = True)
     
-    fig, ax1 = plt.subplots()
+    fig, ax1 = subplots()
 
-    # Initialize the bottom at zero for the first set of bars.
-    bottom = np.zeros(len(df1))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df1.columns):
-      ax1.bar(df1.index, df1[col], bottom=bottom, 
-             label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom += np.array(df1[col])
+    stacked_bars(ax1, df1, color_dict)
       
     ax2 = ax1.twinx()
     
@@ -419,6 +383,7 @@ def format_stacked_bar_line_emissions(df1, df2, out_dir, chart_title,
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_stacked_bar_pwr_delta(df_in1, df_in2, out_dir, 
                                  chart_title, legend_title, 
                                  file_name, color_dict, unit, 
@@ -426,44 +391,15 @@ def format_stacked_bar_pwr_delta(df_in1, df_in2, out_dir,
     
     years = get_years(start_year, end_year)
     
-    fig, axs = plt.subplots(1, 2, squeeze = False,
+    fig, axs = subplots(1, 2, squeeze = False,
                             gridspec_kw = {'width_ratios' : [1, 10]})
     
     # SET TIMESERIES SUBPLOT
     
-    df1 = df_in1.loc[df_in1['DELTA'] < 0]
-    df2 = df_in1.loc[df_in1['DELTA'] > 0]
-
-    df1 = df1.groupby(['YEAR', 'TECH'])['DELTA'].sum().unstack().fillna(0)
-    df2 = df2.groupby(['YEAR', 'TECH'])['DELTA'].sum().unstack().fillna(0)
-
-    for idx in years:
-        if not df1.empty:
-            if not idx in df1.index:
-                df1.loc[idx] = 0
-                
-        if not df2.empty:            
-            if not idx in df2.index:
-                df2.loc[idx] = 0
-            
-    df1.sort_index(inplace = True)
-    df2.sort_index(inplace = True)
+    df1, df2 = split_delta(df_in1, index_values = years)
 
-    # Initialize the bottom at zero for the first set of bars.
-    bottom1 = np.zeros(len(df1))
-    bottom2 = np.zeros(len(df2))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df1.columns):
-      axs[0,1].bar(df1.index, df1[col], bottom=bottom1, 
-             label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom1 += np.array(df1[col])
-      
-    for i, col in enumerate(df2.columns):
-      axs[0,1].bar(df2.index, df2[col], bottom=bottom2, 
-             label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom2 += np.array(df2[col])
+    stacked_bars(axs[0,1], df1, color_dict)
+    stacked_bars(axs[0,1], df2, color_dict)
     
     # Axis formatting
     axs[0,1].xaxis.set_major_formatter(FormatStrFormatter('%d'))
@@ -473,39 +409,10 @@ def format_stacked_bar_pwr_delta(df_in1, df_in2, out_dir,
     
     # SET TOTAL SUBPLOT
     
-    df3 = df_in2.loc[df_in2['DELTA'] < 0]
-    df4 = df_in2.loc[df_in2['DELTA'] > 0]
-
-    df3 = df3.groupby(['TECH'])['DELTA'].sum().fillna(0)
-    df4 = df4.groupby(['TECH'])['DELTA'].sum().fillna(0)
-    
-    for idx in df_in2.index:
-        if not df3.empty:
-            if not idx in df3.index:
-                df3.loc[idx] = 0
-         
-        if not df4.empty:
-            if not idx in df4.index:
-                df4.loc[idx] = 0
-    
-    df3 = pd.DataFrame(df3.sort_index()).transpose()
-    df4 = pd.DataFrame(df4.sort_index()).transpose()
-
-    # Initialize the bottom at zero for the first set of bars.
-    bottom3 = np.zeros(len(df3))
-    bottom4 = np.zeros(len(df4))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df3.columns):
-      axs[0,0].bar('Total', df3[col], bottom=bottom3, 
-             label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom3 += np.array(df3[col])
-      
-    for i, col in enumerate(df4.columns):
-      axs[0,0].bar('Total', df4[col], bottom=bottom4, 
-             label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom4 += np.array(df4[col])
+    df3, df4 = split_delta_total(df_in2)
+
+    stacked_bars(axs[0,0], df3, color_dict, x = ['Total'])
+    stacked_bars(axs[0,0], df4, color_dict, x = ['Total'])
     
     # Axis formatting
     axs[0,0].margins(x=1)
@@ -516,7 +423,7 @@ def format_stacked_bar_pwr_delta(df_in1, df_in2, out_dir,
     # CONFIG BOTH SUBPLOTS
     
     # Set legend
-    handles, labels = plt.gca().get_legend_handles_labels()
+    handles, labels = fig.gca().get_legend_handles_labels()
     by_label = dict(zip(labels, handles))
     by_label = dict(sorted(by_label.items()))
     
@@ -524,7 +431,7 @@ def format_stacked_bar_pwr_delta(df_in1, df_in2, out_dir,
                bbox_to_anchor=(1.12, 0.91), frameon = False, 
                reverse = True, title = legend_title)
     
-    plt.suptitle(chart_title)
+    fig.suptitle(chart_title)
     
     # Add 0 line
     for i, ax in enumerate(fig.axes):
@@ -534,6 +441,7 @@ def format_stacked_bar_pwr_delta(df_in1, df_in2, out_dir,
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_stacked_bar_pwr_delta_spatial(df_in1, df_in2, out_dir, 
                                          chart_title, legend_title, 
                                          file_name, color_dict, unit, 
@@ -543,9 +451,13 @@ def format_stacked_bar_pwr_delta_spatial(df_in1, df_in2, out_dir,
     
     spatial_list = list(df_in1.index.get_level_values(spatial).unique())
     
+    df_years = split_delta(df_in1, index_values = years, spatial = spatial)
+    df_total = split_delta_total(df_in2, spatial = spatial, 
+                                 entries = spatial_list)
+    
     rows = math.ceil(len(spatial_list) / 2)
     
-    fig, axs = plt.subplots(rows, 4, squeeze = False,
+    fig, axs = subplots(rows, 4, squeeze = False,
                             figsize = (9, rows * 2.5),
                             gridspec_kw = {
                                 'width_ratios' : [1, 10, 1, 10]})
@@ -559,42 +471,10 @@ def format_stacked_bar_pwr_delta_spatial(df_in1, df_in2, out_dir,
     for entry in spatial_list:
     
         # SET TIMESERIES SUBPLOT
-        df1 = df_in1.loc[(df_in1['DELTA'] < 0) & 
-                         (df_in1.index.get_level_values(spatial) == entry)]
-        df2 = df_in1.loc[(df_in1['DELTA'] > 0) & 
-                         (df_in1.index.get_level_values(spatial) == entry)]
-    
-        df1 = df1.groupby(['YEAR', 'TECH'])['DELTA'].sum().unstack().fillna(0)
-        df2 = df2.groupby(['YEAR', 'TECH'])['DELTA'].sum().unstack().fillna(0)
+        df1, df2 = df_years[entry]
 
-        for idx in years:
-            if not df1.empty:
-                if not idx in df1.index:
-                    df1.loc[idx] = 0
-                    
-            if not df2.empty:
-                if not idx in df2.index:
-                    df2.loc[idx] = 0
-                
-        df1.sort_index(inplace = True)
-        df2.sort_index(inplace = True)
-
-        # Initialize the bottom at zero for the first set of bars.
-        bottom1 = np.zeros(len(df1))
-        bottom2 = np.zeros(len(df2))
-        
-        # Plot each layer of the bar, adding each bar to the 'bottom' so
-        # the next bar starts higher.
-
-        for i, col in enumerate(df1.columns):
-          axs[y].bar(df1.index, df1[col], bottom=bottom1, 
-                 label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-          bottom1 += np.array(df1[col])
-          
-        for i, col in enumerate(df2.columns):
-          axs[y].bar(df2.index, df2[col], bottom=bottom2, 
-                 label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-          bottom2 += np.array(df2[col])
+        stacked_bars(axs[y], df1, color_dict)
+        stacked_bars(axs[y], df2, color_dict)
         
         # Axis formatting
         axs[y].xaxis.set_major_formatter(FormatStrFormatter('%d'))
@@ -611,39 +491,10 @@ def format_stacked_bar_pwr_delta_spatial(df_in1, df_in2, out_dir,
             legend_dict[handle] = label
         
         # SET TOTAL SUBPLOT  
-        df3 = df_in2.loc[(df_in2['DELTA'] < 0) & 
-                         (df_in2.index.get_level_values(spatial) == entry)]
-        df4 = df_in2.loc[(df_in2['DELTA'] > 0) & 
-                         (df_in2.index.get_level_values(spatial) == entry)]
-    
-        df3 = df3.groupby(['TECH'])['DELTA'].sum().fillna(0)
-        df4 = df4.groupby(['TECH'])['DELTA'].sum().fillna(0)
-
-        for idx in df_in2.index.get_level_values("TECH"):
-            if not idx in df3.index:
-                    df3.loc[idx] = 0
-                
-            if not idx in df4.index:    
-                    df4.loc[idx] = 0
-        
-        df3 = pd.DataFrame(df3.sort_index()).transpose()
-        df4 = pd.DataFrame(df4.sort_index()).transpose()
+        df3, df4 = df_total[entry]
     
-        # Initialize the bottom at zero for the first set of bars.
-        bottom3 = np.zeros(len(df3))
-        bottom4 = np.zeros(len(df4))
-        
-        # Plot each layer of the bar, adding each bar to the 'bottom' so
-        # the next bar starts higher.
-        for i, col in enumerate(df3.columns):
-          axs[x].bar('Total', df3[col], bottom=bottom3, 
-                 label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-          bottom3 += np.array(df3[col])
-          
-        for i, col in enumerate(df4.columns):
-          axs[x].bar('Total', df4[col], bottom=bottom4, 
-                 label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-          bottom4 += np.array(df4[col])
+        stacked_bars(axs[x], df3, color_dict, x = ['Total'])
+        stacked_bars(axs[x], df4, color_dict, x = ['Total'])
         
         # Axis formatting
         axs[x].margins(x=1)
@@ -688,10 +539,10 @@ def format_stacked_bar_pwr_delta_spatial(df_in1, df_in2, out_dir,
     # Add plot title
     if chart_title:
         make_space_above(axs, topmargin=0.8) 
-        plt.suptitle(chart_title)
+        fig.suptitle(chart_title)
     
     # Adjust subplot whitespace
-    plt.subplots_adjust(wspace=0.5, hspace=0.3)
+    fig.subplots_adjust(wspace=0.5, hspace=0.3)
     
     # Add 0 line
     for i, ax in enumerate(fig.axes):
@@ -699,6 +550,7 @@ def format_stacked_bar_pwr_delta_spatial(df_in1, df_in2, out_dir,
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_bar_delta_country(df_in1, df_in2, out_dir, 
                              chart_title, legend_title, 
                              file_name, color_dict, 
@@ -729,7 +581,7 @@ def format_bar_delta_country(df_in1, df_in2, out_dir,
 
     rows = math.ceil(n / 2)
     
-    fig, axs = plt.subplots(rows, 4, squeeze = False,
+    fig, axs = subplots(rows, 4, squeeze = False,
                             figsize = (9, rows * 2.5),
                             gridspec_kw = {
                                 'width_ratios' : [1, 10, 1, 10]})
@@ -772,10 +624,10 @@ def format_bar_delta_country(df_in1, df_in2, out_dir,
     for ax in range(x, (rows * 4)):
         fig.delaxes(axs[ax])
         
-    plt.ticklabel_format(style='plain')
+    fig.gca().ticklabel_format(style='plain')
 
     # Adjust subplot whitespace
-    plt.subplots_adjust(wspace=0.5, hspace=0.3)
+    fig.subplots_adjust(wspace=0.5, hspace=0.3)
     
     # Set legend
     legend_dict = dict(sorted(legend_dict.items()))
@@ -787,10 +639,11 @@ def format_bar_delta_country(df_in1, df_in2, out_dir,
     # Add plot title
     if chart_title:
         make_space_above(axs, topmargin=0.7) 
-        plt.suptitle(chart_title)
+        fig.suptitle(chart_title)
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_headline_metrics_global(capacity_in, production_in, 
                                    capacity_title, production_title,
                                    capacity_dict, production_dict,
@@ -805,46 +658,17 @@ def format_headline_metrics_global(capacity_in, production_in,
                                    chart_title, file_name, scenario):
     
     # SET PLOT BASE
-    fig, axs = plt.subplots(3, 2, squeeze = False, 
+    fig, axs = subplots(3, 2, squeeze = False, 
                             gridspec_kw = {'height_ratios' : [1, 1, 1], 
                                            'width_ratios' : [1, 1]},
                             figsize = (12, 4)
                             )
     
     # SUBPLOT - CAPACITY
-    capacity1 = capacity_in.loc[capacity_in['DELTA'] < 0]
-    capacity2 = capacity_in.loc[capacity_in['DELTA'] > 0]
-
-    capacity1 = capacity1.groupby(['TECH'])['DELTA'].sum().fillna(0)
-    capacity2 = capacity2.groupby(['TECH'])['DELTA'].sum().fillna(0)
-    
-    for idx in capacity_in.index:
-        if not capacity1.empty:
-            if not idx in capacity1.index:
-                capacity1.loc[idx] = 0
-         
-        if not capacity2.empty:
-            if not idx in capacity2.index:
-                capacity2.loc[idx] = 0
-    
-    capacity1 = pd.DataFrame(capacity1.sort_index()).transpose()
-    capacity2 = pd.DataFrame(capacity2.sort_index()).transpose()
-
-    # Initialize the bottom at zero for the first set of bars.
-    capacity_bot1 = 0
-    capacity_bot2 = 0
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(capacity1.columns):
-      axs[0, 0].barh('Total', capacity1[col], left=capacity_bot1, 
-             label=col, color = capacity_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      capacity_bot1 += capacity1[col].iloc[0]
-      
-    for i, col in enumerate(capacity2.columns):
-      axs[0, 0].barh('Total', capacity2[col], left=capacity_bot2, 
-             label=col, color = capacity_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      capacity_bot2 += capacity2[col].iloc[0]
+    capacity1, capacity2 = split_delta_total(capacity_in)
+
+    stacked_bars(axs[0, 0], capacity1, capacity_dict, x = ['Total'], horizontal = True)
+    stacked_bars(axs[0, 0], capacity2, capacity_dict, x = ['Total'], horizontal = True)
     
     # Axis formatting
     axs[0, 0].set_xlim([min(capacity1.sum(axis=1), default = 0) * 1.1, 
@@ -852,39 +676,10 @@ def format_headline_metrics_global(capacity_in, production_in,
     axs[0, 0].title.set_text(capacity_title)
     
     # SUBPLOT - Generation
-    production1 = production_in.loc[production_in['DELTA'] < 0]
-    production2 = production_in.loc[production_in['DELTA'] > 0]
-
-    production1 = production1.groupby(['TECH'])['DELTA'].sum().fillna(0)
-    production2 = production2.groupby(['TECH'])['DELTA'].sum().fillna(0)
-    
-    for idx in production_in.index:
-        if not production1.empty:
-            if not idx in production1.index:
-                production1.loc[idx] = 0
-         
-        if not production2.empty:
-            if not idx in production2.index:
-                production2.loc[idx] = 0
-    
-    production1 = pd.DataFrame(production1.sort_index()).transpose()
-    production2 = pd.DataFrame(production2.sort_index()).transpose()
-
-    # Initialize the bottom at zero for the first set of bars.
-    production_bot1 = 0
-    production_bot2 = 0
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(production1.columns):
-      axs[0, 1].barh('Total', production1[col], left=production_bot1, 
-             label=col, color = production_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      production_bot1 += production1[col].iloc[0]
-      
-    for i, col in enumerate(production2.columns):
-      axs[0, 1].barh('Total', production2[col], left=production_bot2, 
-             label=col, color = production_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      production_bot2 += production2[col].iloc[0]
+    production1, production2 = split_delta_total(production_in)
+
+    stacked_bars(axs[0, 1], production1, production_dict, x = ['Total'], horizontal = True)
+    stacked_bars(axs[0, 1], production2, production_dict, x = ['Total'], horizontal = True)
     
     # Axis formatting
     axs[0, 1].set_xlim([min(production1.sum(axis=1), default = 0) * 1.1, 
@@ -901,37 +696,13 @@ def format_headline_metrics_global(capacity_in, production_in,
 
     # SUBPLOT - GENERATION SHARES
     # Calculate Delta's for horizon (hz)
-    for df in [gen_shares_in1, gen_shares_in2]:
-        df['Metric'] = df['Metric'].replace({'Renewable energy share' : 'Renewable',
-                          'Fossil energy share' : 'Fossil'})
-
-        df.set_index('Metric', inplace = True)
-        df.drop(columns = ['Unit'], inplace = True)
-        df.loc['Other'] = 100 - df.loc[df.index == 'Renewable'
-                                       ].iloc[0] - df.loc[df.index == 'Fossil'
-                                                          ].iloc[0]
-                                                          
-    df_hz_in = gen_shares_in2 - gen_shares_in1
-    df_hz_in = df_hz_in.transpose()[['Renewable', 'Fossil', 'Other']]
+    df_hz_in = gen_shares_delta(gen_shares_in1, gen_shares_in2)
 
     gen_shares1 = df_hz_in.clip(upper = 0)
     gen_shares2 = df_hz_in.clip(lower = 0)
 
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    gen_shares_bot1 = 0
-    gen_shares_bot2 = 0
-    
-    for i, col in enumerate(gen_shares1.columns):           
-      axs[1, 0].barh('Total', gen_shares1[col], left = gen_shares_bot1,
-                    color = gen_shares_dict.get(col), label = col
-                    , edgecolor = 'black', linewidth = 0.3)
-      gen_shares_bot1 += np.array(gen_shares1[col])
-      
-    for i, col in enumerate(gen_shares2.columns):
-      axs[1, 0].barh('Total', gen_shares2[col], left = gen_shares_bot2,
-                    color = gen_shares_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      gen_shares_bot2 += np.array(gen_shares2[col])
+    stacked_bars(axs[1, 0], df_hz_in, gen_shares_dict, x = ['Total'], split = True, 
+                 horizontal = True)
       
     # Subplot formatting
     axs[1, 0].xaxis.set_major_formatter(FormatStrFormatter('%.3f'))
@@ -942,15 +713,8 @@ def format_headline_metrics_global(capacity_in, production_in,
               reverse = True, ncols = 3)
     
     # SUBPLOTS - Emissions and Costs
-    for df in [emissions_in1, emissions_in2, costs_in1, costs_in2]:
-        df.set_index('YEAR', inplace = True)
-
-    # Calculate and set Emissions subplot
-    emissions = emissions_in2['VALUE'] - emissions_in1['VALUE']
-    emissions = emissions.sum()
-    
-    costs = costs_in2['VALUE'] - costs_in1['VALUE']
-    costs = costs.sum()
+    emissions = horizon_delta(emissions_in1, emissions_in2)
+    costs = horizon_delta(costs_in1, costs_in2)
     
     axs[1, 1].barh('Total', emissions,
                  color = emissions_dict.get('bar'), edgecolor = 'black', linewidth = 0.3)
@@ -1006,43 +770,24 @@ def format_headline_metrics_global(capacity_in, production_in,
     
     # Subplot spacing
    # fig.tight_layout()
-    plt.subplots_adjust(hspace=2.5, wspace = 0.05)
+    fig.subplots_adjust(hspace=2.5, wspace = 0.05)
     
     # Add plot title
     if chart_title:
         make_space_above(axs, topmargin=0.3) 
-        plt.suptitle(chart_title)
+        fig.suptitle(chart_title)
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_bar_delta_multi_scenario(df1, df2_dict, out_dir, 
                                     chart_title, file_name, 
                                     color_dict, unit, 
                                     delta_sort, axis_sort):
     
-    if isinstance(df1, Dict):
-        for key in df1:
-            df1[key].set_index('YEAR', inplace = True)
-    
-    else:
-        df1.set_index('YEAR', inplace = True)
-    
-    plot_df = pd.DataFrame(columns = ['VALUE'])
-    
-    fig, ax = plt.subplots()
+    plot_df = multi_scenario_delta(df1, df2_dict)
     
-    for key in df2_dict:
-        
-        df2_dict[key].set_index('YEAR', inplace = True)
-        if isinstance(df1, Dict):
-            df = df2_dict[key][['VALUE']] - df1[key][['VALUE']]
-            
-        else:
-            df = df2_dict[key][['VALUE']] - df1[['VALUE']]
-        
-        # Calculate model horizon Delta
-        df3 = df.sum().fillna(0)
-        plot_df.loc[key] = df3
+    fig, ax = subplots()
 
     if axis_sort == True:
         plot_df = plot_df.sort_values(by = ['VALUE'])
@@ -1052,7 +797,7 @@ def format_bar_delta_multi_scenario(df1, df2_dict, out_dir,
     ax.bar(plot_df.index, plot_df['VALUE'],
             color = color_dict.get('bar'), edgecolor = 'black', linewidth = 0.3)
     
-    plt.xticks(rotation = 75)
+    ax.tick_params(axis = 'x', labelrotation = 75)
     ax.margins(x=0)
     ax.axhline(y=0, color='black', linestyle='-', linewidth = 0.1)
     ax.set_ylabel(unit)
@@ -1060,36 +805,17 @@ def format_bar_delta_multi_scenario(df1, df2_dict, out_dir,
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_stacked_bar_gen_shares_delta_multi_scenario(df1, df2_dict, out_dir, 
                                                        chart_title, file_name, 
                                                        color_dict, unit, axis_sort):
 
-    df1['Metric'] = df1['Metric'].replace({'Renewable energy share' : 'Renewable',
-                      'Fossil energy share' : 'Fossil'})
-
-    df1.set_index('Metric', inplace = True)
-    df1.drop(columns = ['Unit'], inplace = True)
-    df1.loc['Other'] = 100 - df1.loc[df1.index == 'Renewable'
-                                   ].iloc[0] - df1.loc[df1.index == 'Fossil'
-                                                      ].iloc[0]
-    
     plot_df1 = pd.DataFrame(columns = ['Renewable', 'Fossil', 'Other'])
     plot_df2 = pd.DataFrame(columns = ['Renewable', 'Fossil', 'Other'])
     
     for key, value in df2_dict.items():
         
-        value['Metric'] = value['Metric'].replace({'Renewable energy share' : 'Renewable',
-                          'Fossil energy share' : 'Fossil'})
-    
-        value.set_index('Metric', inplace = True)
-        value.drop(columns = ['Unit'], inplace = True)
-        value.loc['Other'] = 100 - value.loc[value.index == 'Renewable'
-                                       ].iloc[0] - value.loc[value.index == 'Fossil'
-                                                          ].iloc[0]
-                                                          
-        value = (value - df1)
-        value = value.transpose()[['Renewable', 'Fossil', 'Other']
-                                  ].rename(index={'Value': key})
+        value = gen_shares_delta(df1, value).rename(index={'Value': key})
         
         gen_shares1 = value.clip(upper = 0)
         gen_shares2 = value.clip(lower = 0)
@@ -1107,29 +833,18 @@ def format_stacked_bar_gen_shares_delta_multi_scenario(df1, df2_dict, out_dir,
     else:
         plot_df1 = plot_df1.sort_index()
     
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    gen_shares_bot1 = 0
-    gen_shares_bot2 = 0
-    
-    fig, ax = plt.subplots()
+    fig, ax = subplots()
     
-    for i, col in enumerate(plot_df1.columns):           
-      ax.bar(plot_df1.index, plot_df1[col], bottom = gen_shares_bot1,
-              color = color_dict.get(col), label = col, edgecolor = 'black', linewidth = 0.3)
-      gen_shares_bot1 += np.array(plot_df1[col])
+    stacked_bars(ax, plot_df1, color_dict)
       
-    for i, col in enumerate(plot_df2.columns):
-      ax.bar(plot_df2.index, plot_df2[col], bottom = gen_shares_bot2,
-             color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      gen_shares_bot2 += np.array(plot_df2[col])
+    stacked_bars(ax, plot_df2, color_dict, label = False)
       
     # Subplot formatting
     ax.set_ylim([min(plot_df1.sum(axis=1), default = 0) * 1.1, 
                  max(plot_df2.sum(axis=1), default = 0) * 1.1])
     ax.legend(frameon = False, reverse = True, ncols = 1)
     
-    plt.xticks(rotation = 75)
+    ax.tick_params(axis = 'x', labelrotation = 75)
     ax.margins(x=0)
     ax.axhline(y=0, color='black', linestyle='-', linewidth = 0.1)
     ax.set_ylabel(unit)
@@ -1138,6 +853,7 @@ def format_stacked_bar_gen_shares_delta_multi_scenario(df1, df2_dict, out_dir,
 
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_transmission_capacity_multi_scenario(df1_dict, df2_dict, out_dir, 
                                                 chart_title, file_name, 
                                                 color_dict, unit, axis_sort):
@@ -1168,7 +884,7 @@ def format_transmission_capacity_multi_scenario(df1_dict, df2_dict, out_dir,
 
     plot_df1 = plot_df1.reindex(plot_df2.index)
 
-    fig, ax = plt.subplots()
+    fig, ax = subplots()
     
     ax.bar(plot_df1.index, plot_df1['VALUE'],
            color = color_dict.get('new'), label = 'Capacity Built'
@@ -1180,7 +896,7 @@ def format_transmission_capacity_multi_scenario(df1_dict, df2_dict, out_dir,
     
     ax.legend(frameon = False, ncols = 1)
 
-    plt.xticks(rotation = 75)
+    ax.tick_params(axis = 'x', labelrotation = 75)
     ax.margins(x=0)
     ax.axhline(y=0, color='black', linestyle='-', linewidth = 0.1)
     ax.set_ylabel(unit)
@@ -1189,6 +905,7 @@ def format_transmission_capacity_multi_scenario(df1_dict, df2_dict, out_dir,
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
 
+@managed_figure
 def format_stacked_bar_pwr_delta_multi_scenario(df_dict, out_dir, 
                                                 chart_title, file_name, 
                                                 color_dict, unit, axis_sort):
@@ -1197,26 +914,8 @@ def format_stacked_bar_pwr_delta_multi_scenario(df_dict, out_dir,
     
     for key, value in df_dict.items():
 
-        capacity1 = value.loc[value['DELTA'] < 0]
-        capacity2 = value.loc[value['DELTA'] > 0]
-       
-        capacity1 = capacity1.groupby(['TECH'])['DELTA'].sum().fillna(0)
-        capacity2 = capacity2.groupby(['TECH'])['DELTA'].sum().fillna(0)
-        
-        for idx in value.index:
-            if not capacity1.empty:
-                if not idx in capacity1.index:
-                    capacity1.loc[idx] = 0
-             
-            if not capacity2.empty:
-                if not idx in capacity2.index:
-                    capacity2.loc[idx] = 0
-        
-        capacity1 = pd.DataFrame(capacity1).transpose()
-        capacity2 = pd.DataFrame(capacity2).transpose()
-        
-        capacity1.rename(index = {'DELTA' : key}, inplace = True)
-        capacity2.rename(index = {'DELTA' : key}, inplace = True)
+        capacity1, capacity2 = [df.rename(index = {'DELTA' : key})
+                                  for df in split_delta_total(value)]
 
         if plot_df1 is None:
             plot_df1 = capacity1.copy()
@@ -1241,28 +940,16 @@ def format_stacked_bar_pwr_delta_multi_scenario(df_dict, out_dir,
     plot_df2 = plot_df2.reindex(plot_sum.index
                                 ).reindex(sorted(plot_df2.columns), axis=1)
     
-    # Initialize the bottom at zero for the first set of bars.
-    capacity_bot1 = 0
-    capacity_bot2 = 0
+    fig, ax = subplots()
     
-    fig, ax = plt.subplots()
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(plot_df1.columns):
-      ax.bar(plot_df1.index, plot_df1[col], bottom=capacity_bot1, 
-             label=col, color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      capacity_bot1 += np.array(plot_df1[col])
+    stacked_bars(ax, plot_df1, color_dict)
       
-    for i, col in enumerate(plot_df2.columns):
-      ax.bar(plot_df2.index, plot_df2[col], bottom=capacity_bot2, 
-             color = color_dict.get(col), edgecolor = 'black', linewidth = 0.3)
-      capacity_bot2 += np.array(plot_df2[col])
+    stacked_bars(ax, plot_df2, color_dict, label = False)
       
     ax.legend(frameon = False, ncols = 1, bbox_to_anchor=(1, 1.03),
               reverse = True)
 
-    plt.xticks(rotation = 75)
+    ax.tick_params(axis = 'x', labelrotation = 75)
     ax.margins(x=0)
     ax.axhline(y=0, color='black', linestyle='-', linewidth = 0.3)
     ax.set_ylabel(unit)
@@ -1273,150 +960,50 @@ def format_stacked_bar_pwr_delta_multi_scenario(df_dict, out_dir,
       
     return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
-def format_spatial_map_ASEAN(df1, df2, nodes, base_path, 
-                             chart_title, file_name, 
-                             color_dict, label):
-
-    df = pd.concat([df1, df2])
-    df = df.loc[df['region'].isin(nodes)].sort_values(by = ['region']
-                                                      ).reset_index(drop = True)
-    
-    df.insert(0, 'COUNTRY', df['region'].str[:3])
-
-    country_shp = shpreader.natural_earth(resolution='10m',
-                                          category='cultural',
-                                          name='admin_0_countries')
-    
-    fig = plt.figure()
-
-    axs1 = plt.axes(projection = ccrs.PlateCarree(), zorder = 1)
-
-    axs1.coastlines()
-    axs1.set_extent([90, 142, -11, 27])
-      
-    for acountry in shpreader.Reader(country_shp).records():
-        search = acountry.attributes['ISO_A3'].rstrip('\x00')
-
-
-        if search in list(df['COUNTRY'].unique()):
-            col = color_dict.get(search)
-            
-        else:
-            col = 'lightgrey'
-
-        axs1.add_geometries([acountry.geometry], ccrs.PlateCarree(),
-                           facecolor= col, alpha = 0.5)
-    
-    label_adjust = {'BRNXX' : [-4, 0.4], 'IDNJW' : [0, 0.4], 'IDNKA' : [-4.3, -0.8], 
-                    'IDNML' : [-4, -1.3], 'IDNNU' : [-4, -1.3], 'IDNPP' : [-4, -1.3], 
-                    'IDNSL' : [-3.5, -1.3], 'IDNSM' : [-4, 0.5], 'KHMXX' : [0, 0.4], 
-                    'LAOXX' : [0, -1.5], 'MMRXX' : [-1.5, 0.6], 'MYSPE' : [0, 0.4], 
-                    'MYSSH' : [-4, 0.5], 'MYSSK' : [0, -1.3], 'PHLLU' : [-4.3, -0.8], 
-                    'PHLMI' : [0.7, -1.3], 'PHLVI' : [2.5, 0], 'SGPXX' : [0.5, 0], 
-                    'THACE' : [0, 0.4], 'THANO' : [0, 0.6], 'THASO' : [0.1, 0.4], 
-                    'VNMCE' : [0, 0.4], 'VNMNO' : [-4, 0.5], 'VNMSO' : [0.2, -1.5]}
-
-    for index, row in df.iterrows():
-        axs1.scatter(row['long'], row['lat'], transform=ccrs.Geodetic(),
-                     facecolor = 'red', zorder=2, s = 5)
-        
-        adjust = label_adjust.get(row['region'])
-        
-        
-        axs1.text(row['long'] + adjust[0], row['lat'] + adjust[1], row['region'], 
-                  name = 'Calibri', fontsize = 7, zorder=3, weight = 'bold')
-        
-    axs1.text(90.5, -11.5, label, name = 'Calibri', fontsize = 11, weight = 'bold')
- 
-    plt.show()
-
-    return fig.savefig(os.path.join(base_path, file_name), bbox_inches = 'tight')
-
-def format_spatial_map_ZIZABONA(df, nodes, base_path, 
-                                chart_title, file_name, 
-                                color_dict, label):
+@managed_figure
+def format_spatial_map(df, nodes, base_path, file_name, 
+                       color_dict, label, extent = None, label_xy = None, 
+                       label_adjust = LABEL_ADJUST):
 
-    df = df.loc[df['region'].isin(nodes)].sort_values(by = ['region']
-                                                      ).reset_index(drop = True)
+    df = df.loc[df['region'].isin(nodes)].drop_duplicates(subset = ['region'])
+    df = df.sort_values(by = ['region']).reset_index(drop = True)
     
     df.insert(0, 'COUNTRY', df['region'].str[:3])
 
-    country_shp = shpreader.natural_earth(resolution='10m',
-                                          category='cultural',
-                                          name='admin_0_countries')
-    
-    fig = plt.figure()
+    if extent is None:
+        extent = map_extent(df['long'], df['lat'])
+    if label_xy is None:
+        label_xy = (extent[0] + 0.5, extent[2] - 0.5)
 
-    axs1 = plt.axes(projection = ccrs.PlateCarree(), zorder = 1)
+    fig = figure()
 
-    axs1.coastlines()
-    axs1.set_extent([5, 45, -35, 10])
+    axs1 = draw_basemap(fig, extent, set(df['COUNTRY'].unique()), color_dict)
 
+    add_node_overlay(axs1, df, label_adjust)
         
-    for acountry in shpreader.Reader(country_shp).records():
-        search = acountry.attributes['ISO_A3'].rstrip('\x00')
-
-        if search in list(df['COUNTRY'].unique()):
-            col = color_dict.get(search)
-        else:
-            col = 'lightgrey'
-
-        axs1.add_geometries([acountry.geometry], ccrs.PlateCarree(),
-                           facecolor= col, alpha = 0.5)
-
-    label_adjust = {'AGOXX' : [0.3, 0.6], 'BWAXX' : [0.3, 0.6], 'CODXX' : [0.3, 0.6], 
-                    'LSOXX' : [-4.2, -1.5], 'MOZXX' : [1, -0.5], 'MWIXX' : [0.3, 0.6], 
-                    'NAMXX' : [0.3, 0.6], 'SWZXX' : [-2, -2], 'TZAXX' : [-4.2, -1.5], 
-                    'ZAFXX' : [-4.2, -1.5], 'ZMBXX' : [0.3, 0.6], 'ZWEXX' : [0.3, 0.6]}
-
-
-    for index, row in df.iterrows():
-        axs1.scatter(row['long'], row['lat'], transform=ccrs.Geodetic(),
-                     facecolor = 'red', zorder=2, s = 5)
-        
-        adjust = label_adjust.get(row['region'])
-        
-        
-        axs1.text(row['long'] + adjust[0], row['lat'] + adjust[1], row['region'], 
-                  name = 'Calibri', fontsize = 7, zorder=3, weight = 'bold')
-        
-    axs1.text(5.5, -36, label, name = 'Calibri', fontsize = 11, weight = 'bold')
+    axs1.text(*label_xy, label, name = 'Calibri', fontsize = 11, weight = 'bold')
  
-    plt.show()
-
     return fig.savefig(os.path.join(base_path, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_multi_plot_cap_gen_genshares_emissions(df1, df2, df3, df4, df5, 
                                                    unit1, unit2, unit3, unit4, unit5,
                                                    base_path, file_name, chart_title, 
                                                    color_dict1, color_dict2, color_dict3):
     
     # SET PLOT BASE
-    fig, axs = plt.subplots(2, 2, squeeze = False, 
+    fig, axs = subplots(2, 2, squeeze = False, 
                             gridspec_kw = {'height_ratios' : [1, 1], 
                                            'width_ratios' : [1, 1]},
                             figsize = (10, 6)
                             )
     
     # SET CAPACITY AND GENERATION GRAPHS
-    df1 = df1.groupby(['YEAR', 'TECH'])['VALUE'].sum().unstack().fillna(0)
-    df2 = df2.groupby(['YEAR', 'TECH'])['VALUE'].sum().unstack().fillna(0)
+    df1 = df1.groupby(['YEAR', 'TECH'], observed = True)['VALUE'].sum().unstack().fillna(0)
+    df2 = df2.groupby(['YEAR', 'TECH'], observed = True)['VALUE'].sum().unstack().fillna(0)
     
-    # Initialize the bottom at zero for the first set of bars.
-    bottom1 = np.zeros(len(df1))
-    bottom2 = np.zeros(len(df2))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df1.columns):
-      axs[0, 0].bar(df1.index, df1[col], bottom=bottom1, 
-             label=col, color = color_dict1.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom1 += np.array(df1[col])
-      
-    for i, col in enumerate(df2.columns):
-      axs[0, 1].bar(df2.index, df2[col], bottom=bottom2, 
-                    color = color_dict1.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom2 += np.array(df2[col])
+    stacked_bars(axs[0, 0], df1, color_dict1)
+    stacked_bars(axs[0, 1], df2, color_dict1, label = False)
     
     axs[0, 0].set_ylabel(unit1)
     axs[0, 1].set_ylabel(unit2)
@@ -1430,15 +1017,7 @@ def format_multi_plot_cap_gen_genshares_emissions(df1, df2, df3, df4, df5,
     df3['Other'] = 100 - df3['Renewable'] - df3['Fossil']
     df3 = df3[['YEAR', 'Renewable', 'Fossil', 'Other']].groupby(['YEAR']).sum()
 
-    # Initialize the bottom at zero for the first set of bars.
-    bottom3 = np.zeros(len(df3))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df3.columns):
-      axs[1, 0].bar(df3.index, df3[col], bottom=bottom3, 
-             label=col, color = color_dict2.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom3 += np.array(df3[col])
+    stacked_bars(axs[1, 0], df3, color_dict2)
 
     axs[1, 0].set_ylabel(unit3)
     axs[1, 0].legend(bbox_to_anchor=(1.05, -0.1), frameon = False, 
@@ -1449,15 +1028,7 @@ def format_multi_plot_cap_gen_genshares_emissions(df1, df2, df3, df4, df5,
     df4 = df4.groupby(['YEAR', 'COUNTRY'])['VALUE'].sum().unstack().fillna(0)
     df5.set_index('YEAR', inplace = True)
 
-    # Initialize the bottom at zero for the first set of bars.
-    bottom4 = np.zeros(len(df4))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df4.columns):
-      axs[1, 1].bar(df4.index, df4[col], bottom=bottom4, 
-             label=col, color = color_dict3.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom4 += np.array(df4[col])
+    stacked_bars(axs[1, 1], df4, color_dict3)
       
     ax2 = axs[1, 1].twinx()
     
@@ -1488,132 +1059,61 @@ def format_multi_plot_cap_gen_genshares_emissions(df1, df2, df3, df4, df5,
     axs[1, 1].text(1.05, -1.43, 'd', transform=axs[0, 0].transAxes, 
               name = 'Calibri', fontsize = 15, weight = 'bold')
        
-    plt.subplots_adjust(wspace=0.22, hspace = 0.42)
+    fig.subplots_adjust(wspace=0.22, hspace = 0.42)
     
     # Add plot title
     if chart_title:
         make_space_above(axs, topmargin=0.4) 
-        plt.suptitle(chart_title)
+        fig.suptitle(chart_title)
     
     return fig.savefig(os.path.join(base_path, file_name), bbox_inches = 'tight')
     
+@managed_figure
 def format_multi_plot_country_charts(df1, df2, df3, df4, df5, 
                                      unit1, unit2, unit3, unit4, unit5,
                                      base_path, file_name, color_dict1,
-                                     color_dict2, color_dict3, country):
-    
-    # SET PLOT BASE
-    fig, axs = plt.subplots(2, 2, squeeze = False, 
-                            gridspec_kw = {'height_ratios' : [1, 1], 
-                                           'width_ratios' : [1, 1]},
-                            figsize = (10, 6)
-                            )
+                                     color_dict2, color_dict3, countries):
     
-    base_path = os.path.join(base_path, country)
+    # SPLIT ALL TABLES BY COUNTRY ONCE
+    frames1 = pivot_by_country(df1, columns = 'TECH')
+    frames2 = pivot_by_country(df2, columns = 'TECH')
     
-    # SET CAPACITY AND GENERATION GRAPHS
-    df1 = df1.loc[df1['COUNTRY'] == country]
-    df2 = df2.loc[df2['COUNTRY'] == country]
-    
-    df1 = df1.groupby(['YEAR', 'TECH'])['VALUE'].sum().unstack().fillna(0)
-    df2 = df2.groupby(['YEAR', 'TECH'])['VALUE'].sum().unstack().fillna(0)
-    
-    # Initialize the bottom at zero for the first set of bars.
-    bottom1 = np.zeros(len(df1))
-    bottom2 = np.zeros(len(df2))
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df1.columns):
-      axs[0, 0].bar(df1.index, df1[col], bottom=bottom1, 
-             label=col, color = color_dict1.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom1 += np.array(df1[col])
-      
-    for i, col in enumerate(df2.columns):
-      axs[0, 1].bar(df2.index, df2[col], bottom=bottom2, 
-                    color = color_dict1.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom2 += np.array(df2[col])
-    
-    axs[0, 0].set_ylabel(unit1)
-    axs[0, 1].set_ylabel(unit2)
-    axs[0, 0].legend(bbox_to_anchor=(2.23, -0.1), frameon = False, 
-              ncols = 8)
-
-    # SET GEN SHARES GRAPH
     df3 = df3.rename(columns = {'RENEWABLE' : 'Renewable',
                                  'FOSSIL' : 'Fossil'})
     
-    df3 = df3.loc[df3['COUNTRY'] == country].reset_index()
-    
     df3['Other'] = 100 - df3['Renewable'] - df3['Fossil']
-    df3 = df3[['YEAR', 'Renewable', 'Fossil', 'Other']].groupby(['YEAR']).sum()
-
-    # Initialize the bottom at zero for the first set of bars.
-    bottom3 = np.zeros(len(df3))
+    df3 = df3.groupby(['COUNTRY', 'YEAR'], observed = True)[
+        ['Renewable', 'Fossil', 'Other']].sum()
+    frames3 = {country : frame.droplevel('COUNTRY') 
+               for country, frame in df3.groupby(level = 'COUNTRY', observed = True)}
     
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(df3.columns):
-      axs[1, 0].bar(df3.index, df3[col], bottom=bottom3, 
-             label=col, color = color_dict2.get(col), edgecolor = 'black', linewidth = 0.3)
-      bottom3 += np.array(df3[col])
-
-    axs[1, 0].set_ylabel(unit3)
-    axs[1, 0].legend(bbox_to_anchor=(1.05, -0.1), frameon = False, 
-              ncols = 3)
-
-    # SET EMISSIONS GRAPH
-    df4 = df4.loc[df4['COUNTRY'] == country][['YEAR', 'VALUE']]
-    df5 = df5.loc[df5['COUNTRY'] == country][['YEAR', 'VALUE']]
-    
-    df4.set_index('YEAR', inplace = True)
-    df5.set_index('YEAR', inplace = True)
+    frames4 = split_by_country(df4.rename(columns = {'VALUE' : unit4}), [unit4])
+    frames5 = split_by_country(df5, ['VALUE'])
     
-    axs[1, 1].bar(df4.index, df4['VALUE'], label= unit4, 
-                  color = color_dict3.get('bar'), edgecolor = 'black', linewidth = 0.3)
-      
-    ax2 = axs[1, 1].twinx()
-    
-    ax2.plot(df5.index, df5['VALUE'], label= unit5, 
-             color = color_dict3.get('line'))
-    
-    axs[1, 1].set_ylabel(unit4)
-    ax2.set_ylabel(unit5)
-    axs[1, 1].legend(bbox_to_anchor=(0.5, -0.1), frameon = False)
-    
-    ax2.legend(bbox_to_anchor=(0.9, -0.1), frameon = False)
-
-    # PLT ADJUSTMENTS
-    for ax in axs.ravel():
-        ax.margins(x = 0)
+    # Countries with the same years and technologies are drawn on the same 
+    # figure, only its artists are updated.
+    template = get_template(MultiPlotCountryChart)
+    for country in countries:
+        if any(country not in frames for frames in [frames1, frames2, frames3, 
+                                                    frames4, frames5]):
+            continue
         
-
-    axs[0, 0].text(-0.16, 0, 'a', transform=axs[0, 0].transAxes, 
-              name = 'Calibri', fontsize = 15, weight = 'bold')
-    
-    axs[0, 1].text(1.05, 0, 'b', transform=axs[0, 0].transAxes, 
-              name = 'Calibri', fontsize = 15, weight = 'bold')
-    
-    axs[1, 0].text(-0.16, -1.43, 'c', transform=axs[0, 0].transAxes, 
-              name = 'Calibri', fontsize = 15, weight = 'bold')
-    
-    axs[1, 1].text(1.05, -1.43, 'd', transform=axs[0, 0].transAxes, 
-              name = 'Calibri', fontsize = 15, weight = 'bold')
-       
-    plt.subplots_adjust(wspace=0.22, hspace = 0.42)
+        fig = template.draw(frames1[country], frames2[country], frames3[country], 
+                            frames4[country], frames5[country], 
+                            (unit1, unit2, unit3, unit4, unit5), 
+                            (color_dict1, color_dict2, color_dict3), country)
     
-    make_space_above(axs, topmargin=0.45) 
-    plt.suptitle(country, weight = 'bold')
-
-    return fig.savefig(os.path.join(base_path, file_name), bbox_inches = 'tight')
+        fig.savefig(os.path.join(base_path, country, file_name), 
+                    bbox_inches = 'tight')
 
+@managed_figure
 def format_multi_plot_scen_comparison(df1_dict, df2_dict, df3, df3_dict, 
                                       df4, df4_dict, unit1, unit2, unit3, unit4,
                                       color_dict1, color_dict2, color_dict3,
                                       base_path, file_name, chart_title, axis_sort):
     
     # SET PLOT BASE
-    fig, axs = plt.subplots(2, 2, squeeze = False, 
+    fig, axs = subplots(2, 2, squeeze = False, 
                             gridspec_kw = {'height_ratios' : [1, 1], 
                                            'width_ratios' : [1, 1]},
                             figsize = (10, 8)
@@ -1625,26 +1125,8 @@ def format_multi_plot_scen_comparison(df1_dict, df2_dict, df3, df3_dict,
     
     for key, value in df1_dict.items():
 
-        capacity1 = value.loc[value['DELTA'] < 0]
-        capacity2 = value.loc[value['DELTA'] > 0]
-       
-        capacity1 = capacity1.groupby(['TECH'])['DELTA'].sum().fillna(0)
-        capacity2 = capacity2.groupby(['TECH'])['DELTA'].sum().fillna(0)
-        
-        for idx in value.index:
-            if not capacity1.empty:
-                if not idx in capacity1.index:
-                    capacity1.loc[idx] = 0
-             
-            if not capacity2.empty:
-                if not idx in capacity2.index:
-                    capacity2.loc[idx] = 0
-        
-        capacity1 = pd.DataFrame(capacity1).transpose()
-        capacity2 = pd.DataFrame(capacity2).transpose()
-        
-        capacity1.rename(index = {'DELTA' : key}, inplace = True)
-        capacity2.rename(index = {'DELTA' : key}, inplace = True)
+        capacity1, capacity2 = [df.rename(index = {'DELTA' : key})
+                                  for df in split_delta_total(value)]
 
         if plot_df1a is None:
             plot_df1a = capacity1.copy()
@@ -1655,26 +1137,8 @@ def format_multi_plot_scen_comparison(df1_dict, df2_dict, df3, df3_dict,
             
     for key, value in df2_dict.items():
 
-        generation1 = value.loc[value['DELTA'] < 0]
-        generation2 = value.loc[value['DELTA'] > 0]
-       
-        generation1 = generation1.groupby(['TECH'])['DELTA'].sum().fillna(0)
-        generation2 = generation2.groupby(['TECH'])['DELTA'].sum().fillna(0)
-        
-        for idx in value.index:
-            if not generation1.empty:
-                if not idx in generation1.index:
-                    generation1.loc[idx] = 0
-             
-            if not generation2.empty:
-                if not idx in generation2.index:
-                    generation2.loc[idx] = 0
-        
-        generation1 = pd.DataFrame(generation1).transpose()
-        generation2 = pd.DataFrame(generation2).transpose()
-        
-        generation1.rename(index = {'DELTA' : key}, inplace = True)
-        generation2.rename(index = {'DELTA' : key}, inplace = True)
+        generation1, generation2 = [df.rename(index = {'DELTA' : key})
+                                      for df in split_delta_total(value)]
 
         if plot_df2a is None:
             plot_df2a = generation1.copy()
@@ -1705,37 +1169,13 @@ def format_multi_plot_scen_comparison(df1_dict, df2_dict, df3, df3_dict,
     plot_df2a =  plot_df2a.reindex(plot_sum2.index).reindex(sorted(plot_df2a.columns), axis=1)
     plot_df2b =  plot_df2b.reindex(plot_sum2.index).reindex(sorted(plot_df2b.columns), axis=1)    
         
-    # Initialize the bottom at zero for the first set of bars.
-    capacity_bot1 = 0
-    capacity_bot2 = 0
-    generation_bot1 = 0
-    generation_bot2 = 0
-    
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    for i, col in enumerate(plot_df1a.columns):
-      axs[0, 0].bar(plot_df1a.index, plot_df1a[col], bottom=capacity_bot1, 
-                    label=col, color = color_dict1.get(col), edgecolor = 'black', 
-                    linewidth = 0.3)
-      capacity_bot1 += np.array(plot_df1a[col])
+    stacked_bars(axs[0, 0], plot_df1a, color_dict1)
       
-    for i, col in enumerate(plot_df1b.columns):
-      axs[0, 0].bar(plot_df1b.index, plot_df1b[col], bottom=capacity_bot2, 
-             color = color_dict1.get(col), edgecolor = 'black', 
-             linewidth = 0.3)
-      capacity_bot2 += np.array(plot_df1b[col])
+    stacked_bars(axs[0, 0], plot_df1b, color_dict1, label = False)
       
-    for i, col in enumerate(plot_df2a.columns):
-      axs[0, 1].bar(plot_df2a.index, plot_df2a[col], bottom=generation_bot1, 
-                    label=col, color = color_dict1.get(col), edgecolor = 'black', 
-                    linewidth = 0.3)
-      generation_bot1 += np.array(plot_df2a[col])
+    stacked_bars(axs[0, 1], plot_df2a, color_dict1)
       
-    for i, col in enumerate(plot_df2b.columns):
-      axs[0, 1].bar(plot_df2b.index, plot_df2b[col], bottom=generation_bot2, 
-             color = color_dict1.get(col), edgecolor = 'black', 
-             linewidth = 0.3)
-      generation_bot2 += np.array(plot_df2b[col])   
+    stacked_bars(axs[0, 1], plot_df2b, color_dict1, label = False)
       
     axs[0, 1].legend(bbox_to_anchor=(0.85, -0.47), frameon = False, 
                      ncols = 7)
@@ -1795,21 +1235,9 @@ def format_multi_plot_scen_comparison(df1_dict, df2_dict, df3, df3_dict,
     else:
         plot_df3a = plot_df3a.sort_index()
     
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
-    gen_shares_bot1 = 0
-    gen_shares_bot2 = 0
-    
-    for i, col in enumerate(plot_df3a.columns):           
-      axs[1, 0].bar(plot_df3a.index, plot_df3a[col], bottom = gen_shares_bot1,
-              color = color_dict2.get(col), label = col, edgecolor = 'black',
-              linewidth = 0.3)
-      gen_shares_bot1 += np.array(plot_df3a[col])
+    stacked_bars(axs[1, 0], plot_df3a, color_dict2)
       
-    for i, col in enumerate(plot_df3b.columns):
-      axs[1, 0].bar(plot_df3b.index, plot_df3b[col], bottom = gen_shares_bot2,
-             color = color_dict2.get(col), edgecolor = 'black', linewidth = 0.3)
-      gen_shares_bot2 += np.array(plot_df3b[col])
+    stacked_bars(axs[1, 0], plot_df3b, color_dict2, label = False)
       
     # Subplot formatting
     axs[1, 0].set_ylim([min(plot_df3a.sum(axis=1), default = 0) * 1.1, 
@@ -1865,70 +1293,47 @@ def format_multi_plot_scen_comparison(df1_dict, df2_dict, df3, df3_dict,
     axs[1, 1].text(1.05, -1.72, 'd', transform=axs[0, 0].transAxes, 
               name = 'Calibri', fontsize = 15, weight = 'bold')
        
-    plt.subplots_adjust(wspace=0.24, hspace = 0.72)
+    fig.subplots_adjust(wspace=0.24, hspace = 0.72)
     
     # Add plot title
     if chart_title:
         make_space_above(axs, topmargin=0.4) 
-        plt.suptitle(chart_title)
+        fig.suptitle(chart_title)
 
     return fig.savefig(os.path.join(base_path, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_bar_delta_multi_scenario_sensitivities(df1_dict, df2_dict, out_dir, 
                                                   chart_title, file_name, 
                                                   color_dict, unit, axis_sort,
                                                   runs, BASE):
 
-    plot_df = pd.DataFrame()
-    
-    for run in runs:
-        
-        df1_dict[run].set_index('YEAR', inplace = True)
-        data = pd.DataFrame(columns = ['VALUE'])
-
-        for key in df2_dict[run]:
-    
-            df2_dict[run][key].set_index('YEAR', inplace = True)
-               
-            # Calculate Delta by year
-            df = df2_dict[run][key][['VALUE']] - df1_dict[run][['VALUE']]
-            
-            # Calculate model horizon Delta
-            df3 = df.sum().fillna(0)
-            data.loc[key] = df3
-            
-        if plot_df.empty:
-            plot_df = data.copy().rename(columns = {'VALUE' : run})
-        
-        else:
-            plot_df = pd.merge(plot_df, data, left_index = True, right_index = True, how = 'outer'
-                               ).rename(columns = {'VALUE' : run})
-    
-    plot_df.sort_index(inplace = True)
+    plot_df = sensitivity_delta(df1_dict, df2_dict, runs)
     plot_df = plot_df.reset_index(drop = False).rename(columns = {'index' : 'run'})
 
     if axis_sort == True:
         plot_df = plot_df.sort_values(by = [BASE])
 
-    plt.rcParams['figure.figsize'] = [8, 3]
+    fig, ax = subplots(figsize = (8, 3))
     
-    ax = plot_df.plot(x = 'run', kind = 'bar', width = 0.7,
+    plot_df.plot(x = 'run', kind = 'bar', width = 0.7, ax = ax,
                  color = [color_dict[run] for run in plot_df[runs]],
                  edgecolor = 'black', linewidth = 0.3
                  )
     
-    plt.legend(bbox_to_anchor=(0.97, -0.45), frameon = False, 
+    ax.legend(bbox_to_anchor=(0.97, -0.45), frameon = False, 
               ncols = 3)
     
-    plt.xticks(rotation = 75)
-    plt.margins(x=0)
+    ax.tick_params(axis = 'x', labelrotation = 75)
+    ax.margins(x=0)
     ax.axhline(y=0, color='black', linestyle='-', linewidth = 0.5)
-    plt.ylabel(unit)
-    plt.xlabel('')
-    plt.title(chart_title)
+    ax.set_ylabel(unit)
+    ax.set_xlabel('')
+    ax.set_title(chart_title)
 
-    return plt.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
+    return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_stacked_bar_gen_shares_delta_multi_scenario_sensitivities(df1_dict, df2_dict, out_dir, 
                                                                      chart_title, file_name, 
                                                                      color_dict, hatch_dict, 
@@ -1983,10 +1388,8 @@ def format_stacked_bar_gen_shares_delta_multi_scenario_sensitivities(df1_dict, d
     plot_df1 = plot_df1.reset_index(drop = False).rename(columns = {'index' : 'scenario'})
     plot_df2 = plot_df2.reset_index(drop = False).rename(columns = {'index' : 'scenario'})   
        
-    # Plot each layer of the bar, adding each bar to the 'bottom' so
-    # the next bar starts higher.
 
-    fig, ax = plt.subplots(figsize=(8, 3))  
+    fig, ax = subplots(figsize=(8, 3))  
 
     for group in ['Other', 'Fossil', 'Renewable']:
         
@@ -2032,7 +1435,7 @@ def format_stacked_bar_gen_shares_delta_multi_scenario_sensitivities(df1_dict, d
     fig.legend(handles = legend, bbox_to_anchor=(0.73, -0.24), 
                      frameon = False, ncols = 3)
 
-    handles, labels = plt.gca().get_legend_handles_labels()
+    handles, labels = fig.gca().get_legend_handles_labels()
     by_label = dict(zip(labels, handles))
     by_label = dict(sorted(by_label.items()))
     
@@ -2047,62 +1450,45 @@ def format_stacked_bar_gen_shares_delta_multi_scenario_sensitivities(df1_dict, d
         n = n + 1
     
     # Figure adjustments
-    plt.xticks(rotation = 75)
+    ax.tick_params(axis = 'x', labelrotation = 75)
     ax.margins(x=0)
     ax.axhline(y=0, color='black', linestyle='-', linewidth = 0.5)
     ax.set_ylabel(unit)
     ax.set_xlabel('')
     ax.set_title(chart_title)
 
-    return plt.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
+    return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_bar_delta_multi_scenario_geo_sensitivity(df1, df2_dict, df3_dict, 
                                                     df4_dict, out_dir, 
                                                     chart_title, file_name, color_dict,
                                                     unit, axis_sort, BASE):
     
-    df1.set_index('YEAR', inplace = True)
-    
-    for key in df3_dict:
-        df3_dict[key].set_index('YEAR', inplace = True)
-
-    plot_df = pd.DataFrame(columns = [BASE, 'Bilateral'])
-    
-    for key in df2_dict:
-        
-        df2_dict[key].set_index('YEAR', inplace = True)
-        df4_dict[key].set_index('YEAR', inplace = True)
-        
-        df1_out = df2_dict[key][['VALUE']] - df1[['VALUE']]
-        
-        df2_out = df4_dict[key][['VALUE']] - df3_dict[key][['VALUE']]
-
-        # Calculate model horizon Delta
-        df1_out = df1_out.sum().fillna(0)
-        df2_out = df2_out.sum().fillna(0)
- 
-        plot_df.loc[key] = [df1_out.iloc[0], df2_out.iloc[0]]
-
+    plot_df = geo_sensitivity_delta(df1, df2_dict, df3_dict, df4_dict, BASE)
 
     if axis_sort == True:
         plot_df = plot_df.sort_values(by = [BASE])
     else:
         plot_df = plot_df.sort_index()
     
-    ax = plot_df.plot(use_index = True, kind = 'bar', width = 0.7,
+    fig, ax = subplots()
+    
+    plot_df.plot(use_index = True, kind = 'bar', width = 0.7, ax = ax,
                  edgecolor = 'black', linewidth = 0.3, 
                  color = [color_dict[run] for run in plot_df.columns],
                  )
 
-    plt.legend(frameon = False)
-    plt.xticks(rotation = 75)
+    ax.legend(frameon = False)
+    ax.tick_params(axis = 'x', labelrotation = 75)
     ax.margins(x=0)
     ax.axhline(y=0, color='black', linestyle='-', linewidth = 0.1)
     ax.set_ylabel(unit)
     ax.set_title(chart_title)
 
-    return plt.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
+    return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_bar_delta_multi_scenario_sensitivities_trn_capacity(df1_dict, out_dir, 
                                                                chart_title, file_name, 
                                                                color_dict, unit, axis_sort,
@@ -2133,25 +1519,26 @@ def format_bar_delta_multi_scenario_sensitivities_trn_capacity(df1_dict, out_dir
     if axis_sort == True:
         plot_df = plot_df.sort_values(by = [BASE])
 
-    plt.rcParams['figure.figsize'] = [8, 3]
+    fig, ax = subplots(figsize = (8, 3))
 
-    ax = plot_df.plot(x = 'run', kind = 'bar', width = 0.8,
+    plot_df.plot(x = 'run', kind = 'bar', width = 0.8, ax = ax,
                  color = [color_dict[run] for run in plot_df[runs]],
                  edgecolor = 'black', linewidth = 0.3
                  )
     
-    plt.legend(bbox_to_anchor=(0.97, -0.45), frameon = False, 
+    ax.legend(bbox_to_anchor=(0.97, -0.45), frameon = False, 
               ncols = 3)
     
-    plt.xticks(rotation = 75)
-    plt.margins(x=0)
+    ax.tick_params(axis = 'x', labelrotation = 75)
+    ax.margins(x=0)
     ax.axhline(y=0, color='black', linestyle='-', linewidth = 0.5)
-    plt.ylabel(unit)
-    plt.xlabel('')
-    plt.title(chart_title)
+    ax.set_ylabel(unit)
+    ax.set_xlabel('')
+    ax.set_title(chart_title)
 
-    return plt.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
+    return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
 
+@managed_figure
 def format_bar_delta_multi_scenario_sensitivities_multi_plot(df1_dict, df2_dict, df3_dict, df4_dict,
                                                              df5, df6_dict, df7_dict, df8_dict, 
                                                              out_dir, file_name, color_dict1, color_dict2, 
@@ -2287,7 +1674,7 @@ def format_bar_delta_multi_scenario_sensitivities_multi_plot(df1_dict, df2_dict,
     plot_df3 = plot_df3.reset_index(drop = True)  
     plot_df4 = plot_df4.sort_index()
 
-    fig, axs = plt.subplots(3, 1, squeeze = False, sharex = True,
+    fig, axs = subplots(3, 1, squeeze = False, sharex = True,
                             gridspec_kw = {'height_ratios' : [1, 1, 1]},
                             figsize=(9, 9))
     
@@ -2407,7 +1794,7 @@ def format_bar_delta_multi_scenario_sensitivities_multi_plot(df1_dict, df2_dict,
     axs[1, 0].set_ylabel(unit2)
     axs[2, 0].set_ylabel(unit3)
     
-    plt.subplots_adjust(hspace=0.05)
+    fig.subplots_adjust(hspace=0.05)
     
     # ADD LABELS
     axs[0, 0].text(-0.03, -0.03, 'a', transform=axs[0, 0].transAxes, 
@@ -2419,4 +1806,4 @@ def format_bar_delta_multi_scenario_sensitivities_multi_plot(df1_dict, df2_dict,
     axs[2, 0].text(-0.03, -0.03, 'c', transform=axs[2, 0].transAxes, 
               name = 'Calibri', fontsize = 15, weight = 'bold')
     
-    return plt.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
\ No newline at end of file
+    return fig.savefig(os.path.join(out_dir, file_name), bbox_inches = 'tight')
\ No newline at end of file
@@ -0,0 +1,162 @@
+'''Plot-ready frames of the delta charts in data.py, built from the output of
+calculate_results_delta (DELTA indexed by its cols)'''
+import numpy as np
+import pandas as pd
+
+def delta_grid(df, levels : list, values : dict = None):
+    '''Negative and positive DELTA of df summed over the full product of
+    levels, as an array (len(level 1), ..., len(level n), 2) holding the
+    negative sums in [..., 0] and the positive sums in [..., 1], and the
+    values of every level ({level : values}, sorted).
+
+    The values of a level are those found in df, plus any given in values
+    (e.g. all years of the model horizon). Cells without rows are 0.'''
+    values = values or {}
+
+    delta = df['DELTA']
+    signed = pd.DataFrame({'NEG' : delta.clip(upper = 0),
+                           'POS' : delta.clip(lower = 0)})
+    signed = signed.groupby(level = levels, observed = True).sum()
+
+    axes = {}
+    for level in levels:
+        found = signed.index.get_level_values(level)
+        axes[level] = pd.Index(found.unique()).append(
+            pd.Index(values.get(level, []))).unique().sort_values()
+
+    signed.index = pd.MultiIndex.from_arrays(
+        [np.asarray(signed.index.get_level_values(level)) for level in levels],
+        names = levels)
+    grid = pd.MultiIndex.from_product(axes.values(), names = levels)
+    signed = signed.reindex(grid, fill_value = 0)
+
+    shape = [len(axis) for axis in axes.values()] + [2]
+
+    return signed.to_numpy(dtype = float).reshape(shape), axes
+
+def _sign_frame(values, index, columns, keep_rows):
+    '''Frame of a (rows x columns) slice of the grid for one sign, without the
+    columns that are all 0 and the rows that are all 0 unless kept. Empty if
+    the sign has no values at all.'''
+    nonzero = values != 0
+    if not nonzero.any():
+        return pd.DataFrame()
+
+    rows = keep_rows | nonzero.any(axis = 1)
+    cols = nonzero.any(axis = 0)
+
+    return pd.DataFrame(values[np.ix_(rows, cols)], index = index[rows],
+                        columns = columns[cols])
+
+def split_delta(df, index = 'YEAR', columns = 'TECH', index_values = None,
+                spatial = None):
+    '''Negative and positive DELTA of df by index x columns as two frames,
+    (neg, pos), for stacked bars. Only columns with values of that sign are
+    included, every row of index_values (e.g. the years of the model
+    horizon) is included. A frame is empty if there are no values of its
+    sign.
+
+    With spatial (e.g. COUNTRY or NODE) a dict of entry : (neg, pos) with
+    one pair per entry of that level is returned instead, all built from a
+    single grid.'''
+    levels = [columns, index] if spatial is None else [spatial, columns, index]
+    grid, axes = delta_grid(df, levels, {index : index_values or []})
+
+    # (spatial, index, columns, sign)
+    grid = np.moveaxis(grid, -2, -3)
+    if spatial is None:
+        grid = grid[None]
+
+    keep_rows = axes[index].isin(index_values or [])
+
+    frames = {}
+    for i, entry in enumerate(axes.get(spatial, [None])):
+        frames[entry] = tuple(_sign_frame(grid[i, ..., sign], axes[index],
+                                          axes[columns], keep_rows)
+                              for sign in range(2))
+
+    return frames[None] if spatial is None else frames
+
+def split_delta_total(df, columns = 'TECH', spatial = None, entries = None):
+    '''Negative and positive DELTA of df summed by columns as two frames with
+    a single row, (neg, pos), for a stacked total bar. A frame has a column
+    for every value of columns in df (0 where there is nothing of that sign)
+    unless there are no values of its sign at all, then it has none.
+
+    With spatial a dict of entry : (neg, pos) is returned instead, with a
+    pair for every entry in df and in entries. Every frame then has a column
+    for every value of columns in df.'''
+    levels = [columns] if spatial is None else [spatial, columns]
+    grid, axes = delta_grid(df, levels, {spatial : entries or []})
+
+    if spatial is None:
+        grid = grid[None]
+
+    frames = {}
+    for i, entry in enumerate(axes.get(spatial, [None])):
+        pair = []
+        for sign in range(2):
+            values = grid[i, :, sign]
+            if spatial is None and not values.any():
+                pair.append(pd.DataFrame(index = ['DELTA']))
+            else:
+                pair.append(pd.DataFrame([values], index = ['DELTA'],
+                                         columns = axes[columns]))
+        frames[entry] = tuple(pair)
+
+    return frames[None] if spatial is None else frames
+
+def horizon_delta(df1, df2):
+    '''Delta of VALUE (df2 - df1) summed over the model horizon, for two 
+    tables with a YEAR column. Years missing from either table are left 
+    out.'''
+    df = df2.set_index('YEAR')[['VALUE']] - df1.set_index('YEAR')[['VALUE']]
+
+    return df['VALUE'].sum()
+
+def multi_scenario_delta(df1, df2_dict : dict):
+    '''Frame of the horizon_delta of every scenario in df2_dict (one row per 
+    scenario, column VALUE) to the base model df1, or to df1[scenario] if 
+    df1 is a dict.'''
+    values = {}
+    for key, df2 in df2_dict.items():
+        base = df1[key] if isinstance(df1, dict) else df1
+        values[key] = horizon_delta(base, df2)
+
+    return pd.DataFrame({'VALUE' : pd.Series(values, dtype = float)})
+
+def sensitivity_delta(df1_dict : dict, df2_dict : dict, runs : list):
+    '''Frame of the horizon_delta of every scenario (rows) to the base model 
+    of every run (columns), from df1_dict[run] and df2_dict[run][scenario]. 
+    Scenarios without results for a run are NaN.'''
+    df = pd.concat({run : multi_scenario_delta(df1_dict[run], df2_dict[run])['VALUE']
+                    for run in runs}, axis = 1)
+
+    return df.sort_index()
+
+def geo_sensitivity_delta(df1, df2_dict : dict, df3_dict : dict, 
+                          df4_dict : dict, BASE):
+    '''Frame of the horizon_delta of every scenario to the base model (df1 
+    and df2_dict, column BASE) and to its bilateral base model (df3_dict 
+    and df4_dict, column Bilateral).'''
+    return pd.DataFrame({BASE : multi_scenario_delta(df1, df2_dict)['VALUE'],
+                         'Bilateral' : multi_scenario_delta(df3_dict, df4_dict)['VALUE']})
+
+def gen_shares_table(df):
+    '''Headline metrics (Metric, Unit, Value) indexed by Metric, with the 
+    generation shares renamed to Renewable and Fossil and a row Other for 
+    the share that is neither.'''
+    df = df.assign(Metric = df['Metric'].replace({'Renewable energy share' : 'Renewable',
+                                                  'Fossil energy share' : 'Fossil'}))
+    df = df.set_index('Metric').drop(columns = ['Unit'])
+
+    other = 100 - df.loc[df.index == 'Renewable'].iloc[0] - df.loc[df.index == 'Fossil'].iloc[0]
+
+    return pd.concat([df, other.to_frame('Other').transpose()])
+
+def gen_shares_delta(df1, df2):
+    '''Delta (df2 - df1) of the generation shares of two headline metrics 
+    tables, with a column per share (Renewable, Fossil, Other).'''
+    df = gen_shares_table(df2) - gen_shares_table(df1)
+
+    return df.transpose()[['Renewable', 'Fossil', 'Other']]
@@ -0,0 +1,216 @@
+'''Figure lifecycle for the formatters in data.py'''
+import functools
+import itertools
+from abc import ABC, abstractmethod
+
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.collections import PolyCollection
+
+def subplots(nrows = 1, ncols = 1, figsize = None, **kwargs):
+    '''Same as plt.subplots, but the Figure is not registered with pyplot, so
+    it is freed as soon as the formatter returns.'''
+    fig = Figure(figsize = figsize)
+    axs = fig.subplots(nrows, ncols, **kwargs)
+
+    return fig, axs
+
+def figure(figsize = None):
+    return Figure(figsize = figsize)
+
+def managed_figure(func):
+    '''Decorator for formatters: any pyplot figure opened by the formatter
+    (e.g. by pandas plotting) is closed once it returns or raises.'''
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        open_figures = set(plt.get_fignums())
+        try:
+            return func(*args, **kwargs)
+        finally:
+            for num in set(plt.get_fignums()) - open_figures:
+                plt.close(num)
+
+    return wrapper
+
+def stack_offsets(values, split = False):
+    '''Bottoms of stacked bars for a 2D array (x positions x series), one 
+    cumulative sum over the series. By default every series is stacked on 
+    top of the previous ones whatever its sign. With split = True positive 
+    values are stacked upwards and negative values downwards from 0.'''
+    values = np.asarray(values, dtype = float)
+    
+    def exclusive_cumsum(values):
+        bottoms = np.zeros_like(values)
+        np.cumsum(values[:, :-1], axis = 1, out = bottoms[:, 1:])
+        
+        return bottoms
+
+    if not split:
+        return exclusive_cumsum(values)
+
+    return np.where(values >= 0, exclusive_cumsum(values.clip(min = 0)),
+                    exclusive_cumsum(values.clip(max = 0)))
+
+def _positions(ax, x, horizontal):
+    # Category labels (e.g. 'Total') are converted like ax.bar does.
+    x = np.atleast_1d(np.asarray(x))
+    axis = ax.yaxis if horizontal else ax.xaxis
+    axis.update_units(x)
+
+    return np.asarray(axis.convert_units(x), dtype = float)
+
+def _bar_verts(x, bottoms, heights, width, horizontal):
+    '''Corners of the bars of every series: (series, x, 4, 2).'''
+    x0 = np.broadcast_to((x - width / 2)[:, None], bottoms.shape)
+    x1 = x0 + width
+    y0 = bottoms
+    y1 = bottoms + heights
+
+    verts = np.stack([np.stack([x0, y0], axis = -1), np.stack([x1, y0], axis = -1),
+                      np.stack([x1, y1], axis = -1), np.stack([x0, y1], axis = -1)],
+                     axis = -2).swapaxes(0, 1)
+
+    return verts[..., ::-1] if horizontal else verts
+
+def stacked_bars(ax, df, color_dict, x = None, split = False, label = True,
+                 horizontal = False, width = 0.8, edgecolor = 'black', 
+                 linewidth = 0.3, **kwargs):
+    '''Draw the columns of df as stacked bars on ax, at x (df.index by default,
+    category labels such as 'Total' are allowed) and return a dict of column : 
+    collection.
+
+    The offsets of all bars come from stack_offsets (see there for split) and 
+    each column is drawn as a single PolyCollection instead of one Rectangle 
+    per bar. Columns are labelled for the legend unless label is False. 
+    Bars are horizontal (as ax.barh) if horizontal is set. Columns without a 
+    colour in color_dict take the next colour of the axes.prop_cycle.'''
+    values = np.asarray(df, dtype = float)
+    positions = _positions(ax, df.index if x is None else x, horizontal)
+    bottoms = stack_offsets(values, split = split)
+    verts = _bar_verts(positions, bottoms, values, width, horizontal)
+
+    cycle = itertools.cycle(plt.rcParams['axes.prop_cycle'].by_key()['color'])
+
+    collections = {}
+    for i, col in enumerate(df.columns):
+        color = color_dict.get(col) 
+        if color is None:
+            color = next(cycle)
+
+        collection = PolyCollection(verts[i], facecolors = color, 
+                                    edgecolors = edgecolor, 
+                                    linewidths = linewidth, 
+                                    label = col if label else None, **kwargs)
+        
+        # As ax.bar, the bottom of every bar is sticky for autoscaling.
+        sticky = collection.sticky_edges.x if horizontal else collection.sticky_edges.y
+        sticky[:] = bottoms[:, i]
+        
+        ax.add_collection(collection, autolim = False)
+        collections[col] = collection
+
+    _update_datalim(ax, collections.values())
+    ax.autoscale_view()
+
+    return collections
+
+def _update_datalim(ax, collections):
+    for collection in collections:
+        if collection.get_visible():
+            for path in collection.get_paths():
+                ax.update_datalim(path.vertices)
+
+class StackedBars:
+    '''Stacked bars of a pivoted frame (index on the x axis, one bar per 
+    column) drawn once on ax by stacked_bars and updated in place for later 
+    frames with the same index and columns. Columns that are all NaN are 
+    treated as missing, their bars are hidden and left out of the legend, 
+    other NaNs count as 0.'''
+
+    def __init__(self, ax, df, color_dict, label = True, split = False):
+        self.ax = ax
+        self.index = df.index
+        self.columns = df.columns
+        self.label = label
+        self.split = split
+        self.positions = _positions(ax, df.index, False)
+        self.collections = stacked_bars(ax, df.fillna(0), color_dict, 
+                                        label = label, split = split)
+        
+        self.update(df)
+
+    def matches(self, df):
+        return df.index.equals(self.index) and df.columns.equals(self.columns)
+
+    def update(self, df):
+        values = np.asarray(df.fillna(0), dtype = float)
+        bottoms = stack_offsets(values, split = self.split)
+        verts = _bar_verts(self.positions, bottoms, values, 0.8, False)
+        
+        for i, (col, collection) in enumerate(self.collections.items()):
+            visible = bool(df[col].notna().any())
+            
+            collection.set_verts(verts[i])
+            collection.set_visible(visible)
+            collection.sticky_edges.y[:] = bottoms[:, i] if visible else []
+
+            if self.label:
+                collection.set_label(col if visible else f'_{col}')
+
+        self.ax.relim(visible_only = True)
+        _update_datalim(self.ax, self.collections.values())
+        self.ax.autoscale_view()
+
+class FigureTemplate(ABC):
+    '''Layout of a chart type (axes, artists, labels, legend) that is built 
+    once and drawn again for new data by updating its artists in place and 
+    rescaling the axes.
+
+    Subclasses implement build(*data), update(*data) and layout(*data), 
+    which returns a hashable key of everything build() fixes (e.g. the years, 
+    technologies and colors). draw() builds the figure for the first data 
+    and whenever the key changes, otherwise it only updates it.'''
+
+    def __init__(self):
+        self.fig = None
+        self.key = None
+
+    @abstractmethod
+    def layout(self, *args):
+        '''Hashable key of everything build() fixes for this data.'''
+
+    @abstractmethod
+    def build(self, *args):
+        '''Create self.fig and its artists for this data.'''
+
+    @abstractmethod
+    def update(self, *args):
+        '''Set the artists of self.fig to this data and rescale the axes.'''
+
+    def draw(self, *args):
+        key = self.layout(*args)
+        if self.fig is None or key != self.key:
+            self.build(*args)
+            self.key = key
+        else:
+            self.update(*args)
+
+        return self.fig
+
+'''Templates of this process, one per chart type, so charts of the same type 
+for another country, scenario or run reuse the figure.'''
+_TEMPLATES = {}
+
+def get_template(template_type):
+    if template_type not in _TEMPLATES:
+        _TEMPLATES[template_type] = template_type()
+
+    return _TEMPLATES[template_type]
+
+def clear_templates():
+    _TEMPLATES.clear()
+
+def frame_layout(df):
+    '''Hashable key of the index and columns of a frame.'''
+    return (tuple(df.index), tuple(df.columns))
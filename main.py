@@ -9,19 +9,16 @@ the user can change the color mapping as used in different charts. Generated
 charts are saved to file.'''
 
 import os
+import time
+import pandas as pd
 os.chdir(r'C:\Users\maart\Github\osemosys_global_ggi_cf_vis')
 
 from user_config import(
     BASE,
     runs,
-    base_dir_results,
-    base_dir_results_summaries,
-    base_dir_data,
+    results_path,
     resources_data,
     custom_nodes_data,
-    scen_dir_data,
-    scen_dir_results,
-    scen_dir_results_summaries,
     base_model,
     base_run_dict,
     base_scen_comparison_dict,
@@ -37,8 +34,18 @@ from user_config import(
     scenarios,
     start_year,
     end_year,
+    trim_to_horizon,
     system_delta,
-    axis_sort_delta
+    axis_sort_delta,
+    cache_memory_budget,
+    sidecar_cache,
+    render_workers,
+    incremental_build,
+    load_workers,
+    result_store,
+    out_of_core,
+    memory_ceiling,
+    shared_table_mb
     )
 
 from constants import(
@@ -55,15 +62,16 @@ from constants import(
 
 from data import(
     format_stacked_bar_pwr,
+    format_stacked_bar_pwr_country,
     format_stacked_bar_demand,
     format_stacked_bar_gen_shares,
+    format_stacked_bar_gen_shares_country,
     format_stacked_bar_gen_shares_delta,
     format_bar_line,
     format_bar_delta,
     format_line_multi_country,
     format_line_emission_limit,
-    format_spatial_map_ASEAN,
-    format_spatial_map_ZIZABONA,    
+    format_spatial_map,
     format_stacked_bar_line_emissions,
     format_stacked_bar_pwr_delta,
     format_stacked_bar_pwr_delta_spatial,
@@ -84,174 +92,212 @@ from data import(
     )
 
 from utils import(
-    convert_pj_to_twh,
-    format_technology_col,
     format_annual_emissions,
     calculate_power_costs,
-    calculate_results_delta,
+    calculate_results_deltas,
+    calculate_nodal_deltas,
     convert_million_to_billion,
     get_node_list,
     geo_filter_tech_emissions
     )
 
 from read import (
-    read_capacity_country,
-    read_new_capacity,
-    read_specified_annual_demand,
-    read_technology_annual_activity,
-    read_generation_shares_country,
-    read_generation_shares_global,
-    read_pwr_cost_country,
-    read_total_cost_country,
-    read_pwr_cost_global,
-    read_total_cost_global,
-    read_total_discounted_cost,
-    read_annual_emissions,
-    read_annual_technology_emission,
-    read_annual_emission_limit,
-    read_annual_emission_intensity_country,
-    read_annual_emission_intensity_global,
-    read_headline_metrics,
-    read_max_capacity_investment,
-    read_centerpoints
+    read_centerpoints,
+    set_cache_budget,
+    set_sidecar_cache,
+    set_year_window,
+    set_result_store,
+    cache_info
     )
 
+from store import ResultStore
+
+from chunked import set_out_of_core
+
+from render import RenderScheduler
+
+from pipeline import Graph
+
+from results import (
+    load_result_sets,
+    build_transmission_index,
+    bulk_load
+    )
+
+'''Result tables of the base model and every scenario, per run. Tables are 
+only read for the enabled charts, each one once.'''
+base_results, scen_results = load_result_sets(results_path, base_model, 
+                                              scenarios.keys())
+
+'''Read result files and power totals from the result store, if one is set.'''
+if result_store:
+    set_result_store(ResultStore(result_store))
+
+'''Sum the largest tables chunk by chunk in out-of-core mode.'''
+set_out_of_core(out_of_core, max_mb = memory_ceiling)
+
+'''Each chart below is a node in the task graph. The tables it reads and the 
+nodes it takes as arguments (e.g. trn_index) are computed before it runs.'''
+graph = Graph(base_results, scen_results)
+charts = RenderScheduler(render_workers, manifest = f'Figures/{base_model}/manifest.json'
+                         if incremental_build else None, shared_mb = shared_table_mb)
+
 base_path = f'Figures/{base_model}/Base'
 multi_scenario_path = f'Figures/{base_model}/Comparison'
 sensitivities_path = f'Figures/{base_model}/Sensitivities'
 
-'''Check for and create output paths'''
-for country in countries:
-    try:
-        os.makedirs(os.path.join(base_path, country))
-    except FileExistsError:
-        pass
-
 scen_path = {}
-sensitivity_path = {}
 for scenario in scenarios.keys():
     scen_path[scenario] = f'Figures/{base_model}/{scenario}'
-    
-    try:
-        os.makedirs(scen_path[scenario])
-    except FileExistsError:
-        pass
-    
-try:
-    os.makedirs(multi_scenario_path)
-except FileExistsError:
-    pass
 
+sensitivity_path = {}
 for run in runs:
-    
-    try:
-        os.makedirs(f'{sensitivities_path}/{run}')
-    except FileExistsError:
-        pass
-
     if run in sensitivity_scenario_dict_runs:
         sensitivity_path[run] = {}
         for scenario in scenarios.keys():
             sensitivity_path[run][scenario] = f'{sensitivities_path}/{run}/{scenario}'
-    
-            try:
-                os.makedirs(sensitivity_path[run][scenario])
-            except FileExistsError:
-                pass
+
+@graph.node(runs = runs, tables = ['new_capacity', 'max_capacity_investment'])
+def trn_index():
+    return build_transmission_index(scen_results, scenarios)
+
+'''Deltas of the capacity and generation of every built scenario to the base 
+model per run, for all cols grouped by in the delta charts: 
+delta[run][scenario][cols]. Computed once per table and run from the finest 
+cols, shared by all charts.'''
+DELTA_COLS = [['COUNTRY', 'TECH', 'YEAR'], ['COUNTRY', 'TECH'], 
+              ['TECH', 'YEAR'], ['TECH']]
+
+@graph.node(runs = runs)
+def capacity_delta(trn_index):
+    return {run : calculate_results_deltas(
+        base_results[run].capacity, 
+        {scenario : scen_results[run][scenario].capacity 
+         for scenario in scenarios if trn_index[(run, scenario)]['built']}, 
+        DELTA_COLS) for run in runs}
+
+@graph.node(runs = runs)
+def generation_delta(trn_index):
+    return {run : calculate_results_deltas(
+        base_results[run].generation_twh, 
+        {scenario : scen_results[run][scenario].generation_twh 
+         for scenario in scenarios if trn_index[(run, scenario)]['built']}, 
+        DELTA_COLS) for run in runs}
+
+'''The same for the nodal tables of the scenarios in nodal_results, with the 
+nodes outside their nodal_results countries shown per country.'''
+NODAL_DELTA_COLS = [['NODE', 'TECH', 'YEAR'], ['NODE', 'TECH']]
+
+@graph.node(runs = runs)
+def capacity_nodal_delta(trn_index):
+    return {run : calculate_nodal_deltas(
+        base_results[run].capacity_nodal, 
+        {scenario : scen_results[run][scenario].capacity_nodal 
+         for scenario in scenarios if trn_index[(run, scenario)]['built'] 
+         and scenario in nodal_results}, 
+        NODAL_DELTA_COLS, nodal_results) for run in runs}
+
+@graph.node(runs = runs)
+def generation_nodal_delta(trn_index):
+    return {run : calculate_nodal_deltas(
+        base_results[run].generation_nodal_twh, 
+        {scenario : scen_results[run][scenario].generation_nodal_twh 
+         for scenario in scenarios if trn_index[(run, scenario)]['built'] 
+         and scenario in nodal_results}, 
+        NODAL_DELTA_COLS, nodal_results) for run in runs}
 
 '''Create charts for base model run.'''
-if base_run_dict.get('pwr_cap_bar_global') == 'yes':
-    df = read_capacity_country(base_dir_results_summaries[BASE])
+
+@graph.chart(base_run_dict, 'pwr_cap_bar_global', runs = [BASE])
+def base_pwr_cap_bar_global():
+    df = base_results[BASE].cached.capacity_country
     
     chart_title = 'Installed Capacity'
     legend_title = ''
     file_name = 'pwr_cap_bar'
     unit = 'GW'
     
-    format_stacked_bar_pwr(df, base_path, chart_title, 
-                           legend_title, file_name, 
-                           BAR_TECH_COLOR_DICT, unit, 
-                           country = None)
+    charts.submit(format_stacked_bar_pwr, df, base_path, chart_title, 
+                                          legend_title, file_name, 
+                                          BAR_TECH_COLOR_DICT, unit, 
+                                          country = None)
 
-if base_run_dict.get('pwr_cap_bar_country') == 'yes':
-    df = read_capacity_country(base_dir_results_summaries[BASE])
+@graph.chart(base_run_dict, 'pwr_cap_bar_country', runs = [BASE])
+def base_pwr_cap_bar_country():
+    df = base_results[BASE].cached.capacity_country
     
     chart_title = 'Installed Capacity'
     legend_title = ''
     file_name = 'pwr_cap_bar'
     unit = 'GW'    
     
-    for country in countries:
-   
-        format_stacked_bar_pwr(df, base_path, chart_title, 
-                               legend_title, file_name, 
-                               BAR_TECH_COLOR_DICT, unit, 
-                               country = country)
-        
-if base_run_dict.get('pwr_gen_bar_global') == 'yes':
-    df = read_technology_annual_activity(base_dir_results[BASE])
-    df = format_technology_col(df, node = None)
-   # df = convert_pj_to_twh(df)
+    charts.submit(format_stacked_bar_pwr_country, df, base_path, chart_title, 
+                                                  legend_title, file_name, 
+                                                  BAR_TECH_COLOR_DICT, unit, 
+                                                  countries = countries)
+
+@graph.chart(base_run_dict, 'pwr_gen_bar_global', runs = [BASE])
+def base_pwr_gen_bar_global():
+    df = base_results[BASE].cached.generation
+    # df = convert_pj_to_twh(df)
     
     chart_title = 'Generation'
     legend_title = ''
     file_name = 'pwr_gen_bar'
     unit = 'PJ'    
     
-    format_stacked_bar_pwr(df, base_path, chart_title, 
-                           legend_title, file_name, 
-                           BAR_TECH_COLOR_DICT, unit, 
-                           country = None)
-    
-if base_run_dict.get('pwr_gen_bar_country') == 'yes':
-    df = read_technology_annual_activity(base_dir_results[BASE])
-    df = format_technology_col(df, node = None)
-    df = convert_pj_to_twh(df)
+    charts.submit(format_stacked_bar_pwr, df, base_path, chart_title, 
+                                          legend_title, file_name, 
+                                          BAR_TECH_COLOR_DICT, unit, 
+                                          country = None)
+
+@graph.chart(base_run_dict, 'pwr_gen_bar_country', runs = [BASE])
+def base_pwr_gen_bar_country():
+    df = base_results[BASE].cached.generation_twh
     
     chart_title = 'Generation'
     legend_title = ''
     file_name = 'pwr_gen_bar'
     unit = 'TWh'    
     
-    for country in countries:
-        format_stacked_bar_pwr(df, base_path, chart_title, 
-                               legend_title, file_name, 
-                               BAR_TECH_COLOR_DICT, unit, 
-                               country = country)
+    charts.submit(format_stacked_bar_pwr_country, df, base_path, chart_title, 
+                                                  legend_title, file_name, 
+                                                  BAR_TECH_COLOR_DICT, unit, 
+                                                  countries = countries)
 
-if base_run_dict.get('pwr_gen_shares_global') == 'yes':
-    df = read_generation_shares_global(base_dir_results_summaries[BASE])
+@graph.chart(base_run_dict, 'pwr_gen_shares_global', runs = [BASE])
+def base_pwr_gen_shares_global():
+    df = base_results[BASE].cached.generation_shares_global
     
     chart_title = 'Generation Shares'
     legend_title = ''
     file_name = 'pwr_gen_shares'
     unit = '%'    
     
-    format_stacked_bar_gen_shares(df, base_path, chart_title, 
-                                  legend_title, file_name, 
-                                  BAR_GEN_SHARES_COLOR_DICT, unit, 
-                                  country = None)
-    
-if base_run_dict.get('pwr_gen_shares_country') == 'yes':
-    df = read_generation_shares_country(base_dir_results_summaries[BASE])
+    charts.submit(format_stacked_bar_gen_shares, df, base_path, chart_title, 
+                                                 legend_title, file_name, 
+                                                 BAR_GEN_SHARES_COLOR_DICT, unit, 
+                                                 country = None)
+
+@graph.chart(base_run_dict, 'pwr_gen_shares_country', runs = [BASE])
+def base_pwr_gen_shares_country():
+    df = base_results[BASE].cached.generation_shares_country
     
     chart_title = 'Generation Shares'
     legend_title = ''
     file_name = 'pwr_gen_shares'
     unit = '%'    
     
-    for country in countries:
-        format_stacked_bar_gen_shares(df, base_path, chart_title, 
-                                      legend_title, file_name, 
-                                      BAR_GEN_SHARES_COLOR_DICT, unit, 
-                                      country = country)
-        
-if base_run_dict.get('dual_costs_global') == 'yes':
-    df1 = read_total_discounted_cost(base_dir_results[BASE])
+    charts.submit(format_stacked_bar_gen_shares_country, df, base_path, chart_title, 
+                                                         legend_title, file_name, 
+                                                         BAR_GEN_SHARES_COLOR_DICT, unit, 
+                                                         countries = countries)
+
+@graph.chart(base_run_dict, 'dual_costs_global', runs = [BASE])
+def base_dual_costs_global():
+    df1 = base_results[BASE].total_discounted_cost
     
-    df2 = read_technology_annual_activity(base_dir_results[BASE])
-    df2 = format_technology_col(df2, node = None)
-    df2 = convert_pj_to_twh(df2)
+    df2 = base_results[BASE].generation_twh
     df2 = calculate_power_costs(df1, df2, STORAGE_LIST)
     
     convert_million_to_billion(df1)
@@ -262,14 +308,15 @@ if base_run_dict.get('dual_costs_global') == 'yes':
     unit1 = 'Billion $/Year'
     unit2 = '$/MWh'
     
-    format_bar_line(df1, df2, base_path, chart_title, 
-                    legend_title, file_name, 
-                    DUAL_COSTS_COLOR_DICT, unit1, 
-                    unit2, country = None)
-    
-if base_run_dict.get('dual_costs_country') == 'yes':
-    df1 = read_total_cost_country(base_dir_results_summaries[BASE])
-    df2 = read_pwr_cost_country(base_dir_results_summaries[BASE])
+    charts.submit(format_bar_line, df1, df2, base_path, chart_title, 
+                                   legend_title, file_name, 
+                                   DUAL_COSTS_COLOR_DICT, unit1, 
+                                   unit2, country = None)
+
+@graph.chart(base_run_dict, 'dual_costs_country', runs = [BASE])
+def base_dual_costs_country():
+    df1 = base_results[BASE].total_cost_country
+    df2 = base_results[BASE].cached.pwr_cost_country
     
     convert_million_to_billion(df1)
     
@@ -280,28 +327,29 @@ if base_run_dict.get('dual_costs_country') == 'yes':
     unit2 = '$/MWh'
     
     for country in countries:
-        format_bar_line(df1, df2, base_path, chart_title, 
-                        legend_title, file_name, 
-                        DUAL_COSTS_COLOR_DICT, unit1, 
-                        unit2, country = country)
-        
-if base_run_dict.get('pwr_costs_multi_country') == 'yes':
-    df = read_pwr_cost_country(base_dir_results_summaries[BASE])
+        charts.submit(format_bar_line, df1, df2, base_path, chart_title, 
+                                       legend_title, file_name, 
+                                       DUAL_COSTS_COLOR_DICT, unit1, 
+                                       unit2, country = country)
+
+@graph.chart(base_run_dict, 'pwr_costs_multi_country', runs = [BASE])
+def base_pwr_costs_multi_country():
+    df = base_results[BASE].cached.pwr_cost_country
     
     chart_title = 'Normalized Costs'
     legend_title = ''
     file_name = 'multi_country_costs'
     unit = '$/MWh'
     
-    format_line_multi_country(df, base_path, chart_title, 
-                              legend_title, file_name, 
-                              COUNTRY_COLOR_DICT, unit)
-    
-if base_run_dict.get('dual_emissions_global') == 'yes':
-    df1 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                  country = False)
+    charts.submit(format_line_multi_country, df, base_path, chart_title, 
+                                             legend_title, file_name, 
+                                             COUNTRY_COLOR_DICT, unit)
+
+@graph.chart(base_run_dict, 'dual_emissions_global', runs = [BASE])
+def base_dual_emissions_global():
+    df1 = base_results[BASE].cached.emissions_global
     
-    df2 = read_annual_emission_intensity_global(base_dir_results_summaries[BASE])
+    df2 = base_results[BASE].cached.annual_emission_intensity_global
     
     chart_title = 'Annual Emissions'
     legend_title = ''
@@ -309,17 +357,16 @@ if base_run_dict.get('dual_emissions_global') == 'yes':
     unit1 = 'Mt CO2'
     unit2 = 'gCO2/kWh'
     
-    format_bar_line(df1, df2, base_path, chart_title, 
-                    legend_title, file_name, 
-                    DUAL_EMISSIONS_COLOR_DICT, unit1, 
-                    unit2, country = None)
-    
-if base_run_dict.get('dual_emissions_country') == 'yes':
-    df1 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                  country = True)
+    charts.submit(format_bar_line, df1, df2, base_path, chart_title, 
+                                   legend_title, file_name, 
+                                   DUAL_EMISSIONS_COLOR_DICT, unit1, 
+                                   unit2, country = None)
+
+@graph.chart(base_run_dict, 'dual_emissions_country', runs = [BASE])
+def base_dual_emissions_country():
+    df1 = base_results[BASE].cached.emissions_country
     
-    df2 = format_annual_emissions(read_annual_emission_intensity_country(
-        base_dir_results_summaries[BASE]), country = True)
+    df2 = base_results[BASE].cached.emission_intensity_country
     
     chart_title = 'Annual Emissions'
     legend_title = ''
@@ -328,16 +375,16 @@ if base_run_dict.get('dual_emissions_country') == 'yes':
     unit2 = 'gCO2/kWh'
     
     for country in countries:
-        format_bar_line(df1, df2, base_path, chart_title, 
-                        legend_title, file_name, 
-                        DUAL_EMISSIONS_COLOR_DICT, unit1, 
-                        unit2, country = country)
-        
-if base_run_dict.get('dual_emissions_stacked') == 'yes':
-    df1 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                  country = True)
+        charts.submit(format_bar_line, df1, df2, base_path, chart_title, 
+                                       legend_title, file_name, 
+                                       DUAL_EMISSIONS_COLOR_DICT, unit1, 
+                                       unit2, country = country)
+
+@graph.chart(base_run_dict, 'dual_emissions_stacked', runs = [BASE])
+def base_dual_emissions_stacked():
+    df1 = base_results[BASE].cached.emissions_country
 
-    df2 = read_annual_emission_intensity_global(base_dir_results_summaries[BASE])
+    df2 = base_results[BASE].cached.annual_emission_intensity_global
     
     chart_title = 'Annual Emissions'
     legend_title = ''
@@ -345,281 +392,235 @@ if base_run_dict.get('dual_emissions_stacked') == 'yes':
     unit1 = 'Mt CO2'
     unit2 = 'gCO2/kWh'
     
-    format_stacked_bar_line_emissions(df1, df2, base_path, chart_title, 
-                                      legend_title, file_name, 
-                                      COUNTRY_COLOR_DICT, unit1, 
-                                      unit2)
-    
-if base_run_dict.get('demand_stacked') == 'yes':
-    df1 = read_specified_annual_demand(base_dir_data[BASE])
-    df1 = convert_pj_to_twh(df1)
+    charts.submit(format_stacked_bar_line_emissions, df1, df2, base_path, chart_title, 
+                                                     legend_title, file_name, 
+                                                     COUNTRY_COLOR_DICT, unit1, 
+                                                     unit2)
+
+@graph.chart(base_run_dict, 'demand_stacked', runs = [BASE])
+def base_demand_stacked():
+    df1 = base_results[BASE].cached.demand_twh
     
     chart_title = 'Electricity Demand'
     legend_title = ''
     file_name = 'demand_stacked'
     unit = 'PJ'
 
-    format_stacked_bar_demand(df1, base_path, chart_title, 
-                              legend_title, file_name, 
-                              COUNTRY_COLOR_DICT, unit)
-    
-if base_run_dict.get('emissions_limit') == 'yes':
-    df = read_annual_emission_limit(base_dir_data[BASE])
+    charts.submit(format_stacked_bar_demand, df1, base_path, chart_title, 
+                                             legend_title, file_name, 
+                                             COUNTRY_COLOR_DICT, unit)
+
+@graph.chart(base_run_dict, 'emissions_limit', runs = [BASE])
+def base_emissions_limit():
+    df = base_results[BASE].cached.annual_emission_limit
     
     chart_title = 'Emission Limit'
     legend_title = ''
     file_name = 'emission_limit'
     unit = 'Mt CO2'
     
-    format_line_emission_limit(df, base_path, chart_title, 
-                           legend_title, file_name, 
-                           COUNTRY_COLOR_DICT, unit)
-    
-if base_run_dict.get('spatial_map_ASEAN') == 'yes':
-    df1 = read_centerpoints(resources_data)
-    df2 = read_centerpoints(custom_nodes_data)
-    nodes = get_node_list(read_technology_annual_activity(base_dir_results[BASE]))
+    charts.submit(format_line_emission_limit, df, base_path, chart_title, 
+                                          legend_title, file_name, 
+                                          COUNTRY_COLOR_DICT, unit)
+
+@graph.chart(base_run_dict, 'spatial_map_ASEAN', runs = [BASE])
+def base_spatial_map_ASEAN():
+    df = pd.concat([read_centerpoints(resources_data), 
+                    read_centerpoints(custom_nodes_data)])
+    nodes = get_node_list(base_results[BASE].technology_annual_activity)
 
-    chart_title = 'System Map'
     file_name = 'system_map_ASEAN'
     label = 'a'
+    extent = [90, 142, -11, 27]
+    label_xy = (90.5, -11.5)
     
-    format_spatial_map_ASEAN(df1, df2, nodes, base_path, 
-                                    chart_title, file_name, 
-                                    COUNTRY_COLOR_DICT, label)
-    
-if base_run_dict.get('spatial_map_ZIZABONA') == 'yes':
-    df1 = read_centerpoints(resources_data)
+    charts.submit(format_spatial_map, df, nodes, base_path, file_name, 
+                                      COUNTRY_COLOR_DICT, label, extent, label_xy)
+
+@graph.chart(base_run_dict, 'spatial_map_ZIZABONA', runs = [BASE])
+def base_spatial_map_ZIZABONA():
+    df = read_centerpoints(resources_data)
     nodes = [x + 'XX' for x in zizabona_countries]
 
-    chart_title = 'System Map'
     file_name = 'system_map_ZIZABONA'
     label = 'b'
+    extent = [5, 45, -35, 10]
+    label_xy = (5.5, -36)
     
-    format_spatial_map_ZIZABONA(df1, nodes, base_path, 
-                                chart_title, file_name, 
-                                COUNTRY_COLOR_DICT, label)
-    
-if base_run_dict.get('multi_plot_cap_gen_genshares_emisssions') == 'yes':
-    
-    df1 = read_capacity_country(base_dir_results_summaries[BASE])
+    charts.submit(format_spatial_map, df, nodes, base_path, file_name, 
+                                      COUNTRY_COLOR_DICT, label, extent, label_xy)
+
+@graph.chart(base_run_dict, 'multi_plot_cap_gen_genshares_emisssions', runs = [BASE])
+def base_multi_plot_cap_gen_genshares_emissions():
+    df1 = base_results[BASE].cached.capacity_country
     unit1 = 'GW'
 
-    df2 = read_technology_annual_activity(base_dir_results[BASE])
-    df2 = format_technology_col(df2, node = None)
-    df2 = convert_pj_to_twh(df2)
+    df2 = base_results[BASE].cached.generation_twh
     unit2 = 'TWh'    
     
-    df3 = read_generation_shares_global(base_dir_results_summaries[BASE])
+    df3 = base_results[BASE].cached.generation_shares_global
     unit3 = '%'    
     
-    df4 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                  country = True)
+    df4 = base_results[BASE].cached.emissions_country
     unit4 = 'Mt CO2'
 
-    df5 = read_annual_emission_intensity_global(base_dir_results_summaries[BASE])
+    df5 = base_results[BASE].cached.annual_emission_intensity_global
     unit5 = 'gCO2/kWh'
     file_name = 'multi_plot_cap_gen_genshares_emissions'
     
     chart_title = ''
     
-    format_multi_plot_cap_gen_genshares_emissions(df1, df2, df3, df4, df5,
-                                                   unit1, unit2, unit3, unit4, unit5,
-                                                   base_path, file_name, chart_title,
-                                                   BAR_TECH_COLOR_DICT,
-                                                   BAR_GEN_SHARES_COLOR_DICT, 
-                                                   COUNTRY_COLOR_DICT)
-    
-if base_run_dict.get('multi_plot_country_charts') == 'yes':
-    
-    df1 = read_capacity_country(base_dir_results_summaries[BASE])
+    charts.submit(format_multi_plot_cap_gen_genshares_emissions, df1, df2, df3, df4, df5,
+                                                                  unit1, unit2, unit3, unit4, unit5,
+                                                                  base_path, file_name, chart_title,
+                                                                  BAR_TECH_COLOR_DICT,
+                                                                  BAR_GEN_SHARES_COLOR_DICT, 
+                                                                  COUNTRY_COLOR_DICT)
+
+@graph.chart(base_run_dict, 'multi_plot_country_charts', runs = [BASE])
+def base_multi_plot_country_charts():
+    df1 = base_results[BASE].cached.capacity_country
     unit1 = 'GW'
     
-    df2 = read_technology_annual_activity(base_dir_results[BASE])
-    df2 = format_technology_col(df2, node = None)
-    df2 = convert_pj_to_twh(df2)
+    df2 = base_results[BASE].cached.generation_twh
     unit2 = 'TWh'
     
-    df3 = read_generation_shares_country(base_dir_results_summaries[BASE])
+    df3 = base_results[BASE].cached.generation_shares_country
     unit3 = '%'
     
-    df4 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                              country = True)
+    df4 = base_results[BASE].cached.emissions_country
     unit4 = 'Mt CO2'
 
-    df5 = format_annual_emissions(read_annual_emission_intensity_country(
-    base_dir_results_summaries[BASE]), country = True)
+    df5 = base_results[BASE].cached.emission_intensity_country
     unit5 = 'gCO2/kWh'
     
     file_name = 'multi_plot_country_charts'
     
-    for country in countries:
+    charts.submit(format_multi_plot_country_charts, df1, df2, df3, df4, df5,
+                                                    unit1, unit2, unit3, unit4, unit5,
+                                                    base_path, file_name, 
+                                                    BAR_TECH_COLOR_DICT,
+                                                    BAR_GEN_SHARES_COLOR_DICT, 
+                                                    DUAL_EMISSIONS_COLOR_DICT, countries)
 
-        format_multi_plot_country_charts(df1, df2, df3, df4, df5,
-                                         unit1, unit2, unit3, unit4, unit5,
-                                         base_path, file_name, 
-                                         BAR_TECH_COLOR_DICT,
-                                         BAR_GEN_SHARES_COLOR_DICT, 
-                                         DUAL_EMISSIONS_COLOR_DICT, country)
-        
-    
 '''Create charts for single scenario comparison to base.'''
-for scenario, trn in scenarios.items():
-    capacity_trn = read_new_capacity(scen_dir_results[BASE].get(scenario))
-    if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
 
-        if base_scen_comparison_dict.get('pwr_cap_bar_dif_global') == 'yes':
-            df1 = read_new_capacity(base_dir_results[BASE])
-            df1 = format_technology_col(df1, node = None)
-            
-            df2 = read_new_capacity(scen_dir_results[BASE].get(scenario))
-            df2 = format_technology_col(df2, node = None)
-            
-            df3 = calculate_results_delta(df1, df2, ['TECH', 'YEAR'],
-                                          scenario, nodal_results, node = None)
+@graph.chart(base_scen_comparison_dict, 'pwr_cap_bar_dif_global', runs = [BASE])
+def scen_pwr_cap_bar_dif_global(trn_index, capacity_delta):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            df3 = capacity_delta[BASE][scenario][('TECH', 'YEAR')]
             
-            df4 = calculate_results_delta(df1, df2, ['TECH'],
-                                          scenario, nodal_results, node = None)
+            df4 = capacity_delta[BASE][scenario][('TECH',)]
     
             chart_title = f'{scenario} New Capacity - Delta'
             legend_title = ''
             file_name = 'pwr_new_cap_bar_delta'
             unit = 'GW'
             
-            format_stacked_bar_pwr_delta(df3, df4, scen_path[scenario], 
-                                         chart_title, legend_title, file_name, 
-                                         BAR_TECH_COLOR_DICT, unit, start_year,
-                                         end_year)
-            
-    
-        if base_scen_comparison_dict.get('pwr_cap_bar_dif_country') == 'yes':
-            df1 = read_new_capacity(base_dir_results[BASE])
-            df1 = format_technology_col(df1, node = None)
-            
-            df2 = read_new_capacity(scen_dir_results[BASE].get(scenario))
-            df2 = format_technology_col(df2, node = None)
-            
-            df3 = calculate_results_delta(df1, df2, ['COUNTRY', 'TECH', 'YEAR'],
-                                          scenario, nodal_results, node = None)
+            charts.submit(format_stacked_bar_pwr_delta, df3, df4, scen_path[scenario], 
+                                                        chart_title, legend_title, file_name, 
+                                                        BAR_TECH_COLOR_DICT, unit, start_year,
+                                                        end_year)
+
+@graph.chart(base_scen_comparison_dict, 'pwr_cap_bar_dif_country', runs = [BASE])
+def scen_pwr_cap_bar_dif_country(trn_index, capacity_delta):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            df3 = capacity_delta[BASE][scenario][('COUNTRY', 'TECH', 'YEAR')]
             
-            df4 = calculate_results_delta(df1, df2, ['COUNTRY', 'TECH'],
-                                          scenario, nodal_results, node = None)
+            df4 = capacity_delta[BASE][scenario][('COUNTRY', 'TECH')]
     
             chart_title = f'{scenario} New Capacity - Delta'
             legend_title = ''
             file_name = 'pwr_new_cap_bar_delta_country'
             unit = 'GW'
             
-            format_stacked_bar_pwr_delta_spatial(df3, df4, scen_path[scenario], 
-                                                 chart_title, legend_title, file_name, 
-                                                 BAR_TECH_COLOR_DICT, unit, start_year,
-                                                 end_year, 'COUNTRY')
-        
-        if scenario in nodal_results.keys():
-        
-            if base_scen_comparison_dict.get('pwr_cap_bar_dif_node') == 'yes':
-                df1 = read_new_capacity(base_dir_results[BASE])
-                df1 = format_technology_col(df1, node = True)
-                
-                df2 = read_new_capacity(scen_dir_results[BASE].get(scenario))
-                df2 = format_technology_col(df2, node = True)
-                
-                df3 = calculate_results_delta(df1, df2, ['NODE', 'TECH', 'YEAR'],
-                                              scenario, nodal_results, node = True)
+            charts.submit(format_stacked_bar_pwr_delta_spatial, df3, df4, scen_path[scenario], 
+                                                                chart_title, legend_title, file_name, 
+                                                                BAR_TECH_COLOR_DICT, unit, start_year,
+                                                                end_year, 'COUNTRY')
+
+@graph.chart(base_scen_comparison_dict, 'pwr_cap_bar_dif_node', runs = [BASE])
+def scen_pwr_cap_bar_dif_node(trn_index, capacity_nodal_delta):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            if scenario in nodal_results.keys():
+                df3 = capacity_nodal_delta[BASE][scenario][('NODE', 'TECH', 'YEAR')]
                 
-                df4 = calculate_results_delta(df1, df2, ['NODE', 'TECH'],
-                                              scenario, nodal_results, node = True)
+                df4 = capacity_nodal_delta[BASE][scenario][('NODE', 'TECH')]
         
                 chart_title = f'{scenario} New Capacity - Delta'
                 legend_title = ''
                 file_name = 'pwr_new_cap_bar_delta_node'
                 unit = 'GW'
                 
-                format_stacked_bar_pwr_delta_spatial(df3, df4, scen_path[scenario], 
-                                                     chart_title, legend_title, file_name, 
-                                                     BAR_TECH_COLOR_DICT, unit, start_year,
-                                                     end_year, 'NODE')
-            
-        if base_scen_comparison_dict.get('pwr_gen_bar_dif_global') == 'yes':
-            df1 = read_technology_annual_activity(base_dir_results[BASE])
-            df1 = format_technology_col(df1, node = None)
-            df1 = convert_pj_to_twh(df1)
-            
-            df2 = read_technology_annual_activity(scen_dir_results[BASE].get(scenario))
-            df2 = format_technology_col(df2, node = None)
-            df2 = convert_pj_to_twh(df2)
-            
-            df3 = calculate_results_delta(df1, df2, ['TECH', 'YEAR'],
-                                          scenario, nodal_results, node = None)
+                charts.submit(format_stacked_bar_pwr_delta_spatial, df3, df4, scen_path[scenario], 
+                                                                    chart_title, legend_title, file_name, 
+                                                                    BAR_TECH_COLOR_DICT, unit, start_year,
+                                                                    end_year, 'NODE')
+
+@graph.chart(base_scen_comparison_dict, 'pwr_gen_bar_dif_global', runs = [BASE])
+def scen_pwr_gen_bar_dif_global(trn_index, generation_delta):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            df3 = generation_delta[BASE][scenario][('TECH', 'YEAR')]
             
-            df4 = calculate_results_delta(df1, df2, ['TECH'],
-                                          scenario, nodal_results, node = None)
+            df4 = generation_delta[BASE][scenario][('TECH',)]
     
             chart_title = f'{scenario} Generation - Delta'
             legend_title = ''
             file_name = 'pwr_gen_bar_delta'
             unit = 'TWh'
             
-            format_stacked_bar_pwr_delta(df3, df4, scen_path[scenario], 
-                                         chart_title, legend_title, file_name, 
-                                         BAR_TECH_COLOR_DICT, unit, start_year,
-                                         end_year)
-            
-        if base_scen_comparison_dict.get('pwr_gen_bar_dif_country') == 'yes':
-            df1 = read_technology_annual_activity(base_dir_results[BASE])
-            df1 = format_technology_col(df1, node = None)
-            df1 = convert_pj_to_twh(df1)
-            
-            df2 = read_technology_annual_activity(scen_dir_results[BASE].get(scenario))
-            df2 = format_technology_col(df2, node = None)
-            df2 = convert_pj_to_twh(df2)
-            
-            df3 = calculate_results_delta(df1, df2, ['COUNTRY', 'TECH', 'YEAR'],
-                                          scenario, nodal_results, node = None)
+            charts.submit(format_stacked_bar_pwr_delta, df3, df4, scen_path[scenario], 
+                                                        chart_title, legend_title, file_name, 
+                                                        BAR_TECH_COLOR_DICT, unit, start_year,
+                                                        end_year)
+
+@graph.chart(base_scen_comparison_dict, 'pwr_gen_bar_dif_country', runs = [BASE])
+def scen_pwr_gen_bar_dif_country(trn_index, generation_delta):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            df3 = generation_delta[BASE][scenario][('COUNTRY', 'TECH', 'YEAR')]
             
-            df4 = calculate_results_delta(df1, df2, ['COUNTRY', 'TECH'],
-                                          scenario, nodal_results, node = None)
+            df4 = generation_delta[BASE][scenario][('COUNTRY', 'TECH')]
     
             chart_title = f'{scenario} Generation - Delta'
             legend_title = ''
             file_name = 'pwr_gen_bar_delta_country'
             unit = 'TWh'
     
-            format_stacked_bar_pwr_delta_spatial(df3, df4, scen_path[scenario], 
-                                                 chart_title, legend_title, file_name, 
-                                                 BAR_TECH_COLOR_DICT, unit, start_year,
-                                                 end_year, 'COUNTRY')
-            
-        if scenario in nodal_results.keys():
-            
-            if base_scen_comparison_dict.get('pwr_gen_bar_dif_node') == 'yes':
-                df1 = read_technology_annual_activity(base_dir_results[BASE])
-                df1 = format_technology_col(df1, node = True)
-                df1 = convert_pj_to_twh(df1)
-                
-                df2 = read_technology_annual_activity(scen_dir_results[BASE].get(scenario))
-                df2 = format_technology_col(df2, node = True)
-                df2 = convert_pj_to_twh(df2)
-                
-                df3 = calculate_results_delta(df1, df2, ['NODE', 'TECH', 'YEAR'],
-                                              scenario, nodal_results, node = True)
+            charts.submit(format_stacked_bar_pwr_delta_spatial, df3, df4, scen_path[scenario], 
+                                                                chart_title, legend_title, file_name, 
+                                                                BAR_TECH_COLOR_DICT, unit, start_year,
+                                                                end_year, 'COUNTRY')
+
+@graph.chart(base_scen_comparison_dict, 'pwr_gen_bar_dif_node', runs = [BASE])
+def scen_pwr_gen_bar_dif_node(trn_index, generation_nodal_delta):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            if scenario in nodal_results.keys():
+                df3 = generation_nodal_delta[BASE][scenario][('NODE', 'TECH', 'YEAR')]
                 
-                df4 = calculate_results_delta(df1, df2, ['NODE', 'TECH'],
-                                              scenario, nodal_results, node = True)
+                df4 = generation_nodal_delta[BASE][scenario][('NODE', 'TECH')]
         
                 chart_title = f'{scenario} Generation - Delta'
                 legend_title = ''
                 file_name = 'pwr_gen_bar_delta_node'
                 unit = 'TWh'
         
-                format_stacked_bar_pwr_delta_spatial(df3, df4, scen_path[scenario], 
-                                                     chart_title, legend_title, file_name, 
-                                                     BAR_TECH_COLOR_DICT, unit, start_year,
-                                                     end_year, 'NODE')
-    
-        if base_scen_comparison_dict.get('costs_dif_global') == 'yes':
-            df1 = read_total_discounted_cost(base_dir_results[BASE])
-            df2 = read_total_discounted_cost(scen_dir_results[BASE].get(scenario))
+                charts.submit(format_stacked_bar_pwr_delta_spatial, df3, df4, scen_path[scenario], 
+                                                                    chart_title, legend_title, file_name, 
+                                                                    BAR_TECH_COLOR_DICT, unit, start_year,
+                                                                    end_year, 'NODE')
+
+@graph.chart(base_scen_comparison_dict, 'costs_dif_global', runs = [BASE])
+def scen_costs_dif_global(trn_index):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            df1 = base_results[BASE].total_discounted_cost
+            df2 = scen_results[BASE][scenario].total_discounted_cost
             convert_million_to_billion(df1)
             convert_million_to_billion(df2)
             
@@ -628,31 +629,34 @@ for scenario, trn in scenarios.items():
             file_name = 'costs_delta_global'
             unit = 'Billion $'
     
-            format_bar_delta(df1, df2, scen_path[scenario], 
-                             chart_title, legend_title, 
-                             file_name, DUAL_COSTS_COLOR_DICT, 
-                             unit, country = None)
-
-        if base_scen_comparison_dict.get('emissions_dif_global') == 'yes':
-            df1 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                          country = False)
-            df2 = format_annual_emissions(read_annual_emissions(
-                scen_dir_results[BASE].get(scenario)), 
-                country = False)
+            charts.submit(format_bar_delta, df1, df2, scen_path[scenario], 
+                                            chart_title, legend_title, 
+                                            file_name, DUAL_COSTS_COLOR_DICT, 
+                                            unit, country = None)
+
+@graph.chart(base_scen_comparison_dict, 'emissions_dif_global', runs = [BASE])
+def scen_emissions_dif_global(trn_index):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            df1 = base_results[BASE].cached.emissions_global
+            df2 = scen_results[BASE][scenario].cached.emissions_global
             
             chart_title = f'{scenario} Emissions - Delta'
             legend_title = ''
             file_name = 'emissions_delta_global'
             unit = 'Mt CO2'
             
-            format_bar_delta(df1, df2, scen_path[scenario], 
-                             chart_title, legend_title, 
-                             file_name, DUAL_EMISSIONS_COLOR_DICT, 
-                             unit, country = None)
-            
-        if base_scen_comparison_dict.get('costs_dif_country') == 'yes':
-            df1 = read_total_cost_country(base_dir_results_summaries[BASE])
-            df2 = read_total_cost_country(scen_dir_results_summaries[BASE].get(scenario))
+            charts.submit(format_bar_delta, df1, df2, scen_path[scenario], 
+                                            chart_title, legend_title, 
+                                            file_name, DUAL_EMISSIONS_COLOR_DICT, 
+                                            unit, country = None)
+
+@graph.chart(base_scen_comparison_dict, 'costs_dif_country', runs = [BASE])
+def scen_costs_dif_country(trn_index):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            df1 = base_results[BASE].total_cost_country
+            df2 = scen_results[BASE][scenario].total_cost_country
             convert_million_to_billion(df1)
             convert_million_to_billion(df2)
             
@@ -661,93 +665,79 @@ for scenario, trn in scenarios.items():
             file_name = 'costs_delta_country'
             unit = 'Billion $'
     
-            format_bar_delta_country(df1, df2, scen_path[scenario], 
-                                     chart_title, legend_title, 
-                                     file_name, COUNTRY_COLOR_DICT, 
-                                     unit)
-            
-        if base_scen_comparison_dict.get('emissions_dif_country') == 'yes':
-            df1 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                          country = True)
-            df2 = format_annual_emissions(read_annual_emissions(
-                scen_dir_results[BASE].get(scenario)), 
-                country = True)
+            charts.submit(format_bar_delta_country, df1, df2, scen_path[scenario], 
+                                                    chart_title, legend_title, 
+                                                    file_name, COUNTRY_COLOR_DICT, 
+                                                    unit)
+
+@graph.chart(base_scen_comparison_dict, 'emissions_dif_country', runs = [BASE])
+def scen_emissions_dif_country(trn_index):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            df1 = base_results[BASE].cached.emissions_country
+            df2 = scen_results[BASE][scenario].cached.emissions_country
             
             chart_title = f'{scenario} Emissions - Delta'
             legend_title = ''
             file_name = 'emissions_delta_country'
             unit = 'Mt CO2'
             
-            format_bar_delta_country(df1, df2, scen_path[scenario], 
-                                     chart_title, legend_title, 
-                                     file_name, COUNTRY_COLOR_DICT, 
-                                     unit)           
-            
-        if base_scen_comparison_dict.get('pwr_gen_shares_dif_global') == 'yes':
-            df1 = read_generation_shares_global(base_dir_results_summaries[BASE])
-            df2 = read_generation_shares_global(scen_dir_results_summaries[BASE].get(scenario))
+            charts.submit(format_bar_delta_country, df1, df2, scen_path[scenario], 
+                                                    chart_title, legend_title, 
+                                                    file_name, COUNTRY_COLOR_DICT, 
+                                                    unit)           
+
+@graph.chart(base_scen_comparison_dict, 'pwr_gen_shares_dif_global', runs = [BASE])
+def scen_pwr_gen_shares_dif_global(trn_index):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
+            df1 = base_results[BASE].cached.generation_shares_global
+            df2 = scen_results[BASE][scenario].cached.generation_shares_global
             
-            df3 = read_headline_metrics(base_dir_results_summaries[BASE])
-            df4 = read_headline_metrics(scen_dir_results_summaries[BASE].get(scenario))
+            df3 = base_results[BASE].cached.headline_metrics
+            df4 = scen_results[BASE][scenario].cached.headline_metrics
             
             chart_title = 'Generation Shares - Delta'
             legend_title = ''
             file_name = 'pwr_gen_shares_delta'
             unit = '%'    
             
-            format_stacked_bar_gen_shares_delta(df1, df2, df3, df4, scen_path[scenario], 
-                                                chart_title, legend_title, file_name, 
-                                                BAR_GEN_SHARES_COLOR_DICT, unit)
-            
-        if base_scen_comparison_dict.get('headline_metrics_dif_global') == 'yes':
-    
+            charts.submit(format_stacked_bar_gen_shares_delta, df1, df2, df3, df4, scen_path[scenario], 
+                                                               chart_title, legend_title, file_name, 
+                                                               BAR_GEN_SHARES_COLOR_DICT, unit)
+
+@graph.chart(base_scen_comparison_dict, 'headline_metrics_dif_global', runs = [BASE])
+def scen_headline_metrics_dif_global(trn_index, capacity_delta, generation_delta):
+    for scenario, trn in scenarios.items():
+        if trn_index[(BASE, scenario)]['built']:
             # Set inputs for capacity subplot
-            capacity_base = read_new_capacity(base_dir_results[BASE])
-            capacity_base = format_technology_col(capacity_base, node = None)
-            
-            capacity_scen = read_new_capacity(scen_dir_results[BASE].get(scenario))
-            capacity_scen = format_technology_col(capacity_scen, node = None)
-            
-            capacity = calculate_results_delta(capacity_base, capacity_scen, ['TECH'],
-                                               scenario, nodal_results,  node = None)
+            capacity = capacity_delta[BASE][scenario][('TECH',)]
             capacity_title = 'Capacity (GW)'
     
             # Set inputs for generation subplot
-            production_base = read_technology_annual_activity(base_dir_results[BASE])
-            production_base = format_technology_col(production_base, node = None)
-            production_base = convert_pj_to_twh(production_base)
-            
-            production_scen = read_technology_annual_activity(scen_dir_results[BASE].get(scenario))
-            production_scen = format_technology_col(production_scen, node = None)
-            production_scen = convert_pj_to_twh(production_scen)
-    
-            production = calculate_results_delta(production_base, production_scen, ['TECH'],
-                                                 scenario, nodal_results,  node = None)
+            production = generation_delta[BASE][scenario][('TECH',)]
             production_title = 'Generation (TWh)'
-             
+            
             # Set inputs for generation shares subplot
-            gen_shares_base = read_headline_metrics(base_dir_results_summaries[BASE])
-            gen_shares_scen = read_headline_metrics(scen_dir_results_summaries[BASE].get(scenario))
+            gen_shares_base = base_results[BASE].cached.headline_metrics
+            gen_shares_scen = scen_results[BASE][scenario].cached.headline_metrics
             gen_shares_title = 'Generation Share (%)'
             
             # Set inputs for emissions subplot
-            emissions_base = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                          country = True)
-            emissions_scen = format_annual_emissions(read_annual_emissions(
-                scen_dir_results[BASE].get(scenario)), 
-                country = True)
+            emissions_base = base_results[BASE].cached.emissions_country
+            emissions_scen = scen_results[BASE][scenario].cached.emissions_country
             emissions_title = 'Emissions (Mt CO2)'
             
             # Set inputs for costs subplot
-            costs_base = read_total_discounted_cost(base_dir_results[BASE])
-            costs_scen = read_total_discounted_cost(scen_dir_results[BASE].get(scenario))           
+            costs_base = base_results[BASE].total_discounted_cost
+            costs_scen = scen_results[BASE][scenario].total_discounted_cost           
             convert_million_to_billion(costs_base)
             convert_million_to_billion(costs_scen)
             costs_title = 'Total Costs (Billion $)'
             
             # Set inputs for transmission capacity subplot
-            capacity_trn = read_new_capacity(scen_dir_results[BASE].get(scenario))
-            max_capacity_trn = read_max_capacity_investment(scen_dir_data[BASE].get(scenario))
+            capacity_trn = scen_results[BASE][scenario].cached.new_capacity
+            max_capacity_trn = scen_results[BASE][scenario].cached.max_capacity_investment
             trn_title = f'{scenario} Capacity (GW)'
     
             # Set chart inputs
@@ -755,186 +745,159 @@ for scenario, trn in scenarios.items():
             file_name = 'headline_metrics_delta'
     
             # Create chart
-            format_headline_metrics_global(capacity, production,
-                                           capacity_title, production_title, 
-                                           BAR_TECH_COLOR_DICT, BAR_TECH_COLOR_DICT,
-                                           gen_shares_base, gen_shares_scen, 
-                                           gen_shares_title, BAR_GEN_SHARES_COLOR_DICT,
-                                           emissions_base, emissions_scen,
-                                           emissions_title, DUAL_EMISSIONS_COLOR_DICT,
-                                           costs_base, costs_scen,
-                                           costs_title, DUAL_COSTS_COLOR_DICT,
-                                           capacity_trn, max_capacity_trn,
-                                           trn_title, DUAL_TRANSMISSION_COLOR_DICT,
-                                           scen_path[scenario], chart_title, 
-                                           file_name, scenario
-                                           )
-            
+            charts.submit(format_headline_metrics_global, capacity, production,
+                                                          capacity_title, production_title, 
+                                                          BAR_TECH_COLOR_DICT, BAR_TECH_COLOR_DICT,
+                                                          gen_shares_base, gen_shares_scen, 
+                                                          gen_shares_title, BAR_GEN_SHARES_COLOR_DICT,
+                                                          emissions_base, emissions_scen,
+                                                          emissions_title, DUAL_EMISSIONS_COLOR_DICT,
+                                                          costs_base, costs_scen,
+                                                          costs_title, DUAL_COSTS_COLOR_DICT,
+                                                          capacity_trn, max_capacity_trn,
+                                                          trn_title, DUAL_TRANSMISSION_COLOR_DICT,
+                                                          scen_path[scenario], chart_title, 
+                                                          file_name, scenario
+                                                          )
+
 '''Create charts for multi scenario comparison.'''
-if multi_scen_comparison_dict.get('emissions_dif') == 'yes':
-    df1 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                  country = False)
+
+@graph.chart(multi_scen_comparison_dict, 'emissions_dif', runs = [BASE])
+def multi_scen_emissions_dif(trn_index):
+    df1 = base_results[BASE].cached.emissions_global
     df2_dict = {}
     
     for scenario, trn in scenarios.items():
-        capacity_trn = read_new_capacity(scen_dir_results[BASE].get(scenario))
-        if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-            df2_dict[scenario] = format_annual_emissions(read_annual_emissions(
-                scen_dir_results[BASE].get(scenario)), 
-                country = False)
+        if trn_index[(BASE, scenario)]['built']:
+            df2_dict[scenario] = scen_results[BASE][scenario].cached.emissions_global
 
     chart_title = 'Emissions - Delta'
     file_name = 'emissions_delta_global'
     unit = 'Mt CO2'
-            
-    format_bar_delta_multi_scenario(df1, df2_dict, multi_scenario_path, 
-                                    chart_title, file_name, 
-                                    DUAL_EMISSIONS_COLOR_DICT, unit, 
-                                    system_delta, axis_sort_delta)
     
-if multi_scen_comparison_dict_geo.get('emissions_dif') == 'yes':
+    charts.submit(format_bar_delta_multi_scenario, df1, df2_dict, multi_scenario_path, 
+                                                   chart_title, file_name, 
+                                                   DUAL_EMISSIONS_COLOR_DICT, unit, 
+                                                   system_delta, axis_sort_delta)
+
+@graph.chart(multi_scen_comparison_dict_geo, 'emissions_dif', runs = [BASE])
+def multi_scen_geo_emissions_dif(trn_index):
     df1_dict = {}
     df2_dict = {}
     
     for scenario, trn in scenarios.items():
-        df1_dict[scenario] = geo_filter_tech_emissions(read_annual_technology_emission(
-            base_dir_results[BASE]), scenario)
+        df1_dict[scenario] = geo_filter_tech_emissions(base_results[BASE].annual_technology_emission, scenario)
 
         df1_dict[scenario] = format_annual_emissions(df1_dict[scenario], country = False)
-        
-        capacity_trn = read_new_capacity(scen_dir_results[BASE].get(scenario))
-        if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-            df2_dict[scenario] = geo_filter_tech_emissions(read_annual_technology_emission(
-                scen_dir_results[BASE].get(scenario)), scenario)
+    
+        if trn_index[(BASE, scenario)]['built']:
+            df2_dict[scenario] = geo_filter_tech_emissions(scen_results[BASE][scenario].annual_technology_emission, scenario)
 
             df2_dict[scenario] = format_annual_emissions(df2_dict[scenario], country = False)
 
     chart_title = 'Emissions - Delta'
     file_name = 'emissions_delta_global_geo'
     unit = 'Mt CO2'
-            
-    format_bar_delta_multi_scenario(df1_dict, df2_dict, multi_scenario_path, 
-                                    chart_title, file_name, 
-                                    DUAL_EMISSIONS_COLOR_DICT, unit, 
-                                    system_delta, axis_sort_delta)
+    
+    charts.submit(format_bar_delta_multi_scenario, df1_dict, df2_dict, multi_scenario_path, 
+                                                   chart_title, file_name, 
+                                                   DUAL_EMISSIONS_COLOR_DICT, unit, 
+                                                   system_delta, axis_sort_delta)
 
-if multi_scen_comparison_dict.get('costs_dif') == 'yes':
-    df1 = read_total_discounted_cost(base_dir_results[BASE])
+@graph.chart(multi_scen_comparison_dict, 'costs_dif', runs = [BASE])
+def multi_scen_costs_dif(trn_index):
+    df1 = base_results[BASE].total_discounted_cost
     convert_million_to_billion(df1)    
     df2_dict = {}
     
     for scenario, trn in scenarios.items():
-        capacity_trn = read_new_capacity(scen_dir_results[BASE].get(scenario))
-        if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-            df2_dict[scenario] = read_total_discounted_cost(
-                scen_dir_results[BASE].get(scenario))
+        if trn_index[(BASE, scenario)]['built']:
+            df2_dict[scenario] = scen_results[BASE][scenario].total_discounted_cost
             convert_million_to_billion(df2_dict[scenario])
 
     chart_title = 'System Costs - Delta'
     file_name = 'costs_delta_global'
     unit = 'Billion $'
 
-    format_bar_delta_multi_scenario(df1, df2_dict, multi_scenario_path, 
-                                    chart_title, file_name, 
-                                    DUAL_COSTS_COLOR_DICT, unit, 
-                                    system_delta, axis_sort_delta)
-    
-if multi_scen_comparison_dict.get('gen_shares_dif') == 'yes':
-    df1 = read_headline_metrics(base_dir_results_summaries[BASE]) 
+    charts.submit(format_bar_delta_multi_scenario, df1, df2_dict, multi_scenario_path, 
+                                                   chart_title, file_name, 
+                                                   DUAL_COSTS_COLOR_DICT, unit, 
+                                                   system_delta, axis_sort_delta)
+
+@graph.chart(multi_scen_comparison_dict, 'gen_shares_dif', runs = [BASE])
+def multi_scen_gen_shares_dif(trn_index):
+    df1 = base_results[BASE].cached.headline_metrics 
     df2_dict = {}
     
     for scenario, trn in scenarios.items():
-        capacity_trn = read_new_capacity(scen_dir_results[BASE].get(scenario))
-        if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-            df2_dict[scenario] = read_headline_metrics(scen_dir_results_summaries[BASE].get(scenario))
+        if trn_index[(BASE, scenario)]['built']:
+            df2_dict[scenario] = scen_results[BASE][scenario].cached.headline_metrics
 
     chart_title = 'Generation Shares - Delta'
     file_name = 'gen_shares_delta_global'
     unit = '%'
     
-    format_stacked_bar_gen_shares_delta_multi_scenario(df1, df2_dict, multi_scenario_path, 
-                                                       chart_title, file_name, 
-                                                       BAR_GEN_SHARES_COLOR_DICT, unit,
-                                                       axis_sort_delta)
-    
-if multi_scen_comparison_dict.get('trn_cap_dif') == 'yes':
+    charts.submit(format_stacked_bar_gen_shares_delta_multi_scenario, df1, df2_dict, multi_scenario_path, 
+                                                                      chart_title, file_name, 
+                                                                      BAR_GEN_SHARES_COLOR_DICT, unit,
+                                                                      axis_sort_delta)
+
+@graph.chart(multi_scen_comparison_dict, 'trn_cap_dif', runs = [BASE])
+def multi_scen_trn_cap_dif():
     df1_dict = {}
     df2_dict = {}
     
     for scenario, trn in scenarios.items():
-        df1_dict[scenario] = read_new_capacity(scen_dir_results[BASE].get(scenario))
-        df2_dict[scenario] = read_max_capacity_investment(scen_dir_data[BASE].get(scenario))
+        df1_dict[scenario] = scen_results[BASE][scenario].cached.new_capacity
+        df2_dict[scenario] = scen_results[BASE][scenario].cached.max_capacity_investment
 
     chart_title = 'Transmission Capacity'
     file_name = 'transmission_capacity_delta_global'
     unit = 'GW'
     
-    format_transmission_capacity_multi_scenario(df1_dict, df2_dict, multi_scenario_path, 
-                                                chart_title, file_name, 
-                                                DUAL_TRANSMISSION_COLOR_DICT, unit,
-                                                axis_sort_delta)
-    
-if multi_scen_comparison_dict.get('capacity_dif') == 'yes':
-    df1 = read_new_capacity(base_dir_results[BASE])
-    df1 = format_technology_col(df1, node = None)
+    charts.submit(format_transmission_capacity_multi_scenario, df1_dict, df2_dict, multi_scenario_path, 
+                                                               chart_title, file_name, 
+                                                               DUAL_TRANSMISSION_COLOR_DICT, unit,
+                                                               axis_sort_delta)
+
+@graph.chart(multi_scen_comparison_dict, 'capacity_dif', runs = [BASE])
+def multi_scen_capacity_dif(trn_index, capacity_delta):
     df2_dict = {}
     
     for scenario, trn in scenarios.items():
-        capacity_trn = read_new_capacity(scen_dir_results[BASE].get(scenario))
-        if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-            df2 = read_new_capacity(scen_dir_results[BASE].get(scenario))
-            df2 = format_technology_col(df2, node = None)
-            
-            df2_dict[scenario] = calculate_results_delta(df1, df2, ['TECH'],
-                                                         scenario, nodal_results,
-                                                         node = None)
-            
+        if trn_index[(BASE, scenario)]['built']:
+            df2_dict[scenario] = capacity_delta[BASE][scenario][('TECH',)]
+    
     chart_title = 'Capacity - Delta'
     file_name = 'capacity_delta_global'
     unit = 'GW'
     
-    format_stacked_bar_pwr_delta_multi_scenario(df2_dict, multi_scenario_path, 
-                                                chart_title, file_name, 
-                                                BAR_TECH_COLOR_DICT, unit, 
-                                                axis_sort_delta)
-    
-if multi_scen_comparison_dict.get('generation_dif') == 'yes':
-    df1 = read_technology_annual_activity(base_dir_results[BASE])
-    df1 = format_technology_col(df1, node = None)
-    df1 = convert_pj_to_twh(df1)
+    charts.submit(format_stacked_bar_pwr_delta_multi_scenario, df2_dict, multi_scenario_path, 
+                                                               chart_title, file_name, 
+                                                               BAR_TECH_COLOR_DICT, unit, 
+                                                               axis_sort_delta)
+
+@graph.chart(multi_scen_comparison_dict, 'generation_dif', runs = [BASE])
+def multi_scen_generation_dif(trn_index, generation_delta):
     df2_dict = {}
     
     for scenario, trn in scenarios.items():
-        capacity_trn = read_new_capacity(scen_dir_results[BASE].get(scenario))
-        if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-            df2 = read_technology_annual_activity(scen_dir_results[BASE].get(scenario))
-            df2 = format_technology_col(df2, node = None)
-            df2 = convert_pj_to_twh(df2)
-            
-            df2_dict[scenario] = calculate_results_delta(df1, df2, ['TECH'],
-                                                         scenario, nodal_results,
-                                                         node = None)
-            
+        if trn_index[(BASE, scenario)]['built']:
+            df2_dict[scenario] = generation_delta[BASE][scenario][('TECH',)]
+    
     chart_title = 'Generation - Delta'
     file_name = 'generation_delta_global'
     unit = 'TWh'
     
-    format_stacked_bar_pwr_delta_multi_scenario(df2_dict, multi_scenario_path, 
-                                                chart_title, file_name, 
-                                                BAR_TECH_COLOR_DICT, unit,
-                                                axis_sort_delta)
-    
-if multi_scen_comparison_dict.get('multi_plot_scen_comparison') == 'yes':
-    df1a = read_new_capacity(base_dir_results[BASE])
-    df1a = format_technology_col(df1a, node = None)
-    
-    df2a = read_technology_annual_activity(base_dir_results[BASE])
-    df2a = format_technology_col(df2a, node = None)
-    df2a = convert_pj_to_twh(df2a)
-    
-    df3 = read_headline_metrics(base_dir_results_summaries[BASE]) 
-    df4 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                  country = False)
+    charts.submit(format_stacked_bar_pwr_delta_multi_scenario, df2_dict, multi_scenario_path, 
+                                                               chart_title, file_name, 
+                                                               BAR_TECH_COLOR_DICT, unit,
+                                                               axis_sort_delta)
+
+@graph.chart(multi_scen_comparison_dict, 'multi_plot_scen_comparison', runs = [BASE])
+def multi_scen_multi_plot_scen_comparison(trn_index, capacity_delta, generation_delta):
+    df3 = base_results[BASE].cached.headline_metrics 
+    df4 = base_results[BASE].cached.emissions_global
     
     df1_dict = {}
     df2_dict = {}
@@ -950,98 +913,77 @@ if multi_scen_comparison_dict.get('multi_plot_scen_comparison') == 'yes':
     chart_title = ''
 
     for scenario, trn in scenarios.items():
-        capacity_trn = read_new_capacity(scen_dir_results[BASE].get(scenario))
-        if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-            df1b = read_new_capacity(scen_dir_results[BASE].get(scenario))
-            df1b = format_technology_col(df1b, node = None)
-            
-            df2b = read_technology_annual_activity(scen_dir_results[BASE].get(scenario))
-            df2b = format_technology_col(df2b, node = None)
-            df2b = convert_pj_to_twh(df2b)
-            
-            df1_dict[scenario] = calculate_results_delta(df1a, df1b, ['TECH'],
-                                                         scenario, nodal_results,
-                                                         node = None)
-            
-            df2_dict[scenario] = calculate_results_delta(df2a, df2b, ['TECH'],
-                                                         scenario, nodal_results,
-                                                         node = None)
-            
-            df3_dict[scenario] = read_headline_metrics(scen_dir_results_summaries[BASE].get(scenario))
-            
-            df4_dict[scenario] = format_annual_emissions(read_annual_emissions(
-                scen_dir_results[BASE].get(scenario)), country = False)
-
-    format_multi_plot_scen_comparison(df1_dict, df2_dict, df3, df3_dict, 
-                                      df4, df4_dict, unit1, unit2, unit3, 
-                                      unit4, BAR_TECH_COLOR_DICT,
-                                      BAR_GEN_SHARES_COLOR_DICT,
-                                      DUAL_EMISSIONS_COLOR_DICT,
-                                      multi_scenario_path, file_name, 
-                                      chart_title, axis_sort_delta)
+        if trn_index[(BASE, scenario)]['built']:
+            df1_dict[scenario] = capacity_delta[BASE][scenario][('TECH',)]
+    
+            df2_dict[scenario] = generation_delta[BASE][scenario][('TECH',)]
+    
+            df3_dict[scenario] = scen_results[BASE][scenario].cached.headline_metrics
     
+            df4_dict[scenario] = scen_results[BASE][scenario].cached.emissions_global
+
+    charts.submit(format_multi_plot_scen_comparison, df1_dict, df2_dict, df3, df3_dict, 
+                                                     df4, df4_dict, unit1, unit2, unit3, 
+                                                     unit4, BAR_TECH_COLOR_DICT,
+                                                     BAR_GEN_SHARES_COLOR_DICT,
+                                                     DUAL_EMISSIONS_COLOR_DICT,
+                                                     multi_scenario_path, file_name, 
+                                                     chart_title, axis_sort_delta)
+
 '''Create charts for sensitivities.'''
-if sensitivity_dict.get('emissions_dif') == 'yes':
 
+@graph.chart(sensitivity_dict, 'emissions_dif', runs = runs)
+def sensitivity_emissions_dif(trn_index):
     df1_dict = {}
     df2_dict = {}
     for run in runs:
-        df1_dict[run] = format_annual_emissions(read_annual_emissions(base_dir_results[run]), 
-                                                country = False)
+        df1_dict[run] = base_results[run].cached.emissions_global
         df2_dict[run] = {}
         for scenario, trn in scenarios.items():
 
-            capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-            if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-                df2_dict[run][scenario] = format_annual_emissions(read_annual_emissions(
-                    scen_dir_results[run].get(scenario)), 
-                    country = False)
+            if trn_index[(run, scenario)]['built']:
+                df2_dict[run][scenario] = scen_results[run][scenario].cached.emissions_global
     
         chart_title = ''
         file_name = 'emissions_delta_global'
         unit = 'Mt CO2'
 
-    format_bar_delta_multi_scenario_sensitivities(df1_dict, df2_dict, sensitivities_path, 
-                                                  chart_title, file_name, 
-                                                  SENSITIVTIES_COLOR_DICT, unit, axis_sort_delta,
-                                                  runs, BASE)
-    
-if sensitivity_dict.get('emissions_dif_geo') == 'yes':
-    df1 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                  country = False)
+    charts.submit(format_bar_delta_multi_scenario_sensitivities, df1_dict, df2_dict, sensitivities_path, 
+                                                                 chart_title, file_name, 
+                                                                 SENSITIVTIES_COLOR_DICT, unit, axis_sort_delta,
+                                                                 runs, BASE)
+
+@graph.chart(sensitivity_dict, 'emissions_dif_geo', runs = runs)
+def sensitivity_emissions_dif_geo(trn_index):
+    df1 = base_results[BASE].cached.emissions_global
     
     df2_dict = {}
     df3_dict = {}
     df4_dict = {}
     
     for scenario, trn in scenarios.items():
-        df3_dict[scenario] = geo_filter_tech_emissions(read_annual_technology_emission(
-            base_dir_results[BASE]), scenario)
+        df3_dict[scenario] = geo_filter_tech_emissions(base_results[BASE].annual_technology_emission, scenario)
 
         df3_dict[scenario] = format_annual_emissions(df3_dict[scenario], country = False)
-        
-        capacity_trn = read_new_capacity(scen_dir_results[BASE].get(scenario))
-        if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-            df2_dict[scenario] = format_annual_emissions(read_annual_emissions(
-                scen_dir_results[BASE].get(scenario)), 
-                country = False)
-            
-            df4_dict[scenario] = geo_filter_tech_emissions(read_annual_technology_emission(
-                scen_dir_results[BASE].get(scenario)), scenario)
+    
+        if trn_index[(BASE, scenario)]['built']:
+            df2_dict[scenario] = scen_results[BASE][scenario].cached.emissions_global
+    
+            df4_dict[scenario] = geo_filter_tech_emissions(scen_results[BASE][scenario].annual_technology_emission, scenario)
 
             df4_dict[scenario] = format_annual_emissions(df4_dict[scenario], country = False)
 
     chart_title = ''
     file_name = 'emissions_delta_global_geo'
     unit = 'Mt CO2'
-            
-    format_bar_delta_multi_scenario_geo_sensitivity(df1, df2_dict, df3_dict, df4_dict, 
-                                    sensitivities_path, chart_title, file_name, 
-                                    SENSITIVTIES_COLOR_DICT, unit, 
-                                    axis_sort_delta, BASE) 
-    
-if sensitivity_dict.get('costs_dif') == 'yes':
     
+    charts.submit(format_bar_delta_multi_scenario_geo_sensitivity, df1, df2_dict, df3_dict, df4_dict, 
+                                                   sensitivities_path, chart_title, file_name, 
+                                                   SENSITIVTIES_COLOR_DICT, unit, 
+                                                   axis_sort_delta, BASE) 
+
+@graph.chart(sensitivity_dict, 'costs_dif', runs = runs)
+def sensitivity_costs_dif(trn_index):
     costs_runs = runs.copy()
     
     if 'NoNuclear' in costs_runs:
@@ -1050,119 +992,105 @@ if sensitivity_dict.get('costs_dif') == 'yes':
     df1_dict = {}
     df2_dict = {}
     for run in costs_runs:
-        df1_dict[run] = read_total_discounted_cost(base_dir_results[run])
+        df1_dict[run] = base_results[run].total_discounted_cost
         convert_million_to_billion(df1_dict[run]) 
         df2_dict[run] = {}
         for scenario, trn in scenarios.items():
 
-            capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-            if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-                df2_dict[run][scenario] = read_total_discounted_cost(scen_dir_results[run].get(scenario))
+            if trn_index[(run, scenario)]['built']:
+                df2_dict[run][scenario] = scen_results[run][scenario].total_discounted_cost
                 convert_million_to_billion(df2_dict[run][scenario])
-        
+    
         chart_title = ''
         file_name = 'costs_delta_global'
         unit = 'Billion $'
 
-    format_bar_delta_multi_scenario_sensitivities(df1_dict, df2_dict, sensitivities_path, 
-                                                  chart_title, file_name, 
-                                                  SENSITIVTIES_COLOR_DICT, unit, axis_sort_delta,
-                                                  costs_runs, BASE)    
-    
-if sensitivity_dict.get('gen_shares_dif') == 'yes':
-    
+    charts.submit(format_bar_delta_multi_scenario_sensitivities, df1_dict, df2_dict, sensitivities_path, 
+                                                                 chart_title, file_name, 
+                                                                 SENSITIVTIES_COLOR_DICT, unit, axis_sort_delta,
+                                                                 costs_runs, BASE)    
+
+@graph.chart(sensitivity_dict, 'gen_shares_dif', runs = runs)
+def sensitivity_gen_shares_dif():
     df1_dict = {}
     df2_dict = {}
 
     for run in runs:
 
-        df1_dict[run] = read_headline_metrics(base_dir_results_summaries[run]) 
+        df1_dict[run] = base_results[run].headline_metrics 
         df2_dict[run] = {}
-        
+    
         for scenario, trn in scenarios.items():
-            df2_dict[run][scenario] = read_headline_metrics(scen_dir_results_summaries[run].get(scenario))
+            df2_dict[run][scenario] = scen_results[run][scenario].headline_metrics
 
     chart_title = ''
     file_name = 'gen_shares_delta_global'
     unit = '%'
 
-    format_stacked_bar_gen_shares_delta_multi_scenario_sensitivities(df1_dict, 
-                                                                     df2_dict, 
-                                                                     sensitivities_path, 
-                                                                     chart_title, file_name, 
-                                                                     BAR_GEN_SHARES_COLOR_DICT,
-                                                                     SENSITIVTIES_HATCH_DICT, unit,
-                                                                     axis_sort_delta, runs, BASE)
-    
-    
-if sensitivity_dict.get('trn_cap_dif') == 'yes':
+    charts.submit(format_stacked_bar_gen_shares_delta_multi_scenario_sensitivities, df1_dict, 
+                                                                                    df2_dict, 
+                                                                                    sensitivities_path, 
+                                                                                    chart_title, file_name, 
+                                                                                    BAR_GEN_SHARES_COLOR_DICT,
+                                                                                    SENSITIVTIES_HATCH_DICT, unit,
+                                                                                    axis_sort_delta, runs, BASE)
 
+@graph.chart(sensitivity_dict, 'trn_cap_dif', runs = runs)
+def sensitivity_trn_cap_dif(trn_index):
     df1_dict = {}
     for run in runs:
         df1_dict[run] = {}
         for scenario, trn in scenarios.items():
 
-            capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
+            if trn_index[(run, scenario)]['built']:
+                df1_dict[run][scenario] = scen_results[run][scenario].new_capacity
 
-            if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-                df1_dict[run][scenario] = read_new_capacity(scen_dir_results[run].get(scenario))
-
-        
+    
         chart_title = ''
         file_name = 'transmission_capacity_delta_global'
         unit = 'GW'
 
-    format_bar_delta_multi_scenario_sensitivities_trn_capacity(df1_dict, sensitivities_path, 
-                                                               chart_title, file_name, 
-                                                               SENSITIVTIES_COLOR_DICT, unit, 
-                                                               axis_sort_delta, runs, BASE)
-    
-if sensitivity_dict.get('multi_plot_sensitivities') == 'yes':
+    charts.submit(format_bar_delta_multi_scenario_sensitivities_trn_capacity, df1_dict, sensitivities_path, 
+                                                                              chart_title, file_name, 
+                                                                              SENSITIVTIES_COLOR_DICT, unit, 
+                                                                              axis_sort_delta, runs, BASE)
 
+@graph.chart(sensitivity_dict, 'multi_plot_sensitivities', runs = runs)
+def sensitivity_multi_plot_sensitivities(trn_index):
     df1_dict = {}
     df2_dict = {}
     df3_dict = {}
     df4_dict = {}
     
-    df5 = format_annual_emissions(read_annual_emissions(base_dir_results[BASE]), 
-                                  country = False)
+    df5 = base_results[BASE].emissions_global
     
     df6_dict = {}
     df7_dict = {}
     df8_dict = {}
 
     for run in runs:
-        df1_dict[run] = format_annual_emissions(read_annual_emissions(base_dir_results[run]), 
-                                                country = False)
+        df1_dict[run] = base_results[run].emissions_global
         df2_dict[run] = {}
-        
-        df3_dict[run] = read_headline_metrics(base_dir_results_summaries[run]) 
-        
+    
+        df3_dict[run] = base_results[run].headline_metrics 
+    
         df4_dict[run] = {}
-        
+    
         for scenario, trn in scenarios.items():
 
-            capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-            if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-                df2_dict[run][scenario] = format_annual_emissions(read_annual_emissions(
-                    scen_dir_results[run].get(scenario)), 
-                    country = False)
-                
-                df4_dict[run][scenario] = read_headline_metrics(
-                    scen_dir_results_summaries[run].get(scenario))
-            
-                df6_dict[scenario] = format_annual_emissions(read_annual_emissions(
-                    scen_dir_results[BASE].get(scenario)), 
-                    country = False)
-                
-                df8_dict[scenario] = geo_filter_tech_emissions(read_annual_technology_emission(
-                    scen_dir_results[BASE].get(scenario)), scenario)
+            if trn_index[(run, scenario)]['built']:
+                df2_dict[run][scenario] = scen_results[run][scenario].emissions_global
+    
+                df4_dict[run][scenario] = scen_results[run][scenario].headline_metrics
+    
+                df6_dict[scenario] = scen_results[BASE][scenario].emissions_global
+    
+                df8_dict[scenario] = geo_filter_tech_emissions(scen_results[BASE][scenario].annual_technology_emission, scenario)
 
                 df8_dict[scenario] = format_annual_emissions(df8_dict[scenario], country = False)
-            
-            
-            df7_dict[scenario] = geo_filter_tech_emissions(read_annual_technology_emission(
-                base_dir_results[BASE]), scenario)
+    
+    
+            df7_dict[scenario] = geo_filter_tech_emissions(base_results[BASE].annual_technology_emission, scenario)
 
             df7_dict[scenario] = format_annual_emissions(df7_dict[scenario], country = False)
     
@@ -1172,261 +1100,206 @@ if sensitivity_dict.get('multi_plot_sensitivities') == 'yes':
         unit2 = '%'
         unit3 = 'Mt CO2'
 
-    format_bar_delta_multi_scenario_sensitivities_multi_plot(df1_dict, df2_dict, df3_dict, df4_dict,
-                                                             df5, df6_dict, df7_dict, df8_dict,
-                                                             sensitivities_path, file_name, 
-                                                             SENSITIVTIES_COLOR_DICT, BAR_GEN_SHARES_COLOR_DICT,
-                                                             SENSITIVTIES_HATCH_DICT,
-                                                             unit1, unit2, unit3, axis_sort_delta,
-                                                             runs, BASE)
-    
-if sensitivity_dict.get('multi_plot_cap_gen_genshares_emisssions') == 'yes':
+    charts.submit(format_bar_delta_multi_scenario_sensitivities_multi_plot, df1_dict, df2_dict, df3_dict, df4_dict,
+                                                                            df5, df6_dict, df7_dict, df8_dict,
+                                                                            sensitivities_path, file_name, 
+                                                                            SENSITIVTIES_COLOR_DICT, BAR_GEN_SHARES_COLOR_DICT,
+                                                                            SENSITIVTIES_HATCH_DICT,
+                                                                            unit1, unit2, unit3, axis_sort_delta,
+                                                                            runs, BASE)
+
+@graph.chart(sensitivity_dict, 'multi_plot_cap_gen_genshares_emisssions', runs = runs)
+def sensitivity_multi_plot_cap_gen_genshares_emissions():
     for run in runs:
     
-        df1 = read_capacity_country(base_dir_results_summaries[run])
+        df1 = base_results[run].capacity_country
         unit1 = 'GW'
     
-        df2 = read_technology_annual_activity(base_dir_results[run])
-        df2 = format_technology_col(df2, node = None)
-        df2 = convert_pj_to_twh(df2)
+        df2 = base_results[run].generation_twh
         unit2 = 'TWh'    
-        
-        df3 = read_generation_shares_global(base_dir_results_summaries[run])
+    
+        df3 = base_results[run].generation_shares_global
         unit3 = '%'    
-        
-        df4 = format_annual_emissions(read_annual_emissions(base_dir_results[run]), 
-                                      country = True)
+    
+        df4 = base_results[run].emissions_country
         unit4 = 'Mt CO2'
     
-        df5 = read_annual_emission_intensity_global(base_dir_results_summaries[run])
+        df5 = base_results[run].annual_emission_intensity_global
         unit5 = 'gCO2/kWh'
         file_name = 'multi_plot_cap_gen_genshares_emissions'
-        
+    
         chart_title = run
         path = f'{sensitivities_path}/{run}'
-        
-        format_multi_plot_cap_gen_genshares_emissions(df1, df2, df3, df4, df5,
-                                                      unit1, unit2, unit3, unit4, unit5,
-                                                      path, file_name, chart_title,
-                                                      BAR_TECH_COLOR_DICT,
-                                                      BAR_GEN_SHARES_COLOR_DICT, 
-                                                      COUNTRY_COLOR_DICT)
-        
-if sensitivity_dict.get('multi_plot_scen_comparison') == 'yes':
+    
+        charts.submit(format_multi_plot_cap_gen_genshares_emissions, df1, df2, df3, df4, df5,
+                                                                     unit1, unit2, unit3, unit4, unit5,
+                                                                     path, file_name, chart_title,
+                                                                     BAR_TECH_COLOR_DICT,
+                                                                     BAR_GEN_SHARES_COLOR_DICT, 
+                                                                     COUNTRY_COLOR_DICT)
+
+@graph.chart(sensitivity_dict, 'multi_plot_scen_comparison', runs = runs)
+def sensitivity_multi_plot_scen_comparison(trn_index, capacity_delta, generation_delta):
     for run in runs:
-        df1a = read_new_capacity(base_dir_results[run])
-        df1a = format_technology_col(df1a, node = None)
-        
-        df2a = read_technology_annual_activity(base_dir_results[run])
-        df2a = format_technology_col(df2a, node = None)
-        df2a = convert_pj_to_twh(df2a)
-        
-        df3 = read_headline_metrics(base_dir_results_summaries[run]) 
-        df4 = format_annual_emissions(read_annual_emissions(base_dir_results[run]), 
-                                      country = False)
-        
+        df3 = base_results[run].headline_metrics 
+        df4 = base_results[run].emissions_global
+    
         df1_dict = {}
         df2_dict = {}
         df3_dict = {}
         df4_dict = {}
-        
+    
         unit1 = 'GW'
         unit2 = 'TWh'
         unit3 = '%'
         unit4 = 'Mt CO2'
-        
+    
         file_name = 'multi_plot_scen_comparison'
         chart_title = ''
     
         for scenario, trn in scenarios.items():
-            capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-            if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-                df1b = read_new_capacity(scen_dir_results[run].get(scenario))
-                df1b = format_technology_col(df1b, node = None)
-                
-                df2b = read_technology_annual_activity(scen_dir_results[run].get(scenario))
-                df2b = format_technology_col(df2b, node = None)
-                df2b = convert_pj_to_twh(df2b)
-                
-                df1_dict[scenario] = calculate_results_delta(df1a, df1b, ['TECH'],
-                                                             scenario, nodal_results,
-                                                             node = None)
-                
-                df2_dict[scenario] = calculate_results_delta(df2a, df2b, ['TECH'],
-                                                             scenario, nodal_results,
-                                                             node = None)
-                
-                df3_dict[scenario] = read_headline_metrics(scen_dir_results_summaries[run].get(scenario))
-                
-                df4_dict[scenario] = format_annual_emissions(read_annual_emissions(
-                    scen_dir_results[run].get(scenario)), country = False)
-    
-        format_multi_plot_scen_comparison(df1_dict, df2_dict, df3, df3_dict, 
-                                          df4, df4_dict, unit1, unit2, unit3, 
-                                          unit4, BAR_TECH_COLOR_DICT,
-                                          BAR_GEN_SHARES_COLOR_DICT,
-                                          DUAL_EMISSIONS_COLOR_DICT,
-                                          f'{sensitivities_path}/{run}', file_name, 
-                                          chart_title, axis_sort_delta)
-        
-'''Create charts for scenario comparison per sensitivity.'''
-for run in sensitivity_scenario_dict_runs:
-    for scenario, trn in scenarios.items():
-        capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-        if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
+            if trn_index[(run, scenario)]['built']:
+                df1_dict[scenario] = capacity_delta[run][scenario][('TECH',)]
     
-            if sensitivity_scen_comparison_dict.get('pwr_cap_bar_dif_global') == 'yes':
-                df1 = read_new_capacity(base_dir_results[run])
-                df1 = format_technology_col(df1, node = None)
-                
-                df2 = read_new_capacity(scen_dir_results[run].get(scenario))
-                df2 = format_technology_col(df2, node = None)
-                
-                df3 = calculate_results_delta(df1, df2, ['TECH', 'YEAR'],
-                                              scenario, nodal_results, node = None)
+                df2_dict[scenario] = generation_delta[run][scenario][('TECH',)]
+    
+                df3_dict[scenario] = scen_results[run][scenario].headline_metrics
+    
+                df4_dict[scenario] = scen_results[run][scenario].emissions_global
+    
+        charts.submit(format_multi_plot_scen_comparison, df1_dict, df2_dict, df3, df3_dict, 
+                                                         df4, df4_dict, unit1, unit2, unit3, 
+                                                         unit4, BAR_TECH_COLOR_DICT,
+                                                         BAR_GEN_SHARES_COLOR_DICT,
+                                                         DUAL_EMISSIONS_COLOR_DICT,
+                                                         f'{sensitivities_path}/{run}', file_name, 
+                                                         chart_title, axis_sort_delta)
+
+'''Create charts for scenario comparison per sensitivity.'''
+
+@graph.chart(sensitivity_scen_comparison_dict, 'pwr_cap_bar_dif_global', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_pwr_cap_bar_dif_global(trn_index, capacity_delta):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                df3 = capacity_delta[run][scenario][('TECH', 'YEAR')]
                 
-                df4 = calculate_results_delta(df1, df2, ['TECH'],
-                                              scenario, nodal_results, node = None)
+                df4 = capacity_delta[run][scenario][('TECH',)]
         
                 chart_title = f'{scenario} New Capacity - Delta'
                 legend_title = ''
                 file_name = 'pwr_new_cap_bar_delta'
                 unit = 'GW'
                 
-                format_stacked_bar_pwr_delta(df3, df4, sensitivity_path[run][scenario], 
-                                             chart_title, legend_title, file_name, 
-                                             BAR_TECH_COLOR_DICT, unit, start_year,
-                                             end_year)
-                
-        
-            if sensitivity_scen_comparison_dict.get('pwr_cap_bar_dif_country') == 'yes':
-                df1 = read_new_capacity(base_dir_results[run])
-                df1 = format_technology_col(df1, node = None)
-                
-                df2 = read_new_capacity(scen_dir_results[run].get(scenario))
-                df2 = format_technology_col(df2, node = None)
-                
-                df3 = calculate_results_delta(df1, df2, ['COUNTRY', 'TECH', 'YEAR'],
-                                              scenario, nodal_results, node = None)
+                charts.submit(format_stacked_bar_pwr_delta, df3, df4, sensitivity_path[run][scenario], 
+                                                            chart_title, legend_title, file_name, 
+                                                            BAR_TECH_COLOR_DICT, unit, start_year,
+                                                            end_year)
+
+@graph.chart(sensitivity_scen_comparison_dict, 'pwr_cap_bar_dif_country', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_pwr_cap_bar_dif_country(trn_index, capacity_delta):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                df3 = capacity_delta[run][scenario][('COUNTRY', 'TECH', 'YEAR')]
                 
-                df4 = calculate_results_delta(df1, df2, ['COUNTRY', 'TECH'],
-                                              scenario, nodal_results, node = None)
+                df4 = capacity_delta[run][scenario][('COUNTRY', 'TECH')]
         
                 chart_title = f'{scenario} New Capacity - Delta'
                 legend_title = ''
                 file_name = 'pwr_new_cap_bar_delta_country'
                 unit = 'GW'
                 
-                format_stacked_bar_pwr_delta_spatial(df3, df4, sensitivity_path[run][scenario], 
-                                                     chart_title, legend_title, file_name, 
-                                                     BAR_TECH_COLOR_DICT, unit, start_year,
-                                                     end_year, 'COUNTRY')
-            
-            if scenario in nodal_results.keys():
-            
-                if sensitivity_scen_comparison_dict.get('pwr_cap_bar_dif_node') == 'yes':
-                    df1 = read_new_capacity(base_dir_results[run])
-                    df1 = format_technology_col(df1, node = True)
-                    
-                    df2 = read_new_capacity(scen_dir_results[run].get(scenario))
-                    df2 = format_technology_col(df2, node = True)
-                    
-                    df3 = calculate_results_delta(df1, df2, ['NODE', 'TECH', 'YEAR'],
-                                                  scenario, nodal_results, node = True)
+                charts.submit(format_stacked_bar_pwr_delta_spatial, df3, df4, sensitivity_path[run][scenario], 
+                                                                    chart_title, legend_title, file_name, 
+                                                                    BAR_TECH_COLOR_DICT, unit, start_year,
+                                                                    end_year, 'COUNTRY')
+
+@graph.chart(sensitivity_scen_comparison_dict, 'pwr_cap_bar_dif_node', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_pwr_cap_bar_dif_node(trn_index, capacity_nodal_delta):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                if scenario in nodal_results.keys():
+                    df3 = capacity_nodal_delta[run][scenario][('NODE', 'TECH', 'YEAR')]
                     
-                    df4 = calculate_results_delta(df1, df2, ['NODE', 'TECH'],
-                                                  scenario, nodal_results, node = True)
+                    df4 = capacity_nodal_delta[run][scenario][('NODE', 'TECH')]
             
                     chart_title = f'{scenario} New Capacity - Delta'
                     legend_title = ''
                     file_name = 'pwr_new_cap_bar_delta_node'
                     unit = 'GW'
                     
-                    format_stacked_bar_pwr_delta_spatial(df3, df4, sensitivity_path[run][scenario], 
-                                                         chart_title, legend_title, file_name, 
-                                                         BAR_TECH_COLOR_DICT, unit, start_year,
-                                                         end_year, 'NODE')
-                
-            if sensitivity_scen_comparison_dict.get('pwr_gen_bar_dif_global') == 'yes':
-                df1 = read_technology_annual_activity(base_dir_results[run])
-                df1 = format_technology_col(df1, node = None)
-                df1 = convert_pj_to_twh(df1)
-                
-                df2 = read_technology_annual_activity(scen_dir_results[run].get(scenario))
-                df2 = format_technology_col(df2, node = None)
-                df2 = convert_pj_to_twh(df2)
-                
-                df3 = calculate_results_delta(df1, df2, ['TECH', 'YEAR'],
-                                              scenario, nodal_results, node = None)
+                    charts.submit(format_stacked_bar_pwr_delta_spatial, df3, df4, sensitivity_path[run][scenario], 
+                                                                        chart_title, legend_title, file_name, 
+                                                                        BAR_TECH_COLOR_DICT, unit, start_year,
+                                                                        end_year, 'NODE')
+
+@graph.chart(sensitivity_scen_comparison_dict, 'pwr_gen_bar_dif_global', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_pwr_gen_bar_dif_global(trn_index, generation_delta):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                df3 = generation_delta[run][scenario][('TECH', 'YEAR')]
                 
-                df4 = calculate_results_delta(df1, df2, ['TECH'],
-                                              scenario, nodal_results, node = None)
+                df4 = generation_delta[run][scenario][('TECH',)]
         
                 chart_title = f'{scenario} Generation - Delta'
                 legend_title = ''
                 file_name = 'pwr_gen_bar_delta'
                 unit = 'TWh'
                 
-                format_stacked_bar_pwr_delta(df3, df4, sensitivity_path[run][scenario], 
-                                             chart_title, legend_title, file_name, 
-                                             BAR_TECH_COLOR_DICT, unit, start_year,
-                                             end_year)
-                
-            if sensitivity_scen_comparison_dict.get('pwr_gen_bar_dif_country') == 'yes':
-                df1 = read_technology_annual_activity(base_dir_results[run])
-                df1 = format_technology_col(df1, node = None)
-                df1 = convert_pj_to_twh(df1)
-                
-                df2 = read_technology_annual_activity(scen_dir_results[run].get(scenario))
-                df2 = format_technology_col(df2, node = None)
-                df2 = convert_pj_to_twh(df2)
-                
-                df3 = calculate_results_delta(df1, df2, ['COUNTRY', 'TECH', 'YEAR'],
-                                              scenario, nodal_results, node = None)
+                charts.submit(format_stacked_bar_pwr_delta, df3, df4, sensitivity_path[run][scenario], 
+                                                            chart_title, legend_title, file_name, 
+                                                            BAR_TECH_COLOR_DICT, unit, start_year,
+                                                            end_year)
+
+@graph.chart(sensitivity_scen_comparison_dict, 'pwr_gen_bar_dif_country', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_pwr_gen_bar_dif_country(trn_index, generation_delta):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                df3 = generation_delta[run][scenario][('COUNTRY', 'TECH', 'YEAR')]
                 
-                df4 = calculate_results_delta(df1, df2, ['COUNTRY', 'TECH'],
-                                              scenario, nodal_results, node = None)
+                df4 = generation_delta[run][scenario][('COUNTRY', 'TECH')]
         
                 chart_title = f'{scenario} Generation - Delta'
                 legend_title = ''
                 file_name = 'pwr_gen_bar_delta_country'
                 unit = 'TWh'
         
-                format_stacked_bar_pwr_delta_spatial(df3, df4, sensitivity_path[run][scenario], 
-                                                     chart_title, legend_title, file_name, 
-                                                     BAR_TECH_COLOR_DICT, unit, start_year,
-                                                     end_year, 'COUNTRY')
-                
-            if scenario in nodal_results.keys():
-                
-                if sensitivity_scen_comparison_dict.get('pwr_gen_bar_dif_node') == 'yes':
-                    df1 = read_technology_annual_activity(base_dir_results[run])
-                    df1 = format_technology_col(df1, node = True)
-                    df1 = convert_pj_to_twh(df1)
-                    
-                    df2 = read_technology_annual_activity(scen_dir_results[run].get(scenario))
-                    df2 = format_technology_col(df2, node = True)
-                    df2 = convert_pj_to_twh(df2)
-                    
-                    df3 = calculate_results_delta(df1, df2, ['NODE', 'TECH', 'YEAR'],
-                                                  scenario, nodal_results, node = True)
+                charts.submit(format_stacked_bar_pwr_delta_spatial, df3, df4, sensitivity_path[run][scenario], 
+                                                                    chart_title, legend_title, file_name, 
+                                                                    BAR_TECH_COLOR_DICT, unit, start_year,
+                                                                    end_year, 'COUNTRY')
+
+@graph.chart(sensitivity_scen_comparison_dict, 'pwr_gen_bar_dif_node', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_pwr_gen_bar_dif_node(trn_index, generation_nodal_delta):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                if scenario in nodal_results.keys():
+                    df3 = generation_nodal_delta[run][scenario][('NODE', 'TECH', 'YEAR')]
                     
-                    df4 = calculate_results_delta(df1, df2, ['NODE', 'TECH'],
-                                                  scenario, nodal_results, node = True)
+                    df4 = generation_nodal_delta[run][scenario][('NODE', 'TECH')]
             
                     chart_title = f'{scenario} Generation - Delta'
                     legend_title = ''
                     file_name = 'pwr_gen_bar_delta_node'
                     unit = 'TWh'
             
-                    format_stacked_bar_pwr_delta_spatial(df3, df4, sensitivity_path[run][scenario], 
-                                                         chart_title, legend_title, file_name, 
-                                                         BAR_TECH_COLOR_DICT, unit, start_year,
-                                                         end_year, 'NODE')
-        
-            if sensitivity_scen_comparison_dict.get('costs_dif_global') == 'yes':
-                df1 = read_total_discounted_cost(base_dir_results[run])
-                df2 = read_total_discounted_cost(scen_dir_results[run].get(scenario))
+                    charts.submit(format_stacked_bar_pwr_delta_spatial, df3, df4, sensitivity_path[run][scenario], 
+                                                                        chart_title, legend_title, file_name, 
+                                                                        BAR_TECH_COLOR_DICT, unit, start_year,
+                                                                        end_year, 'NODE')
+
+@graph.chart(sensitivity_scen_comparison_dict, 'costs_dif_global', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_costs_dif_global(trn_index):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                df1 = base_results[run].total_discounted_cost
+                df2 = scen_results[run][scenario].total_discounted_cost
                 convert_million_to_billion(df1)
                 convert_million_to_billion(df2)
                 
@@ -1435,31 +1308,36 @@ for run in sensitivity_scenario_dict_runs:
                 file_name = 'costs_delta_global'
                 unit = 'Billion $'
         
-                format_bar_delta(df1, df2, sensitivity_path[run][scenario], 
-                                 chart_title, legend_title, 
-                                 file_name, DUAL_COSTS_COLOR_DICT, 
-                                 unit, country = None)
-    
-            if sensitivity_scen_comparison_dict.get('emissions_dif_global') == 'yes':
-                df1 = format_annual_emissions(read_annual_emissions(base_dir_results[run]), 
-                                              country = False)
-                df2 = format_annual_emissions(read_annual_emissions(
-                    scen_dir_results[run].get(scenario)), 
-                    country = False)
+                charts.submit(format_bar_delta, df1, df2, sensitivity_path[run][scenario], 
+                                                chart_title, legend_title, 
+                                                file_name, DUAL_COSTS_COLOR_DICT, 
+                                                unit, country = None)
+
+@graph.chart(sensitivity_scen_comparison_dict, 'emissions_dif_global', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_emissions_dif_global(trn_index):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                df1 = base_results[run].emissions_global
+                df2 = scen_results[run][scenario].emissions_global
                 
                 chart_title = f'{scenario} Emissions - Delta'
                 legend_title = ''
                 file_name = 'emissions_delta_global'
                 unit = 'Mt CO2'
                 
-                format_bar_delta(df1, df2, sensitivity_path[run][scenario], 
-                                 chart_title, legend_title, 
-                                 file_name, DUAL_EMISSIONS_COLOR_DICT, 
-                                 unit, country = None)
-                
-            if sensitivity_scen_comparison_dict.get('costs_dif_country') == 'yes':
-                df1 = read_total_cost_country(base_dir_results_summaries[run])
-                df2 = read_total_cost_country(scen_dir_results_summaries[run].get(scenario))
+                charts.submit(format_bar_delta, df1, df2, sensitivity_path[run][scenario], 
+                                                chart_title, legend_title, 
+                                                file_name, DUAL_EMISSIONS_COLOR_DICT, 
+                                                unit, country = None)
+
+@graph.chart(sensitivity_scen_comparison_dict, 'costs_dif_country', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_costs_dif_country(trn_index):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                df1 = base_results[run].total_cost_country
+                df2 = scen_results[run][scenario].total_cost_country
                 convert_million_to_billion(df1)
                 convert_million_to_billion(df2)
                 
@@ -1468,93 +1346,82 @@ for run in sensitivity_scenario_dict_runs:
                 file_name = 'costs_delta_country'
                 unit = 'Billion $'
         
-                format_bar_delta_country(df1, df2, sensitivity_path[run][scenario], 
-                                         chart_title, legend_title, 
-                                         file_name, COUNTRY_COLOR_DICT, 
-                                         unit)
-                
-            if sensitivity_scen_comparison_dict.get('emissions_dif_country') == 'yes':
-                df1 = format_annual_emissions(read_annual_emissions(base_dir_results[run]), 
-                                              country = True)
-                df2 = format_annual_emissions(read_annual_emissions(
-                    scen_dir_results[run].get(scenario)), 
-                    country = True)
+                charts.submit(format_bar_delta_country, df1, df2, sensitivity_path[run][scenario], 
+                                                        chart_title, legend_title, 
+                                                        file_name, COUNTRY_COLOR_DICT, 
+                                                        unit)
+
+@graph.chart(sensitivity_scen_comparison_dict, 'emissions_dif_country', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_emissions_dif_country(trn_index):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                df1 = base_results[run].emissions_country
+                df2 = scen_results[run][scenario].emissions_country
                 
                 chart_title = f'{scenario} Emissions - Delta'
                 legend_title = ''
                 file_name = 'emissions_delta_country'
                 unit = 'Mt CO2'
                 
-                format_bar_delta_country(df1, df2, sensitivity_path[run][scenario], 
-                                         chart_title, legend_title, 
-                                         file_name, COUNTRY_COLOR_DICT, 
-                                         unit)           
-                
-            if sensitivity_scen_comparison_dict.get('pwr_gen_shares_dif_global') == 'yes':
-                df1 = read_generation_shares_global(base_dir_results_summaries[run])
-                df2 = read_generation_shares_global(scen_dir_results_summaries[run].get(scenario))
+                charts.submit(format_bar_delta_country, df1, df2, sensitivity_path[run][scenario], 
+                                                        chart_title, legend_title, 
+                                                        file_name, COUNTRY_COLOR_DICT, 
+                                                        unit)           
+
+@graph.chart(sensitivity_scen_comparison_dict, 'pwr_gen_shares_dif_global', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_pwr_gen_shares_dif_global(trn_index):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
+                df1 = base_results[run].generation_shares_global
+                df2 = scen_results[run][scenario].generation_shares_global
                 
-                df3 = read_headline_metrics(base_dir_results_summaries[run])
-                df4 = read_headline_metrics(scen_dir_results_summaries[run].get(scenario))
+                df3 = base_results[run].headline_metrics
+                df4 = scen_results[run][scenario].headline_metrics
                 
                 chart_title = 'Generation Shares - Delta'
                 legend_title = ''
                 file_name = 'pwr_gen_shares_delta'
                 unit = '%'    
                 
-                format_stacked_bar_gen_shares_delta(df1, df2, df3, df4, sensitivity_path[run][scenario], 
-                                                    chart_title, legend_title, file_name, 
-                                                    BAR_GEN_SHARES_COLOR_DICT, unit)
-                
-            if sensitivity_scen_comparison_dict.get('headline_metrics_dif_global') == 'yes':
-        
+                charts.submit(format_stacked_bar_gen_shares_delta, df1, df2, df3, df4, sensitivity_path[run][scenario], 
+                                                                   chart_title, legend_title, file_name, 
+                                                                   BAR_GEN_SHARES_COLOR_DICT, unit)
+
+@graph.chart(sensitivity_scen_comparison_dict, 'headline_metrics_dif_global', runs = sensitivity_scenario_dict_runs)
+def sensitivity_scen_headline_metrics_dif_global(trn_index, capacity_delta, generation_delta):
+    for run in sensitivity_scenario_dict_runs:
+        for scenario, trn in scenarios.items():
+            if trn_index[(run, scenario)]['built']:
                 # Set inputs for capacity subplot
-                capacity_base = read_new_capacity(base_dir_results[run])
-                capacity_base = format_technology_col(capacity_base, node = None)
-                
-                capacity_scen = read_new_capacity(scen_dir_results[run].get(scenario))
-                capacity_scen = format_technology_col(capacity_scen, node = None)
-                
-                capacity = calculate_results_delta(capacity_base, capacity_scen, ['TECH'],
-                                                   scenario, nodal_results,  node = None)
+                capacity = capacity_delta[run][scenario][('TECH',)]
                 capacity_title = 'Capacity (GW)'
         
                 # Set inputs for generation subplot
-                production_base = read_technology_annual_activity(base_dir_results[run])
-                production_base = format_technology_col(production_base, node = None)
-                production_base = convert_pj_to_twh(production_base)
-                
-                production_scen = read_technology_annual_activity(scen_dir_results[run].get(scenario))
-                production_scen = format_technology_col(production_scen, node = None)
-                production_scen = convert_pj_to_twh(production_scen)
-        
-                production = calculate_results_delta(production_base, production_scen, ['TECH'],
-                                                     scenario, nodal_results,  node = None)
+                production = generation_delta[run][scenario][('TECH',)]
                 production_title = 'Generation (TWh)'
-                 
+                
                 # Set inputs for generation shares subplot
-                gen_shares_base = read_headline_metrics(base_dir_results_summaries[run])
-                gen_shares_scen = read_headline_metrics(scen_dir_results_summaries[run].get(scenario))
+                gen_shares_base = base_results[run].headline_metrics
+                gen_shares_scen = scen_results[run][scenario].headline_metrics
                 gen_shares_title = 'Generation Share (%)'
                 
                 # Set inputs for emissions subplot
-                emissions_base = format_annual_emissions(read_annual_emissions(base_dir_results[run]), 
-                                              country = True)
-                emissions_scen = format_annual_emissions(read_annual_emissions(
-                    scen_dir_results[run].get(scenario)), 
-                    country = True)
+                emissions_base = base_results[run].emissions_country
+                emissions_scen = scen_results[run][scenario].emissions_country
                 emissions_title = 'Emissions (Mt CO2)'
                 
                 # Set inputs for costs subplot
-                costs_base = read_total_discounted_cost(base_dir_results[run])
-                costs_scen = read_total_discounted_cost(scen_dir_results[run].get(scenario))           
+                costs_base = base_results[run].total_discounted_cost
+                costs_scen = scen_results[run][scenario].total_discounted_cost           
                 convert_million_to_billion(costs_base)
                 convert_million_to_billion(costs_scen)
                 costs_title = 'Total Costs (Billion $)'
                 
                 # Set inputs for transmission capacity subplot
-                capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-                max_capacity_trn = read_max_capacity_investment(scen_dir_data[run].get(scenario))
+                capacity_trn = scen_results[run][scenario].new_capacity
+                max_capacity_trn = scen_results[run][scenario].max_capacity_investment
                 trn_title = f'{scenario} Capacity (GW)'
         
                 # Set chart inputs
@@ -1562,144 +1429,163 @@ for run in sensitivity_scenario_dict_runs:
                 file_name = 'headline_metrics_delta'
         
                 # Create chart
-                format_headline_metrics_global(capacity, production,
-                                               capacity_title, production_title, 
-                                               BAR_TECH_COLOR_DICT, BAR_TECH_COLOR_DICT,
-                                               gen_shares_base, gen_shares_scen, 
-                                               gen_shares_title, BAR_GEN_SHARES_COLOR_DICT,
-                                               emissions_base, emissions_scen,
-                                               emissions_title, DUAL_EMISSIONS_COLOR_DICT,
-                                               costs_base, costs_scen,
-                                               costs_title, DUAL_COSTS_COLOR_DICT,
-                                               capacity_trn, max_capacity_trn,
-                                               trn_title, DUAL_TRANSMISSION_COLOR_DICT,
-                                               sensitivity_path[run][scenario], chart_title, 
-                                               file_name, scenario
-                                               )
-
-    if sensitivity_multi_scen_comparison_dict.get('emissions_dif') == 'yes':
-        df1 = format_annual_emissions(read_annual_emissions(base_dir_results[run]), 
-                                      country = False)
+                charts.submit(format_headline_metrics_global, capacity, production,
+                                                              capacity_title, production_title, 
+                                                              BAR_TECH_COLOR_DICT, BAR_TECH_COLOR_DICT,
+                                                              gen_shares_base, gen_shares_scen, 
+                                                              gen_shares_title, BAR_GEN_SHARES_COLOR_DICT,
+                                                              emissions_base, emissions_scen,
+                                                              emissions_title, DUAL_EMISSIONS_COLOR_DICT,
+                                                              costs_base, costs_scen,
+                                                              costs_title, DUAL_COSTS_COLOR_DICT,
+                                                              capacity_trn, max_capacity_trn,
+                                                              trn_title, DUAL_TRANSMISSION_COLOR_DICT,
+                                                              sensitivity_path[run][scenario], chart_title, 
+                                                              file_name, scenario
+                                                              )
+
+@graph.chart(sensitivity_multi_scen_comparison_dict, 'emissions_dif', runs = sensitivity_scenario_dict_runs)
+def sensitivity_multi_scen_emissions_dif(trn_index):
+    for run in sensitivity_scenario_dict_runs:
+        df1 = base_results[run].emissions_global
         df2_dict = {}
         
         for scenario, trn in scenarios.items():
-            capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-            if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-                df2_dict[scenario] = format_annual_emissions(read_annual_emissions(
-                    scen_dir_results[run].get(scenario)), 
-                    country = False)
+            if trn_index[(run, scenario)]['built']:
+                df2_dict[scenario] = scen_results[run][scenario].emissions_global
     
         chart_title = 'Emissions - Delta'
         file_name = 'emissions_delta_global'
         unit = 'Mt CO2'
-                
-        format_bar_delta_multi_scenario(df1, df2_dict, f'{sensitivities_path}/{run}', 
-                                        chart_title, file_name, 
-                                        DUAL_EMISSIONS_COLOR_DICT, unit, 
-                                        system_delta, axis_sort_delta)
+        
+        charts.submit(format_bar_delta_multi_scenario, df1, df2_dict, f'{sensitivities_path}/{run}', 
+                                                       chart_title, file_name, 
+                                                       DUAL_EMISSIONS_COLOR_DICT, unit, 
+                                                       system_delta, axis_sort_delta)
 
-    if sensitivity_multi_scen_comparison_dict.get('costs_dif') == 'yes':
-        df1 = read_total_discounted_cost(base_dir_results[run])
+@graph.chart(sensitivity_multi_scen_comparison_dict, 'costs_dif', runs = sensitivity_scenario_dict_runs)
+def sensitivity_multi_scen_costs_dif(trn_index):
+    for run in sensitivity_scenario_dict_runs:
+        df1 = base_results[run].total_discounted_cost
         convert_million_to_billion(df1)    
         df2_dict = {}
         
         for scenario, trn in scenarios.items():
-            capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-            if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-                df2_dict[scenario] = read_total_discounted_cost(
-                    scen_dir_results[run].get(scenario))
+            if trn_index[(run, scenario)]['built']:
+                df2_dict[scenario] = scen_results[run][scenario].total_discounted_cost
                 convert_million_to_billion(df2_dict[scenario])
     
         chart_title = 'System Costs - Delta'
         file_name = 'costs_delta_global'
         unit = 'Billion $'
     
-        format_bar_delta_multi_scenario(df1, df2_dict, f'{sensitivities_path}/{run}', 
-                                        chart_title, file_name, 
-                                        DUAL_COSTS_COLOR_DICT, unit, 
-                                        system_delta, axis_sort_delta)
-        
-    if sensitivity_multi_scen_comparison_dict.get('gen_shares_dif') == 'yes':
-        df1 = read_headline_metrics(base_dir_results_summaries[run]) 
+        charts.submit(format_bar_delta_multi_scenario, df1, df2_dict, f'{sensitivities_path}/{run}', 
+                                                       chart_title, file_name, 
+                                                       DUAL_COSTS_COLOR_DICT, unit, 
+                                                       system_delta, axis_sort_delta)
+
+@graph.chart(sensitivity_multi_scen_comparison_dict, 'gen_shares_dif', runs = sensitivity_scenario_dict_runs)
+def sensitivity_multi_scen_gen_shares_dif(trn_index):
+    for run in sensitivity_scenario_dict_runs:
+        df1 = base_results[run].headline_metrics 
         df2_dict = {}
         
         for scenario, trn in scenarios.items():
-            capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-            if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-                df2_dict[scenario] = read_headline_metrics(scen_dir_results_summaries[run].get(scenario))
+            if trn_index[(run, scenario)]['built']:
+                df2_dict[scenario] = scen_results[run][scenario].headline_metrics
     
         chart_title = 'Generation Shares - Delta'
         file_name = 'gen_shares_delta_global'
         unit = '%'
         
-        format_stacked_bar_gen_shares_delta_multi_scenario(df1, df2_dict, f'{sensitivities_path}/{run}', 
-                                                           chart_title, file_name, 
-                                                           BAR_GEN_SHARES_COLOR_DICT, unit,
-                                                           axis_sort_delta)
-        
-    if sensitivity_multi_scen_comparison_dict.get('trn_cap_dif') == 'yes':
+        charts.submit(format_stacked_bar_gen_shares_delta_multi_scenario, df1, df2_dict, f'{sensitivities_path}/{run}', 
+                                                                          chart_title, file_name, 
+                                                                          BAR_GEN_SHARES_COLOR_DICT, unit,
+                                                                          axis_sort_delta)
+
+@graph.chart(sensitivity_multi_scen_comparison_dict, 'trn_cap_dif', runs = sensitivity_scenario_dict_runs)
+def sensitivity_multi_scen_trn_cap_dif():
+    for run in sensitivity_scenario_dict_runs:
         df1_dict = {}
         df2_dict = {}
         
         for scenario, trn in scenarios.items():
-            df1_dict[scenario] = read_new_capacity(scen_dir_results[run].get(scenario))
-            df2_dict[scenario] = read_max_capacity_investment(scen_dir_data[run].get(scenario))
+            df1_dict[scenario] = scen_results[run][scenario].new_capacity
+            df2_dict[scenario] = scen_results[run][scenario].max_capacity_investment
     
         chart_title = 'Transmission Capacity'
         file_name = 'transmission_capacity_delta_global'
         unit = 'GW'
         
-        format_transmission_capacity_multi_scenario(df1_dict, df2_dict, f'{sensitivities_path}/{run}', 
-                                                    chart_title, file_name, 
-                                                    DUAL_TRANSMISSION_COLOR_DICT, unit,
-                                                    axis_sort_delta)
-        
-    if sensitivity_multi_scen_comparison_dict.get('capacity_dif') == 'yes':
-        df1 = read_new_capacity(base_dir_results[run])
-        df1 = format_technology_col(df1, node = None)
+        charts.submit(format_transmission_capacity_multi_scenario, df1_dict, df2_dict, f'{sensitivities_path}/{run}', 
+                                                                   chart_title, file_name, 
+                                                                   DUAL_TRANSMISSION_COLOR_DICT, unit,
+                                                                   axis_sort_delta)
+
+@graph.chart(sensitivity_multi_scen_comparison_dict, 'capacity_dif', runs = sensitivity_scenario_dict_runs)
+def sensitivity_multi_scen_capacity_dif(trn_index, capacity_delta):
+    for run in sensitivity_scenario_dict_runs:
         df2_dict = {}
         
         for scenario, trn in scenarios.items():
-            capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-            if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-                df2 = read_new_capacity(scen_dir_results[run].get(scenario))
-                df2 = format_technology_col(df2, node = None)
-                
-                df2_dict[scenario] = calculate_results_delta(df1, df2, ['TECH'],
-                                                             scenario, nodal_results,
-                                                             node = None)
-                
+            if trn_index[(run, scenario)]['built']:
+                df2_dict[scenario] = capacity_delta[run][scenario][('TECH',)]
+        
         chart_title = 'Capacity - Delta'
         file_name = 'capacity_delta_global'
         unit = 'GW'
         
-        format_stacked_bar_pwr_delta_multi_scenario(df2_dict, f'{sensitivities_path}/{run}', 
-                                                    chart_title, file_name, 
-                                                    BAR_TECH_COLOR_DICT, unit, 
-                                                    axis_sort_delta)
-        
-    if sensitivity_multi_scen_comparison_dict.get('generation_dif') == 'yes':
-        df1 = read_technology_annual_activity(base_dir_results[run])
-        df1 = format_technology_col(df1, node = None)
-        df1 = convert_pj_to_twh(df1)
+        charts.submit(format_stacked_bar_pwr_delta_multi_scenario, df2_dict, f'{sensitivities_path}/{run}', 
+                                                                   chart_title, file_name, 
+                                                                   BAR_TECH_COLOR_DICT, unit, 
+                                                                   axis_sort_delta)
+
+@graph.chart(sensitivity_multi_scen_comparison_dict, 'generation_dif', runs = sensitivity_scenario_dict_runs)
+def sensitivity_multi_scen_generation_dif(trn_index, generation_delta):
+    for run in sensitivity_scenario_dict_runs:
         df2_dict = {}
         
         for scenario, trn in scenarios.items():
-            capacity_trn = read_new_capacity(scen_dir_results[run].get(scenario))
-            if not capacity_trn.loc[capacity_trn['TECHNOLOGY'].isin(trn)].empty:
-                df2 = read_technology_annual_activity(scen_dir_results[run].get(scenario))
-                df2 = format_technology_col(df2, node = None)
-                df2 = convert_pj_to_twh(df2)
-                
-                df2_dict[scenario] = calculate_results_delta(df1, df2, ['TECH'],
-                                                             scenario, nodal_results,
-                                                             node = None)
-                
+            if trn_index[(run, scenario)]['built']:
+                df2_dict[scenario] = generation_delta[run][scenario][('TECH',)]
+        
         chart_title = 'Generation - Delta'
         file_name = 'generation_delta_global'
         unit = 'TWh'
         
-        format_stacked_bar_pwr_delta_multi_scenario(df2_dict, f'{sensitivities_path}/{run}', 
-                                                    chart_title, file_name, 
-                                                    BAR_TECH_COLOR_DICT, unit,
-                                                    axis_sort_delta)
\ No newline at end of file
+        charts.submit(format_stacked_bar_pwr_delta_multi_scenario, df2_dict, f'{sensitivities_path}/{run}', 
+                                                                   chart_title, file_name, 
+                                                                   BAR_TECH_COLOR_DICT, unit,
+                                                                   axis_sort_delta)
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+
+    set_cache_budget(cache_memory_budget)
+    set_sidecar_cache(sidecar_cache)
+    if trim_to_horizon:
+        set_year_window(start_year, end_year)
+
+    '''Check for and create output paths'''
+    out_dirs = [os.path.join(base_path, country) for country in countries]
+    out_dirs += list(scen_path.values()) + [multi_scenario_path]
+    out_dirs += [f'{sensitivities_path}/{run}' for run in runs]
+    for run in sensitivity_path.keys():
+        out_dirs += list(sensitivity_path[run].values())
+
+    for out_dir in out_dirs:
+        os.makedirs(out_dir, exist_ok = True)
+
+    '''Load the result tables of the enabled charts up front.'''
+    if load_workers:
+        loaded, seconds = bulk_load(graph.required_tables(), max_workers = load_workers)
+        print(f'Parsed {len(loaded)} result files ({loaded["BYTES"].sum() / 1024 ** 2:.1f} MB) '
+              f'in {seconds:.1f}s, {loaded["SECONDS"].sum():.1f}s parse time')
+
+    '''Compute the enabled charts, then render them.'''
+    graph.run()
+    charts.run()
+
+    graph.report()
+    charts.report(time.perf_counter() - start)
+    print(f'Result file cache: {cache_info()}')
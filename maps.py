@@ -0,0 +1,276 @@
+'''Basemap layers for the spatial maps in data.py'''
+import os
+import math
+import pickle
+import hashlib
+
+import numpy as np
+import pandas as pd
+import shapely
+import cartopy.crs as ccrs
+import cartopy.io.shapereader as shpreader
+
+'''Country geometries already loaded in this process, keyed by
+(resolution, extent, tolerance).'''
+_GEOMETRIES = {}
+
+'''Part of the extent added on each side before clipping, so the clipped
+edges of the polygons are never inside the visible map.'''
+_CLIP_MARGIN = 0.1
+
+def _cache_path(shapefile, key):
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+
+    return f'{shapefile}.{digest}.pkl'
+
+def _source_stamp(shapefile):
+    stat = os.stat(shapefile)
+
+    return (stat.st_size, stat.st_mtime_ns)
+
+def _read_country_geometries(shapefile, extent, tolerance):
+    x0, x1, y0, y1 = extent
+    dx, dy = (x1 - x0) * _CLIP_MARGIN, (y1 - y0) * _CLIP_MARGIN
+    bounds = (x0 - dx, y0 - dy, x1 + dx, y1 + dy)
+    clip_box = shapely.box(*bounds)
+
+    geometries = []
+    for record in shpreader.Reader(shapefile, bbox = bounds).records():
+        geometry = record.geometry
+        if geometry is None or not geometry.intersects(clip_box):
+            continue
+
+        geometry = shapely.clip_by_rect(geometry, *bounds)
+        if tolerance:
+            geometry = geometry.simplify(tolerance, preserve_topology = True)
+
+        if not geometry.is_empty:
+            geometries.append((record.attributes['ISO_A3'].rstrip('\x00'),
+                               geometry))
+
+    return geometries
+
+def country_geometries(extent, resolution = '10m', width = 6.4, dpi = 100):
+    '''List of (ISO_A3, geometry) of the Natural Earth admin_0 countries that
+    fall within extent ([lon0, lon1, lat0, lat1]), clipped to the extent and
+    simplified to half a pixel of a figure width inches wide saved at dpi.
+
+    The result is kept in memory and stored as WKB next to the shapefile, so
+    later calls and later runs do not read the shapefile. The stored file is
+    rebuilt when the shapefile changes.'''
+    tolerance = (extent[1] - extent[0]) / (width * dpi) / 2 if dpi else 0
+    key = (resolution, tuple(extent), round(tolerance, 9))
+
+    if key in _GEOMETRIES:
+        return _GEOMETRIES[key]
+
+    shapefile = shpreader.natural_earth(resolution = resolution,
+                                        category = 'cultural',
+                                        name = 'admin_0_countries')
+    cache_path = _cache_path(shapefile, key)
+    stamp = _source_stamp(shapefile)
+
+    geometries = None
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached['key'] == key and cached['source'] == stamp:
+                geometries = [(iso, shapely.from_wkb(wkb))
+                              for iso, wkb in cached['geometries']]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+            geometries = None
+
+    if geometries is None:
+        geometries = _read_country_geometries(shapefile, extent, tolerance)
+
+        # The stored geometries are a cache, a read-only data dir just means
+        # the shapefile is read once per process.
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'key' : key, 'source' : stamp,
+                             'geometries' : [(iso, shapely.to_wkb(geometry))
+                                             for iso, geometry in geometries]}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    _GEOMETRIES[key] = geometries
+
+    return geometries
+
+def project_points(lon, lat, projection):
+    '''Project arrays of longitudes and latitudes (degrees) to projection in
+    a single call.'''
+    points = projection.transform_points(ccrs.Geodetic(),
+                                         np.asarray(lon, dtype = float),
+                                         np.asarray(lat, dtype = float))
+
+    return points[:, 0], points[:, 1]
+
+def label_offsets(regions, label_adjust : dict, default = (0, 0)):
+    '''Offset table (DX, DY in map units) of the node labels, one row per 
+    region in the order given. Regions without an entry get the default 
+    offset.'''
+    offsets = pd.DataFrame.from_dict(label_adjust, orient = 'index',
+                                     columns = ['DX', 'DY'], dtype = float)
+    offsets = offsets.reindex(pd.Index(regions, name = 'region'))
+
+    return offsets.fillna({'DX' : default[0], 'DY' : default[1]})
+
+def map_extent(lon, lat, margin = 0.15, min_span = 10):
+    '''Extent ([lon0, lon1, lat0, lat1], whole degrees) around the given
+    points, padded by margin of its span on each side. Spans smaller than
+    min_span degrees (e.g. a single node) are widened to min_span.'''
+    extent = []
+    for values, limits in ((np.asarray(lon, dtype = float), (-180, 180)),
+                           (np.asarray(lat, dtype = float), (-90, 90))):
+        low, high = values.min(), values.max()
+        centre = (low + high) / 2
+        span = max(high - low, min_span) * (1 + 2 * margin)
+        extent += [max(math.floor(centre - span / 2), limits[0]),
+                   min(math.ceil(centre + span / 2), limits[1])]
+
+    return extent
+
+'''Curated label offsets (DX, DY in degrees) of the nodes of the ASEAN and
+ZIZABONA system maps, used instead of the automatic placement of 
+place_labels.'''
+LABEL_ADJUST = {'BRNXX' : [-4, 0.4], 'IDNJW' : [0, 0.4], 'IDNKA' : [-4.3, -0.8], 
+                'IDNML' : [-4, -1.3], 'IDNNU' : [-4, -1.3], 'IDNPP' : [-4, -1.3], 
+                'IDNSL' : [-3.5, -1.3], 'IDNSM' : [-4, 0.5], 'KHMXX' : [0, 0.4], 
+                'LAOXX' : [0, -1.5], 'MMRXX' : [-1.5, 0.6], 'MYSPE' : [0, 0.4], 
+                'MYSSH' : [-4, 0.5], 'MYSSK' : [0, -1.3], 'PHLLU' : [-4.3, -0.8], 
+                'PHLMI' : [0.7, -1.3], 'PHLVI' : [2.5, 0], 'SGPXX' : [0.5, 0], 
+                'THACE' : [0, 0.4], 'THANO' : [0, 0.6], 'THASO' : [0.1, 0.4], 
+                'VNMCE' : [0, 0.4], 'VNMNO' : [-4, 0.5], 'VNMSO' : [0.2, -1.5],
+                'AGOXX' : [0.3, 0.6], 'BWAXX' : [0.3, 0.6], 'CODXX' : [0.3, 0.6], 
+                'LSOXX' : [-4.2, -1.5], 'MOZXX' : [1, -0.5], 'MWIXX' : [0.3, 0.6], 
+                'NAMXX' : [0.3, 0.6], 'SWZXX' : [-2, -2], 'TZAXX' : [-4.2, -1.5], 
+                'ZAFXX' : [-4.2, -1.5], 'ZMBXX' : [0.3, 0.6], 'ZWEXX' : [0.3, 0.6]}
+
+'''Label positions tried by place_labels, in order of preference, as the 
+position of the lower left corner of the label relative to the node in units 
+of (label width, label height, gap): right, above, left, below and the 
+diagonals.'''
+_LABEL_POSITIONS = np.array([[0, -0.5, 1, 0], [-0.5, 0, 0, 1], [-1, -0.5, -1, 0], 
+                             [-0.5, -1, 0, -1], [0, 0, 1, 1], [-1, 0, -1, 1], 
+                             [0, -1, 1, -1], [-1, -1, -1, -1]])
+
+def _overlap(boxes, others):
+    '''Overlap area of every box (n, 4: x0, y0, x1, y1) with every other box 
+    (m, 4), summed per box.'''
+    if not len(others):
+        return np.zeros(len(boxes))
+
+    width = (np.minimum(boxes[:, None, 2], others[None, :, 2]) - 
+             np.maximum(boxes[:, None, 0], others[None, :, 0])).clip(min = 0)
+    height = (np.minimum(boxes[:, None, 3], others[None, :, 3]) - 
+              np.maximum(boxes[:, None, 1], others[None, :, 1])).clip(min = 0)
+
+    return (width * height).sum(axis = 1)
+
+def place_labels(x, y, labels, bounds, units_per_point, fontsize = 7, 
+                 marker_size = 5, overrides = None):
+    '''Offset table (DX, DY in map units) of the labels of the nodes at x, y
+    that keeps labels clear of the nodes, of each other and of the map edges 
+    (bounds: x0, x1, y0, y1) where possible. Labels with an offset in 
+    overrides ({label : [DX, DY]}, e.g. LABEL_ADJUST) keep it.
+    
+    Labels are placed one by one (greedy), after the overridden ones. For 
+    every label the candidate positions around its node are scored at once 
+    by their overlap with the nodes and the labels placed before, plus the 
+    part outside the map, and the first position with the lowest score is 
+    used.'''
+    x = np.asarray(x, dtype = float)
+    y = np.asarray(y, dtype = float)
+    labels = [str(label) for label in labels]
+
+    # Approximate label size: bold sans-serif glyphs are ~0.65 em wide.
+    widths = np.array([len(label) for label in labels]) * fontsize * 0.65 * units_per_point
+    height = fontsize * units_per_point
+    radius = np.sqrt(marker_size) / 2 * units_per_point
+    gap = radius + units_per_point
+    # Labels are drawn from their baseline, which is about a fifth of the 
+    # height above the bottom of the box.
+    baseline = height * 0.2
+
+    nodes = np.column_stack([x - radius, y - radius, x + radius, y + radius])
+    x0, x1, y0, y1 = bounds
+    outside = np.array([[-np.inf, -np.inf, x0, np.inf], [x1, -np.inf, np.inf, np.inf], 
+                        [-np.inf, -np.inf, np.inf, y0], [-np.inf, y1, np.inf, np.inf]])
+
+    offsets = label_offsets(labels, overrides or {}, 
+                            default = (np.nan, np.nan)).to_numpy()
+    fixed = ~np.isnan(offsets).any(axis = 1)
+    corners = np.column_stack([x, y])[fixed] + offsets[fixed] - [0, baseline]
+    placed = np.column_stack([corners, corners + np.column_stack(
+        [widths[fixed], np.full(fixed.sum(), height)])])
+
+    for i in np.flatnonzero(~fixed):
+        size = np.array([widths[i], height])
+        corners = (_LABEL_POSITIONS[:, :2] * size + _LABEL_POSITIONS[:, 2:] * gap 
+                   + [x[i], y[i]])
+        boxes = np.column_stack([corners, corners + size])
+        
+        score = (_overlap(boxes, np.vstack([nodes, placed])) 
+                 + _overlap(boxes, outside) * 10)
+
+        best = np.argmin(score)
+        offsets[i] = corners[best] - [x[i], y[i] - baseline]
+        placed = np.vstack([placed, boxes[best]])
+
+    return pd.DataFrame(offsets, columns = ['DX', 'DY'], 
+                        index = pd.Index(labels, name = 'region'))
+
+def _units_per_point(ax):
+    '''Map units per typographic point of a GeoAxes after its extent is set.'''
+    ax.apply_aspect()
+    x0, x1 = ax.get_xlim()
+    width = ax.get_position().width * ax.figure.get_figwidth() * 72
+
+    return (x1 - x0) / width
+
+def add_node_overlay(ax, df, label_adjust = None, color = 'red', size = 5,
+                     fontsize = 7):
+    '''Draw the node centerpoints of df (region, long, lat as returned by
+    read_centerpoints) on a GeoAxes as a single scatter, with a label next to
+    each node. Label offsets are computed by place_labels, offsets given in 
+    label_adjust ({region : [DX, DY]}, e.g. LABEL_ADJUST) take precedence.'''
+    x, y = project_points(df['long'], df['lat'], ax.projection)
+    ax.scatter(x, y, facecolor = color, zorder = 2, s = size)
+
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    offsets = place_labels(x, y, df['region'], (x0, x1, y0, y1), 
+                           _units_per_point(ax), fontsize = fontsize, 
+                           marker_size = size, overrides = label_adjust).to_numpy()
+
+    label_x = x + offsets[:, 0]
+    label_y = y + offsets[:, 1]
+
+    for region, lx, ly in zip(df['region'], label_x, label_y):
+        ax.text(lx, ly, region, name = 'Calibri', fontsize = fontsize,
+                zorder = 3, weight = 'bold')
+
+def draw_basemap(fig, extent, countries, color_dict):
+    '''Add a PlateCarree GeoAxes to fig showing extent, with the coastlines
+    and the country polygons: countries in their color_dict color, all other 
+    countries light grey.'''
+    ax = fig.add_subplot(projection = ccrs.PlateCarree(), zorder = 1)
+
+    ax.coastlines()
+    ax.set_extent(extent)
+
+    for iso, geometry in country_geometries(extent):
+        if iso in countries:
+            col = color_dict.get(iso)
+        else:
+            col = 'lightgrey'
+
+        ax.add_geometries([geometry], ccrs.PlateCarree(),
+                          facecolor = col, alpha = 0.5)
+
+    return ax
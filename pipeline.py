@@ -0,0 +1,170 @@
+import time
+import inspect
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from results import TABLES, DERIVED
+
+def _code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+
+    return names
+
+def table_names(func):
+    '''ResultSet tables used by a function, inferred from the attribute names
+    in its code (e.g. base_results[BASE].generation_twh).'''
+    return sorted(_code_names(func.__code__) & (set(TABLES) | set(DERIVED)))
+
+def _preload(rs, table):
+    '''Load a table ahead of the nodes that read it. A table that fails to 
+    load does not fail those nodes: as with bulk_load, it is loaded again 
+    where a node reads it, which may handle the error (e.g. a missing 
+    max_capacity_investment in build_transmission_index).'''
+    try:
+        rs.load(table)
+    except Exception:
+        pass
+
+class Graph:
+    '''Task graph of data nodes and chart nodes.
+
+    Edges are inferred: a node depends on the nodes named by its parameters
+    (their values are passed in) and on the ResultSet tables it reads, for the
+    base model (base_results) and/or scenario (scen_results) ResultSets of
+    the runs it covers. Derived tables depend on the tables they are derived
+    from. Only the nodes needed by enabled charts are computed, each once,
+    and independent nodes run concurrently. Table nodes never fail, a table 
+    that cannot be loaded raises in the nodes that read it.'''
+
+    def __init__(self, base_results, scen_results):
+        self.base_results = base_results
+        self.scen_results = scen_results
+        self.nodes = {}
+        self.values = {}
+        self.timings = {}
+        self.errors = {}
+
+    def _result_sets(self, runs, base, scenarios):
+        for run in runs:
+            if base:
+                yield self.base_results[run]
+            if scenarios:
+                yield from self.scen_results[run].values()
+
+    def _table_node(self, rs, table):
+        name = f'{table}[{rs.run}/{rs.scenario or "base"}]'
+        if name not in self.nodes:
+            deps = []
+            if table in DERIVED and not rs.pushed_down(table):
+                deps = [self._table_node(rs, dep) for dep in table_names(DERIVED[table])]
+
+            self.nodes[name] = {'func' : lambda: _preload(rs, table),
+                                'params' : [],
+                                'deps' : deps,
+                                'chart' : False,
+                                'enabled' : False,
+                                'table' : (rs, table)}
+
+        return name
+
+    def add(self, name, func, runs, tables = None, chart = False, enabled = True):
+        names = _code_names(func.__code__)
+        if tables is None:
+            tables = table_names(func)
+
+        result_sets = self._result_sets(runs, 'base_results' in names,
+                                        'scen_results' in names)
+
+        params = list(inspect.signature(func).parameters)
+        deps = params + [self._table_node(rs, table)
+                         for rs in result_sets for table in tables]
+
+        self.nodes[name] = {'func' : func,
+                            'params' : params,
+                            'deps' : deps,
+                            'chart' : chart,
+                            'enabled' : enabled}
+
+        return func
+
+    def node(self, runs, tables = None):
+        '''Register a named data node, passed to the nodes that take it as a
+        parameter.'''
+        def decorator(func):
+            return self.add(func.__name__, func, runs, tables = tables)
+
+        return decorator
+
+    def chart(self, flags : dict, flag, runs):
+        '''Register a chart node, enabled when flags[flag] is set to 'yes'.'''
+        def decorator(func):
+            return self.add(func.__name__, func, runs, chart = True,
+                            enabled = flags.get(flag) == 'yes')
+
+        return decorator
+
+    def required(self):
+        '''All nodes needed by the enabled charts.'''
+        required = set()
+        stack = [name for name, node in self.nodes.items()
+                 if node['chart'] and node['enabled']]
+        while stack:
+            name = stack.pop()
+            if name not in required:
+                required.add(name)
+                stack.extend(self.nodes[name]['deps'])
+
+        return required
+
+    def required_tables(self):
+        '''(ResultSet, table) of every table needed by the enabled charts.'''
+        return [self.nodes[name]['table'] for name in sorted(self.required())
+                if 'table' in self.nodes[name]]
+
+    def _run_node(self, name):
+        node = self.nodes[name]
+        start = time.perf_counter()
+        value = node['func'](**{param : self.values[param] for param in node['params']})
+
+        return value, time.perf_counter() - start
+
+    def run(self, max_workers = None):
+        pending = self.required() - set(self.values)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers = max_workers) as executor:
+            while pending or running:
+                for name in sorted(pending):
+                    deps = self.nodes[name]['deps']
+                    if any(dep in self.errors for dep in deps):
+                        self.errors[name] = 'Skipped, a dependency failed.'
+                        pending.discard(name)
+                    elif all(dep in self.values for dep in deps):
+                        running[executor.submit(self._run_node, name)] = name
+                        pending.discard(name)
+
+                if not running:
+                    for name in pending:
+                        self.errors[name] = 'Skipped, unresolved dependencies.'
+                    break
+
+                done, _ = wait(running, return_when = FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.values[name], self.timings[name] = future.result()
+                    except Exception:
+                        self.errors[name] = traceback.format_exc()
+
+        return self.values
+
+    def report(self):
+        charts = [name for name in self.timings if self.nodes[name]['chart']]
+        print(f'Computed {len(self.timings)} nodes ({len(charts)} charts), '
+              f'{len(self.errors)} failed')
+
+        for name, error in self.errors.items():
+            print(f'\n{name} failed:\n{error}')
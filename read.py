@@ -1,103 +1,598 @@
 # import packages and paths
+import numpy as np
 import pandas as pd
 import os
+import sys
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+class ResultCache:
+    '''Process-wide LRU cache of parsed result files. Entries are keyed by
+    absolute path, and variant for other frames read from the file (e.g. its
+    filtered power technology rows), and validated against the file mtime 
+    and size, so a file that changes on disk is re-parsed. Frames are handed 
+    out as copies so callers can modify them freely.'''
+
+    def __init__(self, max_mb = 2048):
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, file_path, parser, variant = None):
+        path = os.path.abspath(file_path)
+        key = path if variant is None else (path, variant)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+                return entry[1].copy()
+
+            if entry is not None:
+                self._drop(key)
+
+            self.misses += 1
+
+        df = parser(path)
+        nbytes = int(df.memory_usage(deep = True).sum())
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (signature, df, nbytes)
+                self.size_bytes += nbytes
+                self._evict()
+
+        return df.copy()
+
+    def cached(self, file_path):
+        '''The cached frame of the whole file file_path itself, not a copy, 
+        None if it is not cached or changed since. It must not be modified.'''
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stat = os.stat(key)
+            if entry[0] != (stat.st_mtime_ns, stat.st_size):
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def set_budget(self, max_mb):
+        with self._lock:
+            self.max_bytes = int(max_mb * 1024 ** 2)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def info(self):
+        with self._lock:
+            return {'hits' : self.hits,
+                    'misses' : self.misses,
+                    'evictions' : self.evictions,
+                    'entries' : len(self._entries),
+                    'size_mb' : round(self.size_bytes / 1024 ** 2, 1),
+                    'max_mb' : round(self.max_bytes / 1024 ** 2, 1)}
+
+    def _drop(self, key):
+        self.size_bytes -= self._entries.pop(key)[2]
+
+    def _evict(self):
+        while self.size_bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+RESULT_CACHE = ResultCache()
+
+def set_cache_budget(max_mb):
+    RESULT_CACHE.set_budget(max_mb)
+
+def cache_info():
+    return RESULT_CACHE.info()
+
+'''Schema registry of the result files. Code columns are read as categoricals 
+and YEAR as int16, columns not listed are not loaded. A file that lacks a 
+registered column or holds values of the wrong type raises a SchemaError 
+instead of failing further down in a chart. Files without an entry (e.g. the 
+incomplete cost summaries) are read as is.'''
+_RESULT = {'REGION' : 'category', 'TECHNOLOGY' : 'category', 
+           'YEAR' : 'int16', 'VALUE' : 'float64'}
+_EMISSION = {'REGION' : 'category', 'EMISSION' : 'category', 
+             'YEAR' : 'int16', 'VALUE' : 'float64'}
+
+RESULT_SCHEMAS = {
+    # results
+    'NewCapacity.csv' : _RESULT,
+    'TotalTechnologyAnnualActivity.csv' : _RESULT,
+    'TotalDiscountedCost.csv' : {'REGION' : 'category', 'YEAR' : 'int16', 
+                                 'VALUE' : 'float64'},
+    'AnnualEmissions.csv' : _EMISSION,
+    'AnnualTechnologyEmission.csv' : {'REGION' : 'category', 
+                                      'TECHNOLOGY' : 'category',
+                                      'EMISSION' : 'category', 
+                                      'YEAR' : 'int16', 'VALUE' : 'float64'},
+    # data
+    'SpecifiedAnnualDemand.csv' : {'REGION' : 'category', 'FUEL' : 'category', 
+                                   'YEAR' : 'int16', 'VALUE' : 'float64'},
+    'AnnualEmissionLimit.csv' : _EMISSION,
+    'TotalAnnualMaxCapacityInvestment.csv' : _RESULT,
+    # result_summaries
+    'PowerCapacityCountry.csv' : {'TECH' : 'category', 'COUNTRY' : 'category', 
+                                  'YEAR' : 'int16', 'VALUE' : 'float64'},
+    'GenerationSharesCountry.csv' : {'COUNTRY' : 'category', 'YEAR' : 'int16', 
+                                     'RENEWABLE' : 'float64', 
+                                     'FOSSIL' : 'float64'},
+    'GenerationSharesGlobal.csv' : {'YEAR' : 'int16', 'RENEWABLE' : 'float64', 
+                                    'FOSSIL' : 'float64'},
+    'AnnualEmissionIntensity.csv' : {'EMISSION' : 'category', 'YEAR' : 'int16', 
+                                     'VALUE' : 'float64'},
+    'AnnualEmissionIntensityGlobal.csv' : {'YEAR' : 'int16', 'VALUE' : 'float64'},
+    # Metric is relabelled and extended with an 'Other' row, keep it as object.
+    'Metrics.csv' : {'Metric' : 'object', 'Unit' : 'object', 'Value' : 'float64'},
+    }
+
+class SchemaError(ValueError):
+    pass
+
+def _schema_for(file_path):
+    return RESULT_SCHEMAS.get(os.path.basename(file_path))
+
+def _read_csv_with_schema(file_path, schema):
+    if schema is None:
+        return pd.read_csv(file_path)
+
+    try:
+        return pd.read_csv(file_path, usecols = list(schema), dtype = schema)
+    except (ValueError, TypeError) as e:
+        raise SchemaError(f'{file_path} does not match the registered schema '
+                          f'{schema}: {e}') from e
+
+def schema_memory_report(paths):
+    '''Compare the memory footprint of every registered result file under the 
+    given folders when read untyped versus with its schema.'''
+    rows = []
+    for file_path in _find_csv_files(paths):
+        schema = _schema_for(file_path)
+        if schema is None:
+            continue
+
+        untyped = pd.read_csv(file_path).memory_usage(deep = True).sum()
+        typed = _read_csv_with_schema(file_path, schema
+                                      ).memory_usage(deep = True).sum()
+        rows.append([file_path, untyped / 1024 ** 2, typed / 1024 ** 2])
+
+    df = pd.DataFrame(rows, columns = ['FILE', 'UNTYPED_MB', 'TYPED_MB'])
+    df['SAVED_MB'] = df['UNTYPED_MB'] - df['TYPED_MB']
+    df['SAVED_%'] = (df['SAVED_MB'] / df['UNTYPED_MB'] * 100).round(1)
+
+    return df
+
+'''Columnar sidecar files. The first time a result CSV is parsed, a Parquet 
+copy is written next to it ('NewCapacity.csv.parquet') together with the size, 
+mtime and hash of the source. Later runs read the sidecar instead of the CSV 
+for as long as the source is unchanged. Requires pyarrow, without it CSVs are 
+always parsed.'''
+SIDECAR_CACHE = {'enabled' : pa is not None}
+
+def set_sidecar_cache(enabled):
+    SIDECAR_CACHE['enabled'] = enabled and pa is not None
+
+def _sidecar_path(file_path):
+    return f'{file_path}.parquet'
+
+def _file_digest(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 ** 2), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+def _source_metadata(file_path):
+    stat = os.stat(file_path)
+
+    return {b'source_size' : str(stat.st_size).encode(),
+            b'source_mtime_ns' : str(stat.st_mtime_ns).encode(),
+            b'source_sha1' : _file_digest(file_path).encode(),
+            b'schema' : repr(_schema_for(file_path)).encode()}
+
+def _sidecar_is_valid(file_path, sidecar):
+    if not os.path.exists(sidecar):
+        return False
+
+    try:
+        metadata = pq.read_schema(sidecar).metadata or {}
+    except (OSError, pa.ArrowException):
+        return False
+
+    # A sidecar written under a different schema holds different dtypes.
+    if metadata.get(b'schema') != repr(_schema_for(file_path)).encode():
+        return False
+
+    stat = os.stat(file_path)
+    if metadata.get(b'source_size') != str(stat.st_size).encode():
+        return False
+
+    if metadata.get(b'source_mtime_ns') == str(stat.st_mtime_ns).encode():
+        return True
+
+    # Same size but touched, only a content change invalidates the sidecar.
+    if metadata.get(b'source_sha1') != _file_digest(file_path).encode():
+        return False
+
+    # Record the new mtime, so later runs do not hash the file again.
+    _restamp_sidecar(sidecar, {**metadata, 
+                               b'source_mtime_ns' : str(stat.st_mtime_ns).encode()})
+
+    return True
+
+def _restamp_sidecar(sidecar, metadata):
+    try:
+        table = pq.read_table(sidecar)
+    except (OSError, pa.ArrowException):
+        return
+
+    _write_table(sidecar, table.replace_schema_metadata(metadata))
+
+def _write_sidecar(file_path, df):
+    table = pa.Table.from_pandas(df)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), 
+                                           **_source_metadata(file_path)})
+    _write_table(_sidecar_path(file_path), table)
+
+def _write_table(sidecar, table):
+    tmp_path = f'{sidecar}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+    # The sidecar is a cache, a read-only results folder just means no cache.
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, sidecar)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+'''Parse time and bytes read of every result file parsed in this process.'''
+_PARSE_LOG = []
+_PARSE_LOG_LOCK = threading.Lock()
+
+def _log_parse(file_path, source, start, nbytes, df):
+    with _PARSE_LOG_LOCK:
+        _PARSE_LOG.append((file_path, source, time.perf_counter() - start, 
+                           nbytes, len(df)))
+
+def parse_report():
+    '''Frame of the result files parsed so far: FILE, SOURCE (csv, parquet 
+    or store), SECONDS, BYTES read (0 from the store) and ROWS.'''
+    with _PARSE_LOG_LOCK:
+        rows = list(_PARSE_LOG)
+
+    return pd.DataFrame(rows, columns = ['FILE', 'SOURCE', 'SECONDS', 'BYTES', 
+                                         'ROWS'])
+
+def _parse_csv(file_path):
+    start = time.perf_counter()
+    if SIDECAR_CACHE['enabled']:
+        sidecar = _sidecar_path(file_path)
+        if _sidecar_is_valid(file_path, sidecar):
+            df = pq.read_table(sidecar).to_pandas()
+            _log_parse(file_path, 'parquet', start, os.path.getsize(sidecar), df)
+
+            return df
+
+    df = _read_csv_with_schema(file_path, _schema_for(file_path))
+    _log_parse(file_path, 'csv', start, os.path.getsize(file_path), df)
+
+    if SIDECAR_CACHE['enabled']:
+        _write_sidecar(file_path, df)
+
+    return df
+
+def _find_csv_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+
+        for root, dirs, names in os.walk(path):
+            files.extend(os.path.join(root, name) for name in sorted(names)
+                         if name.endswith('.csv'))
+
+    return files
+
+def warm_cache(paths, max_workers = None):
+    '''Pre-convert every CSV under the given folders (e.g. results_folder) to
+    its Parquet sidecar. Files with an up-to-date sidecar are skipped. Returns
+    the list of converted files.'''
+    if pa is None:
+        raise ImportError('warm_cache requires pyarrow')
+
+    files = [f for f in _find_csv_files(paths) 
+             if not _sidecar_is_valid(f, _sidecar_path(f))]
+
+    def convert(file_path):
+        _write_sidecar(file_path, _read_csv_with_schema(file_path, 
+                                                        _schema_for(file_path)))
+
+        return file_path
+
+    with ThreadPoolExecutor(max_workers = max_workers) as executor:
+        return list(executor.map(convert, files))
+
+'''Embedded database of a results_folder (a store.ResultStore) that result 
+files are read from instead of their CSVs, if it holds them.'''
+RESULT_STORE = {'store' : None}
+
+def set_result_store(store):
+    RESULT_STORE['store'] = store
+
+def get_result_store():
+    return RESULT_STORE['store']
+
+def _read_result(path, file_name):
+    store = RESULT_STORE['store']
+    if store is not None:
+        start = time.perf_counter()
+        df = store.read(path, file_name)
+        if df is not None:
+            _log_parse(os.path.abspath(os.path.join(path, file_name)), 'store', start, 0, df)
+
+            return df
+
+    return RESULT_CACHE.get(os.path.join(path, file_name), _parse_csv)
+
+'''Rows kept by the power technology readers (read_new_capacity_power, 
+read_technology_annual_activity_power): TECHNOLOGY starting with one of 
+prefixes and not containing exclude, YEAR within years (first, last; None 
+for all years). Only columns are loaded, CSVs are parsed chunksize rows at a 
+time.'''
+POWER_FILTER = {'prefixes' : ('PWR',), 'exclude' : 'TRN', 'years' : None,
+                'columns' : ['TECHNOLOGY', 'YEAR', 'VALUE'], 
+                'chunksize' : 500000}
+
+def set_year_window(start_year, end_year):
+    POWER_FILTER['years'] = (start_year, end_year)
+
+def _filter_mask(df, prefixes, exclude, years):
+    # Tested once per unique TECHNOLOGY and broadcast through the codes.
+    technology = df['TECHNOLOGY']
+    categories = technology.cat.categories.astype(str)
+    keep = (categories.str.startswith(tuple(prefixes)) & 
+            ~categories.str.contains(exclude, regex = False))
+    mask = np.append(keep, False)[technology.cat.codes.to_numpy()]
+
+    if years is not None:
+        mask &= df['YEAR'].between(*years).to_numpy()
+
+    return mask
+
+def _filtered(df, columns):
+    # Categories of the kept rows only, whichever way the rows were read.
+    df = df[columns].reset_index(drop = True)
+    for col in columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+
+    return df
+
+def stream_filtered(file_path, prefixes, exclude, years = None, 
+                    columns = None, chunksize = 500000):
+    '''The rows of a result file with a TECHNOLOGY column that pass the 
+    filter of POWER_FILTER, read with its schema and filtered while parsing: 
+    the CSV is read chunksize rows at a time and only the given columns (all 
+    of the schema by default), rejected rows are dropped per chunk, so peak 
+    memory is bounded by the chunk size rather than the file. A valid Parquet 
+    sidecar is read instead, with the YEAR window and columns pushed into the 
+    Parquet reader. Categoricals only hold the categories of the kept rows.'''
+    start = time.perf_counter()
+    schema = _schema_for(file_path)
+    columns = list(columns or schema)
+    dtype = {col : schema[col] for col in columns}
+
+    sidecar = _sidecar_path(file_path)
+    if SIDECAR_CACHE['enabled'] and _sidecar_is_valid(file_path, sidecar):
+        filters = None
+        if years is not None:
+            filters = [('YEAR', '>=', years[0]), ('YEAR', '<=', years[1])]
+        df = pq.read_table(sidecar, columns = columns, 
+                           filters = filters).to_pandas()
+        df = df.loc[_filter_mask(df, prefixes, exclude, None)].copy()
+        source, nbytes = 'parquet', os.path.getsize(sidecar)
+    else:
+        try:
+            chunks = [chunk.loc[_filter_mask(chunk, prefixes, exclude, years)]
+                      for chunk in pd.read_csv(file_path, usecols = columns, 
+                                               dtype = dtype, 
+                                               chunksize = chunksize)]
+        except (ValueError, TypeError) as e:
+            raise SchemaError(f'{file_path} does not match the registered '
+                              f'schema {schema}: {e}') from e
+
+        # Chunks have their own categories, concat falls back to object.
+        if chunks:
+            df = pd.concat(chunks).astype(dtype)
+        else:
+            df = pd.DataFrame({col : pd.Series(dtype = dtype[col]) for col in columns})
+        source, nbytes = 'stream', os.path.getsize(file_path)
+
+    df = _filtered(df, columns)
+    _log_parse(os.path.abspath(file_path), source, start, nbytes, df)
+
+    return df
+
+def _read_power_result(path, file_name):
+    '''The rows of path/file_name kept by POWER_FILTER. Filtered from the 
+    result store or the cached whole file if either holds it, otherwise 
+    streamed (see stream_filtered) and cached.'''
+    file_path = os.path.join(path, file_name)
+    prefixes, exclude = POWER_FILTER['prefixes'], POWER_FILTER['exclude']
+    years, columns = POWER_FILTER['years'], POWER_FILTER['columns']
+
+    store = RESULT_STORE['store']
+    if store is not None and store.holds(path, file_name):
+        df = _read_result(path, file_name)
+    else:
+        df = RESULT_CACHE.cached(file_path)
+
+    if df is not None:
+        return _filtered(df.loc[_filter_mask(df, prefixes, exclude, years)], columns)
+
+    return RESULT_CACHE.get(file_path, lambda file_path: stream_filtered(
+        file_path, prefixes, exclude, years = years, columns = columns, 
+        chunksize = POWER_FILTER['chunksize']), 
+        variant = ('power', tuple(prefixes), exclude, years, tuple(columns)))
 
 # Functions to import result files
 def read_capacity_country(path):
-    df = pd.read_csv(os.path.join(path, 'PowerCapacityCountry.csv'))
+    df = _read_result(path, 'PowerCapacityCountry.csv')
     
     return df
 
 def read_new_capacity(path):
-    df = pd.read_csv(os.path.join(path, 'NewCapacity.csv'))
+    df = _read_result(path, 'NewCapacity.csv')
+    
+    return df
+
+def read_new_capacity_power(path):
+    df = _read_power_result(path, 'NewCapacity.csv')
     
     return df
 
 def read_specified_annual_demand(path):
-    df = pd.read_csv(os.path.join(path, 'SpecifiedAnnualDemand.csv'))
+    df = _read_result(path, 'SpecifiedAnnualDemand.csv')
     
     return df
 
 def read_technology_annual_activity(path):
-    df = pd.read_csv(os.path.join(path, 'TotalTechnologyAnnualActivity.csv'))
+    df = _read_result(path, 'TotalTechnologyAnnualActivity.csv')
+    
+    return df
+
+def read_technology_annual_activity_power(path):
+    df = _read_power_result(path, 'TotalTechnologyAnnualActivity.csv')
     
     return df
 
 def read_generation_shares_country(path):
-    df = pd.read_csv(os.path.join(path, 'GenerationSharesCountry.csv'))
+    df = _read_result(path, 'GenerationSharesCountry.csv')
     
     return df
 
 def read_generation_shares_global(path):
-    df = pd.read_csv(os.path.join(path, 'GenerationSharesGlobal.csv'))
+    df = _read_result(path, 'GenerationSharesGlobal.csv')
     
     return df
 
 # PowerCostCountry is incomplete, DO NOT USE UNTIL FIXED
 def read_pwr_cost_country(path):
-    df = pd.read_csv(os.path.join(path, 'PowerCostCountry.csv'))
+    df = _read_result(path, 'PowerCostCountry.csv')
     
     return df
 
 # TotalCostCountry is incomplete, DO NOT USE UNTIL FIXED
 def read_total_cost_country(path):
-    df = pd.read_csv(os.path.join(path, 'TotalCostCountry.csv'))
+    df = _read_result(path, 'TotalCostCountry.csv')
     
     return df
 
 # PowerCostGlobal is incomplete, DO NOT USE UNTIL FIXED
 def read_pwr_cost_global(path):
-    df = pd.read_csv(os.path.join(path, 'PowerCostGlobal.csv'))
+    df = _read_result(path, 'PowerCostGlobal.csv')
     
     return df
 
 # TotalCostGlobal is incomplete, DO NOT USE UNTIL FIXED
 def read_total_cost_global(path):
-    df = pd.read_csv(os.path.join(path, 'TotalCostGlobal.csv'))
+    df = _read_result(path, 'TotalCostGlobal.csv')
     
     return df
 
 def read_total_discounted_cost(path):
-    df = pd.read_csv(os.path.join(path, 'TotalDiscountedCost.csv'))
+    df = _read_result(path, 'TotalDiscountedCost.csv')
     
     return df
 
 def read_annual_emissions(path):
-    df = pd.read_csv(os.path.join(path, 'AnnualEmissions.csv'))
+    df = _read_result(path, 'AnnualEmissions.csv')
     
     return df
 
 def read_annual_technology_emission(path):
-    df = pd.read_csv(os.path.join(path, 'AnnualTechnologyEmission.csv'))
+    df = _read_result(path, 'AnnualTechnologyEmission.csv')
     
     return df
 
 def read_annual_emission_limit(path):
-    df = pd.read_csv(os.path.join(path, 'AnnualEmissionLimit.csv'))
+    df = _read_result(path, 'AnnualEmissionLimit.csv')
     
     return df
 
 def read_annual_emission_intensity_country(path):
-    df = pd.read_csv(os.path.join(path, 'AnnualEmissionIntensity.csv'))
+    df = _read_result(path, 'AnnualEmissionIntensity.csv')
     
     return df
 
 def read_annual_emission_intensity_global(path):
-    df = pd.read_csv(os.path.join(path, 'AnnualEmissionIntensityGlobal.csv'))
+    df = _read_result(path, 'AnnualEmissionIntensityGlobal.csv')
     
     return df
 
 def read_headline_metrics(path):
-    df = pd.read_csv(os.path.join(path, 'Metrics.csv'))
+    df = _read_result(path, 'Metrics.csv')
     
     return df
 
 def read_max_capacity_investment(path):
-    df = pd.read_csv(os.path.join(path, 'TotalAnnualMaxCapacityInvestment.csv'))
+    df = _read_result(path, 'TotalAnnualMaxCapacityInvestment.csv')
     
     return df
 
 def read_centerpoints(path):
-    df = pd.read_csv(os.path.join(path, 'centerpoints.csv'))
+    df = _read_result(path, 'centerpoints.csv')
     
-    return df
\ No newline at end of file
+    return df
+
+if __name__ == '__main__':
+    # python read.py [--schema-report] [folder ...], defaults to the 
+    # results_folder in user_config
+    args = sys.argv[1:]
+    report = '--schema-report' in args
+    folders = [arg for arg in args if arg != '--schema-report']
+
+    if not folders:
+        from user_config import results_folder
+        folders = [results_folder]
+
+    if report:
+        print(schema_memory_report(folders).to_string(index = False))
+    else:
+        converted = warm_cache(folders)
+        print(f'Converted {len(converted)} result files to Parquet')
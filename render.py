@@ -0,0 +1,296 @@
+import io
+import os
+import sys
+import json
+import types
+import time
+import pickle
+import hashlib
+import inspect
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from shared import SharedTableRegistry, SharingPickler, AttachingUnpickler
+
+'''Arguments of the formatters that identify the figure a job creates.'''
+_NAME_ARGS = ['out_dir', 'base_path', 'file_name', 'country', 'scenario']
+
+def job_name(func, args, kwargs):
+    '''Name a render job after the formatter and the figure it writes, e.g.
+    format_stacked_bar_pwr:Figures/ASEAN/Base/pwr_cap_bar:IDN. The name is
+    the key of the job in the manifest, two jobs of a RenderScheduler cannot
+    have the same name.'''
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs).arguments
+    except TypeError:
+        bound = {}
+
+    parts = [str(bound[arg]) for arg in _NAME_ARGS if bound.get(arg) is not None]
+
+    return ':'.join([func.__name__, '/'.join(parts[:2])] + parts[2:])
+
+def _source_hash(func):
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = func.__qualname__
+
+    return hashlib.sha1(source.encode()).hexdigest()
+
+'''Hashes of the source files of local modules, by module name.'''
+_MODULE_HASHES = {}
+
+def _local_imports(module):
+    '''Modules of this project (in the folder of module) imported by module, 
+    directly or through other local modules, without module itself.'''
+    folder = os.path.dirname(os.path.abspath(module.__file__))
+    found, stack = {}, [module]
+    while stack:
+        current = stack.pop()
+        for value in vars(current).values():
+            if not isinstance(value, types.ModuleType):
+                value = sys.modules.get(getattr(value, '__module__', None) or '')
+            path = getattr(value, '__file__', None)
+            if (value is None or path is None or value.__name__ in found or
+                    os.path.dirname(os.path.abspath(path)) != folder):
+                continue
+
+            found[value.__name__] = value
+            stack.append(value)
+
+    found.pop(module.__name__, None)
+
+    return found
+
+def _module_hash(module):
+    if module.__name__ not in _MODULE_HASHES:
+        with open(module.__file__, 'rb') as f:
+            _MODULE_HASHES[module.__name__] = hashlib.sha1(f.read()).hexdigest()
+
+    return _MODULE_HASHES[module.__name__]
+
+def code_version(func):
+    '''Hash of the code a formatter runs: its own source and the source 
+    files of the local modules its module imports (e.g. figures, templates, 
+    delta, maps and utils for the formatters in data.py).'''
+    digest = hashlib.sha1(_source_hash(func).encode())
+    module = inspect.getmodule(func)
+    if module is not None and getattr(module, '__file__', None):
+        for name, imported in sorted(_local_imports(module).items()):
+            digest.update(f'{name}:{_module_hash(imported)}'.encode())
+
+    return digest.hexdigest()
+
+def job_fingerprint(func, payload):
+    '''Fingerprint of a job: the code the formatter runs (see code_version) 
+    and its pickled inputs, which hold the prepared result data and the 
+    config values it is called with.'''
+    digest = hashlib.sha1(code_version(func).encode())
+    digest.update(payload)
+
+    return digest.hexdigest()
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+def _render(payload):
+    '''Run a single pickled job and close its figures. Errors are returned
+    instead of raised so a failing chart does not stop the other jobs. Also
+    returns the files the job saved.'''
+    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+
+    outputs = []
+    savefig = Figure.savefig
+
+    def record_savefig(fig, fname, *args, **kwargs):
+        fname = os.fspath(fname)
+        if not os.path.splitext(fname)[1]:
+            fname = f'{fname}.{kwargs.get("format") or plt.rcParams["savefig.format"]}'
+        outputs.append(fname)
+
+        return savefig(fig, fname, *args, **kwargs)
+
+    start = time.perf_counter()
+    error = None
+    Figure.savefig = record_savefig
+    try:
+        func, args, kwargs = AttachingUnpickler(io.BytesIO(payload)).load()
+        with plt.rc_context():
+            func(*args, **kwargs)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        Figure.savefig = savefig
+        plt.close('all')
+
+    return time.perf_counter() - start, error, outputs
+
+class RenderScheduler:
+    '''Collects chart jobs (formatter + prepared inputs) and renders them on a
+    process pool using the Agg backend. Inputs are pickled on submit, so
+    changes made to a DataFrame after submitting do not affect the job. Jobs
+    can be submitted from several threads. With max_workers = 1 jobs are
+    rendered one by one in this process.
+
+    If a manifest file is given, the fingerprint and output files of every
+    rendered job are stored in it and jobs whose fingerprint is unchanged and
+    whose output files still exist are skipped on later runs.
+
+    If shared_mb is set, frames of at least shared_mb passed to a pool of 
+    workers are copied once into shared memory (see shared.py), equal frames 
+    into the same segment, and the workers attach to them instead of 
+    unpickling a copy per job. The fingerprint of such a frame is a hash of 
+    its contents, frames of skipped jobs are not shared. Formatters must not 
+    modify shared frames in place, their arrays are read-only.'''
+
+    def __init__(self, max_workers = None, manifest = None, shared_mb = None):
+        self.max_workers = max_workers or os.cpu_count()
+        self.shared_bytes = shared_mb * 1024 ** 2 if shared_mb is not None else None
+        self.shared = (SharedTableRegistry() if self.shared_bytes is not None 
+                       and self.max_workers > 1 else None)
+        self.manifest_path = manifest
+        self.manifest = {}
+        self.jobs = {}
+        self.fingerprints = {}
+        self.results = {}
+        self._lock = threading.Lock()
+
+        if manifest and os.path.exists(manifest):
+            try:
+                with open(manifest) as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError):
+                self.manifest = {}
+
+    def _is_current(self, name, fingerprint):
+        entry = self.manifest.get(name)
+
+        return (entry is not None and entry['fingerprint'] == fingerprint
+                and all(os.path.exists(path) for path in entry['outputs']))
+
+    def _dumps(self, job, digest = False, digests = None):
+        if self.shared is None:
+            return pickle.dumps(job)
+
+        buffer = io.BytesIO()
+        SharingPickler(buffer, self.shared, self.shared_bytes, digest = digest,
+                       digests = digests).dump(job)
+
+        return buffer.getvalue()
+
+    def submit(self, func, *args, **kwargs):
+        job = (func, args, kwargs)
+        name = job_name(func, args, kwargs)
+
+        # The fingerprint of a job with shared frames is taken from their 
+        # digests, so they are only shared if the job is rendered.
+        payload, fingerprint, digests = None, None, {}
+        if self.shared is None:
+            payload = self._dumps(job)
+        if self.manifest_path:
+            fingerprint = job_fingerprint(func, payload or self._dumps(
+                job, digest = True, digests = digests))
+
+        with self._lock:
+            # Names are given by the files a job writes, so they are the same
+            # on every run whatever order the jobs are submitted in.
+            if name in self.jobs or name in self.results:
+                raise ValueError(f'A job writing {name} was already submitted')
+
+            if fingerprint and self._is_current(name, fingerprint):
+                self.results[name] = (0.0, 'skipped', None)
+                return name
+
+            self.jobs[name] = payload
+            self.fingerprints[name] = fingerprint
+
+        if payload is None:
+            payload = self._dumps(job, digests = digests)
+            with self._lock:
+                self.jobs[name] = payload
+
+        return name
+
+    def _record(self, name, seconds, error, outputs):
+        self.results[name] = (seconds, 'failed' if error else 'ok', error)
+
+        fingerprint = self.fingerprints.pop(name, None)
+        if error or not fingerprint:
+            self.manifest.pop(name, None)
+        else:
+            self.manifest[name] = {'fingerprint' : fingerprint, 'outputs' : outputs}
+
+    def run(self):
+        '''Render all pending jobs and return the summary of every job.'''
+        if self.jobs and self.max_workers == 1:
+            for name in sorted(self.jobs):
+                self._record(name, *_render(self.jobs[name]))
+
+            self.jobs = {}
+
+        if self.jobs:
+            with ProcessPoolExecutor(max_workers = self.max_workers,
+                                     initializer = _init_worker) as executor:
+                futures = {name : executor.submit(_render, self.jobs[name])
+                           for name in sorted(self.jobs)}
+
+                for name, future in futures.items():
+                    try:
+                        self._record(name, *future.result())
+                    except Exception:
+                        self._record(name, None, traceback.format_exc(), [])
+
+            self.jobs = {}
+
+        # All workers are done with the shared frames of these jobs.
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = SharedTableRegistry()
+
+        self.save_manifest()
+
+        return self.summary()
+
+    def save_manifest(self):
+        if not self.manifest_path:
+            return
+
+        tmp_path = f'{self.manifest_path}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.manifest, f, indent = 1, sort_keys = True)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError:
+            pass
+
+    def summary(self):
+        df = pd.DataFrame([(name, seconds, status)
+                           for name, (seconds, status, error) in self.results.items()],
+                          columns = ['JOB', 'SECONDS', 'STATUS'])
+
+        return df
+
+    def errors(self):
+        return {name : error for name, (seconds, status, error) in self.results.items()
+                if error}
+
+    def report(self, wall_time = None):
+        df = self.summary()
+        width = df['JOB'].str.len().max() if not df.empty else 0
+        for job, seconds, status in df.itertuples(index = False):
+            seconds = f'{seconds:7.2f}s' if seconds is not None else '      -'
+            print(f'{job:<{width}}  {seconds}  {status}')
+
+        counts = df['STATUS'].value_counts()
+        print(f'Rendered {counts.get("ok", 0)} charts, skipped '
+              f'{counts.get("skipped", 0)} unchanged, {counts.get("failed", 0)} '
+              f'failed, {df["SECONDS"].sum():.1f}s render time'
+              + (f', {wall_time:.1f}s wall time' if wall_time else ''))
+
+        for name, error in self.errors().items():
+            print(f'\n{name} failed:\n{error}')
@@ -0,0 +1,305 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from read import (
+    get_result_store,
+    parse_report,
+    read_capacity_country,
+    read_new_capacity,
+    read_new_capacity_power,
+    read_specified_annual_demand,
+    read_technology_annual_activity,
+    read_technology_annual_activity_power,
+    read_generation_shares_country,
+    read_generation_shares_global,
+    read_pwr_cost_country,
+    read_total_cost_country,
+    read_pwr_cost_global,
+    read_total_cost_global,
+    read_total_discounted_cost,
+    read_annual_emissions,
+    read_annual_technology_emission,
+    read_annual_emission_limit,
+    read_annual_emission_intensity_country,
+    read_annual_emission_intensity_global,
+    read_headline_metrics,
+    read_max_capacity_investment,
+    )
+
+from chunked import (
+    out_of_core_enabled,
+    technology_totals,
+    emission_totals
+    )
+
+from utils import (
+    format_technology_col,
+    format_annual_emissions,
+    convert_pj_to_twh,
+    )
+
+'''Tables read from disk, keyed by attribute name: (folder, reader).'''
+TABLES = {
+    'capacity_country' : ('result_summaries', read_capacity_country),
+    'new_capacity' : ('results', read_new_capacity),
+    'specified_annual_demand' : ('data', read_specified_annual_demand),
+    'technology_annual_activity' : ('results', read_technology_annual_activity),
+    # Power technologies only, filtered while parsing (see read.POWER_FILTER)
+    'new_capacity_power' : ('results', read_new_capacity_power),
+    'technology_annual_activity_power' : ('results', 
+                                          read_technology_annual_activity_power),
+    'generation_shares_country' : ('result_summaries', read_generation_shares_country),
+    'generation_shares_global' : ('result_summaries', read_generation_shares_global),
+    'pwr_cost_country' : ('result_summaries', read_pwr_cost_country),
+    'total_cost_country' : ('result_summaries', read_total_cost_country),
+    'pwr_cost_global' : ('result_summaries', read_pwr_cost_global),
+    'total_cost_global' : ('result_summaries', read_total_cost_global),
+    'total_discounted_cost' : ('results', read_total_discounted_cost),
+    'annual_emissions' : ('results', read_annual_emissions),
+    'annual_technology_emission' : ('results', read_annual_technology_emission),
+    'annual_emission_limit' : ('data', read_annual_emission_limit),
+    'annual_emission_intensity_country' : ('result_summaries',
+                                           read_annual_emission_intensity_country),
+    'annual_emission_intensity_global' : ('result_summaries',
+                                          read_annual_emission_intensity_global),
+    'headline_metrics' : ('result_summaries', read_headline_metrics),
+    'max_capacity_investment' : ('data', read_max_capacity_investment),
+    }
+
+'''Tables derived from other tables of the same ResultSet.'''
+DERIVED = {
+    'capacity' : lambda rs: format_technology_col(rs.new_capacity_power, 
+                                                  node = False),
+    'capacity_nodal' : lambda rs: format_technology_col(rs.new_capacity_power, 
+                                                        node = True),
+    'generation' : lambda rs: format_technology_col(
+        rs.technology_annual_activity_power, node = False),
+    'generation_twh' : lambda rs: convert_pj_to_twh(rs.generation),
+    'generation_nodal' : lambda rs: format_technology_col(
+        rs.technology_annual_activity_power, node = True),
+    'generation_nodal_twh' : lambda rs: convert_pj_to_twh(rs.generation_nodal),
+    'demand_twh' : lambda rs: convert_pj_to_twh(rs.specified_annual_demand),
+    'emissions_global' : lambda rs: format_annual_emissions(
+        rs.annual_emissions, country = False),
+    'emissions_country' : lambda rs: format_annual_emissions(
+        rs.annual_emissions, country = True),
+    'emission_intensity_country' : lambda rs: format_annual_emissions(
+        rs.annual_emission_intensity_country, country = True),
+    }
+
+'''Derived tables that a result store (see read.set_result_store) sums in 
+the database instead of from the raw table: (results file, spatial).'''
+STORE_DERIVED = {
+    'capacity' : ('NewCapacity.csv', 'COUNTRY'),
+    'capacity_nodal' : ('NewCapacity.csv', 'NODE'),
+    'generation' : ('TotalTechnologyAnnualActivity.csv', 'COUNTRY'),
+    'generation_nodal' : ('TotalTechnologyAnnualActivity.csv', 'NODE'),
+    }
+
+'''Derived tables summed over the chunks of their result file in out-of-core 
+mode (see chunked.set_out_of_core).'''
+CHUNKED_DERIVED = {
+    'capacity' : lambda rs: technology_totals(
+        f'{rs.path}/results/NewCapacity.csv', node = False),
+    'capacity_nodal' : lambda rs: technology_totals(
+        f'{rs.path}/results/NewCapacity.csv', node = True),
+    'generation' : lambda rs: technology_totals(
+        f'{rs.path}/results/TotalTechnologyAnnualActivity.csv', node = False),
+    'generation_nodal' : lambda rs: technology_totals(
+        f'{rs.path}/results/TotalTechnologyAnnualActivity.csv', node = True),
+    'emissions_global' : lambda rs: emission_totals(
+        f'{rs.path}/results/AnnualEmissions.csv', country = False),
+    'emissions_country' : lambda rs: emission_totals(
+        f'{rs.path}/results/AnnualEmissions.csv', country = True),
+    'emission_intensity_country' : lambda rs: emission_totals(
+        f'{rs.path}/result_summaries/AnnualEmissionIntensity.csv', country = True),
+    }
+
+class _CachedTables:
+    '''Attribute access to the tables of a ResultSet without the copy, see
+    ResultSet.cached.'''
+
+    def __init__(self, rs):
+        self._rs = rs
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return self._rs._table(name)
+
+class ResultSet:
+    '''All result tables of a single run and scenario (or the base model).
+    Tables are loaded on first attribute access (e.g. rs.new_capacity,
+    rs.generation_twh) and kept in memory, every access returns a copy so
+    the formatters are free to modify it. rs.cached.new_capacity returns the 
+    loaded table itself, for tables passed on unchanged (e.g. to 
+    RenderScheduler.submit), it must not be modified. Loaded tables are kept 
+    when pickled.'''
+
+    def __init__(self, path, run = None, scenario = None):
+        self.path = path
+        self.run = run
+        self.scenario = scenario
+        self._tables = {}
+
+    def __repr__(self):
+        return (f'ResultSet(run = {self.run!r}, scenario = {self.scenario!r}, '
+                f'loaded = {sorted(self._tables)})')
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return self._table(name).copy()
+
+    @property
+    def cached(self):
+        return _CachedTables(self)
+
+    def _table(self, name):
+        if name not in TABLES and name not in DERIVED:
+            raise AttributeError(name)
+
+        if name not in self._tables:
+            self._tables[name] = self._load(name)
+
+        return self._tables[name]
+
+    def _pushdown(self, name):
+        '''Loader of the derived table name that sums it in the result store 
+        or over the chunks of its result file (out-of-core mode) instead of 
+        from the raw table, None if neither applies.'''
+        store = get_result_store()
+        if store is not None and name in STORE_DERIVED:
+            file_name, spatial = STORE_DERIVED[name]
+            path = f'{self.path}/results'
+            if store.holds(path, file_name):
+                run, scenario, folder = store.keys(path)
+
+                return lambda: store.power_totals(
+                    os.path.splitext(file_name)[0], run, [scenario], 
+                    spatial = spatial).drop(columns = ['SCENARIO'])
+
+        if out_of_core_enabled() and name in CHUNKED_DERIVED:
+            return lambda: CHUNKED_DERIVED[name](self)
+
+        return None
+
+    def pushed_down(self, name):
+        '''Whether the derived table name is summed without loading the 
+        tables it is derived from (see _pushdown).'''
+        return self._pushdown(name) is not None
+
+    def _load(self, name):
+        pushdown = self._pushdown(name)
+        if pushdown is not None:
+            return pushdown()
+
+        if name in DERIVED:
+            return DERIVED[name](self)
+
+        folder, reader = TABLES[name]
+
+        return reader(f'{self.path}/{folder}')
+
+    def load(self, *names):
+        '''Load the given tables (all raw tables if none are given).'''
+        for name in names or TABLES:
+            getattr(self, name)
+
+        return self
+
+    def clear(self):
+        self._tables.clear()
+
+def load_result_sets(results_path : dict, base_model, scenarios):
+    '''Build the base model and scenario ResultSets of every run, returned as
+    base[run] and scen[run][scenario].'''
+    base, scen = {}, {}
+    for run, path in results_path.items():
+        base[run] = ResultSet(f'{path}/{base_model}', run = run)
+        scen[run] = {scenario : ResultSet(f'{path}/{scenario}', run = run,
+                                          scenario = scenario)
+                     for scenario in scenarios}
+
+    return base, scen
+
+def build_transmission_index(scen_results : dict, scenarios : dict):
+    '''Map (run, scenario) to whether the scenario's transmission project was 
+    built, the total capacity built and its max capacity investment. Built in 
+    a single pass so chart blocks only need a lookup.'''
+    index = {}
+    for run, result_sets in scen_results.items():
+        for scenario, trn in scenarios.items():
+            rs = result_sets[scenario]
+            
+            capacity = rs.new_capacity
+            capacity = capacity.loc[capacity['TECHNOLOGY'].isin(trn)]
+            
+            try:
+                max_capacity = rs.max_capacity_investment
+                max_capacity = max_capacity.loc[
+                    (max_capacity['TECHNOLOGY'].isin(trn)) & 
+                    (max_capacity['VALUE'] != 0), 'VALUE']
+                max_capacity = max_capacity.iloc[0] if not max_capacity.empty else None
+            except FileNotFoundError:
+                max_capacity = None
+            
+            index[(run, scenario)] = {'built' : not capacity.empty, 
+                                      'capacity' : capacity['VALUE'].sum(), 
+                                      'max_capacity' : max_capacity}
+            
+    return index
+
+def bulk_load(tables, max_workers = 8):
+    '''Load the (ResultSet, table) pairs in tables, e.g. every table the 
+    enabled charts need for every run and scenario, on a pool of max_workers 
+    threads. The raw tables are read first, all files concurrently (the C and 
+    pyarrow readers release the GIL while parsing), then the derived tables 
+    are computed from them. Tables that fail to load are left to be loaded 
+    (and raise) on first access, as without a bulk load.
+
+    Returns the files parsed, one row per file with the RUN and SCENARIO 
+    (None for the base model), FILE, SOURCE (csv, parquet or store), SECONDS 
+    and BYTES read, and the wall time of the whole load.'''
+    start = time.perf_counter()
+    parsed = len(parse_report())
+
+    def load(pair):
+        rs, table = pair
+        try:
+            rs.load(table)
+        except Exception:
+            pass
+
+    raw = [pair for pair in tables if pair[1] in TABLES]
+    derived = [pair for pair in tables if pair[1] in DERIVED]
+
+    with ThreadPoolExecutor(max_workers = max_workers) as executor:
+        list(executor.map(load, raw))
+
+        # Derived tables read other tables of the same ResultSet, they are 
+        # computed one by one per ResultSet.
+        by_result_set = {}
+        for rs, table in derived:
+            by_result_set.setdefault(rs, []).append(table)
+
+        def load_derived(rs):
+            for table in by_result_set[rs]:
+                load((rs, table))
+
+        list(executor.map(load_derived, by_result_set))
+
+    seconds = time.perf_counter() - start
+
+    report = parse_report().iloc[parsed:].reset_index(drop = True)
+    folders = {os.path.abspath(rs.path) + os.sep : rs for rs, table in tables}
+    owners = [next((rs for folder, rs in folders.items() 
+                    if path.startswith(folder)), None) 
+              for path in report['FILE']]
+    report.insert(0, 'RUN', [rs.run if rs else None for rs in owners])
+    report.insert(1, 'SCENARIO', [rs.scenario if rs else None for rs in owners])
+
+    return report, seconds
@@ -0,0 +1,206 @@
+'''Frames in shared memory for the render workers: a frame is copied once
+into a shared memory segment and passed on as a small handle, workers attach
+to the segment by name without copying the data'''
+import uuid
+import pickle
+import hashlib
+import threading
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+'''Segments attached to in this process, kept open for as long as it runs
+since the frames built on them point into their memory.'''
+_ATTACHED = {}
+_ATTACHED_LOCK = threading.Lock()
+
+def _attach(name):
+    with _ATTACHED_LOCK:
+        if name not in _ATTACHED:
+            _ATTACHED[name] = shared_memory.SharedMemory(name = name)
+
+        return _ATTACHED[name]
+
+def release_attached():
+    '''Close the segments attached to in this process. Segments still in use
+    by a frame stay open.'''
+    with _ATTACHED_LOCK:
+        for name, segment in list(_ATTACHED.items()):
+            try:
+                segment.close()
+            except BufferError:
+                continue
+            del _ATTACHED[name]
+
+class SharedTable:
+    '''Picklable handle of a frame in a shared memory segment. Numeric and
+    boolean columns and the codes of categoricals are stored in the segment,
+    the index, the categories and any object columns are pickled with the
+    handle. frame() attaches to the segment and returns the frame without
+    copying the stored columns, their arrays are read-only.'''
+
+    def __init__(self, segment, index, columns, layout, nbytes):
+        self.segment = segment
+        self.index = index
+        self.columns = columns
+        self.layout = layout
+        self.nbytes = nbytes
+
+    def __repr__(self):
+        return (f'SharedTable({self.segment!r}, {len(self.index)} rows, '
+                f'{self.nbytes / 1024 ** 2:.1f} MB)')
+
+    def frame(self):
+        buffer = _attach(self.segment).buf
+        data = {}
+        for i, (kind, dtype, offset, extra) in enumerate(self.layout):
+            if kind == 'object':
+                data[i] = extra
+                continue
+
+            values = np.frombuffer(buffer, dtype = dtype, count = len(self.index),
+                                   offset = offset)
+            values.flags.writeable = False
+            if kind == 'category':
+                categories, ordered = extra
+                values = pd.Categorical.from_codes(values, dtype = pd.CategoricalDtype(
+                    categories, ordered = ordered))
+            data[i] = values
+
+        df = pd.DataFrame(data, index = self.index, copy = False)
+        df.columns = self.columns
+
+        return df
+
+def _unlink(segments : dict):
+    for segment in segments.values():
+        segment.close()
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+    segments.clear()
+
+class SharedTableRegistry:
+    '''Frames placed in shared memory by this process. share() copies a frame
+    into a new segment once and returns its SharedTable. Frames are keyed on
+    their frame_digest, so later calls with the same frame or an equal copy
+    of it (e.g. every access to a ResultSet table) return the same handle.
+
+    The segments are removed by close(), when the registry is garbage
+    collected or when the interpreter exits. If the process is killed, the
+    multiprocessing resource tracker, which every segment is registered
+    with, removes them.'''
+
+    def __init__(self):
+        self._segments = {}
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _unlink, self._segments)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def nbytes(self):
+        return sum(segment.size for segment in self._segments.values())
+
+    def share(self, df, digest = None):
+        '''SharedTable of df, with digest its frame_digest if already known.'''
+        digest = digest or frame_digest(df)
+        with self._lock:
+            if digest in self._tables:
+                return self._tables[digest]
+
+        layout, arrays, nbytes = [], [], 0
+        for i in range(df.shape[1]):
+            column = df.iloc[:, i]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                values = column.cat.codes.to_numpy()
+                extra = (column.cat.categories, column.cat.ordered)
+                kind = 'category'
+            elif isinstance(column.dtype, np.dtype) and column.dtype.kind in 'biufcmM':
+                values = column.to_numpy()
+                extra = None
+                kind = 'array'
+            else:
+                layout.append(('object', None, 0, column.to_numpy()))
+                continue
+
+            # Columns start on 8 byte boundaries.
+            layout.append((kind, values.dtype.str, nbytes, extra))
+            arrays.append((nbytes, values))
+            nbytes += -(-values.nbytes // 8) * 8
+
+        segment = shared_memory.SharedMemory(name = f'osgvis_{uuid.uuid4().hex[:16]}',
+                                             create = True, size = max(nbytes, 1))
+        for offset, values in arrays:
+            np.frombuffer(segment.buf, dtype = values.dtype, count = len(values),
+                          offset = offset)[:] = values
+
+        table = SharedTable(segment.name, df.index, df.columns, layout, nbytes)
+        with self._lock:
+            # Another thread may have shared the same frame meanwhile.
+            if digest in self._tables:
+                _unlink({segment.name : segment})
+                return self._tables[digest]
+
+            self._segments[segment.name] = segment
+            self._tables[digest] = table
+
+        return table
+
+    def close(self):
+        with self._lock:
+            self._tables.clear()
+            self._finalizer()
+
+def frame_digest(df):
+    '''Hash of the contents of a frame, its index and dtypes (with the
+    categories of categoricals).'''
+    dtypes = [(str(dtype), getattr(dtype, 'categories', None), getattr(dtype, 'ordered', None))
+              for dtype in df.dtypes]
+    digest = hashlib.sha1(pickle.dumps((df.columns, df.index.names, str(df.index.dtype),
+                                        dtypes)))
+    digest.update(pd.util.hash_pandas_object(df, index = True).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+class SharingPickler(pickle.Pickler):
+    '''Pickler that puts every frame of at least min_bytes in the registry
+    and pickles its SharedTable instead. With digest set the frame is
+    pickled as its frame_digest instead, for fingerprints, and nothing is
+    shared. The digests computed are kept in digests by id of the frame, so
+    pickling the same objects again (e.g. a job after its fingerprint) does
+    not hash them twice.'''
+
+    def __init__(self, file, registry, min_bytes, digest = False, digests = None):
+        super().__init__(file, protocol = pickle.HIGHEST_PROTOCOL)
+        self.registry = registry
+        self.min_bytes = min_bytes
+        self.digest = digest
+        self.digests = {} if digests is None else digests
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, pd.DataFrame):
+            return None
+
+        if obj.memory_usage(index = True).sum() < self.min_bytes:
+            return None
+
+        key = self.digests.get(id(obj))
+        if key is None:
+            key = self.digests[id(obj)] = frame_digest(obj)
+
+        return ('digest', key) if self.digest else self.registry.share(obj, key)
+
+class AttachingUnpickler(pickle.Unpickler):
+    '''Unpickler of SharingPickler payloads, attaching to the shared frames.'''
+
+    def persistent_load(self, pid):
+        return pid.frame()
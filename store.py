@@ -0,0 +1,268 @@
+'''Embedded SQLite store of all result files under a results_folder, built
+with python store.py [results_folder] [database]'''
+import os
+import sys
+import sqlite3
+import threading
+
+import pandas as pd
+
+from read import (
+    POWER_FILTER,
+    RESULT_SCHEMAS,
+    _find_csv_files,
+    _read_csv_with_schema,
+    _schema_for
+    )
+
+'''SQL expressions of the columns decoded from a TECHNOLOGY code, as in
+utils.decode_technology (e.g. PWRCOAIDNJW01 -> PWR, COA, IDN, IDNJW).'''
+TECHNOLOGY_COLUMNS = {'SECTOR' : 'substr(TECHNOLOGY, 1, 3)',
+                      'TECH' : 'substr(TECHNOLOGY, 4, 3)',
+                      'COUNTRY' : 'substr(TECHNOLOGY, 7, 3)',
+                      'NODE' : 'substr(TECHNOLOGY, 7, 5)'}
+
+def _sql_type(dtype):
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return 'INTEGER'
+
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+
+    return 'TEXT'
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _file_keys(root, file_path):
+    '''(RUN, SCENARIO, FOLDER, TABLE) of a result file at
+    root/run/scenario/folder/Table.csv, None for files elsewhere.'''
+    parts = os.path.relpath(file_path, root).split(os.sep)
+    if len(parts) != 4 or parts[0] == os.pardir:
+        return None
+
+    run, scenario, folder, name = parts
+
+    return run, scenario, folder, os.path.splitext(name)[0]
+
+class ResultStore:
+    '''A SQLite database holding every result file of a results_folder, one
+    table per result file name (e.g. NewCapacity) with the RUN, SCENARIO and
+    FOLDER (e.g. results) names as key columns, indexed on these and, where
+    present, TECHNOLOGY.
+
+    Files are read back whole (read) or aggregated in the database
+    (aggregate, power_totals), so only the aggregated rows reach pandas.
+    Every thread uses its own connection.'''
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+        con = self._connect()
+        con.executescript('''
+            CREATE TABLE IF NOT EXISTS meta (KEY TEXT PRIMARY KEY, VALUE TEXT);
+            CREATE TABLE IF NOT EXISTS files (
+                RUN TEXT, SCENARIO TEXT, FOLDER TEXT, TABLE_NAME TEXT,
+                COLUMNS TEXT, SIZE INTEGER, MTIME_NS INTEGER,
+                PRIMARY KEY (RUN, SCENARIO, FOLDER, TABLE_NAME));
+            ''')
+
+        root = con.execute("SELECT VALUE FROM meta WHERE KEY = 'root'").fetchone()
+        self.root = root[0] if root else None
+
+    def __repr__(self):
+        return f'ResultStore({self.path!r}, root = {self.root!r})'
+
+    def _connect(self):
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.path)
+            self._local.con = con
+
+        return con
+
+    def __getstate__(self):
+        return {'path' : self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def _columns(self, table):
+        return [row[1] for row in self._connect().execute(
+            f'PRAGMA table_info({_quote(table)})')]
+
+    def _add_table(self, table, df):
+        '''Create table for the columns of df, or add the columns it lacks.'''
+        con = self._connect()
+        columns = self._columns(table)
+        if not columns:
+            definition = ', '.join(['RUN TEXT', 'SCENARIO TEXT', 'FOLDER TEXT'] +
+                                   [f'{_quote(col)} {_sql_type(dtype)}'
+                                    for col, dtype in df.dtypes.items()])
+            con.execute(f'CREATE TABLE {_quote(table)} ({definition})')
+            con.execute(f'CREATE INDEX {_quote(f"{table}_keys")} ON '
+                        f'{_quote(table)} (RUN, SCENARIO, FOLDER'
+                        + (', TECHNOLOGY)' if 'TECHNOLOGY' in df else ')'))
+            return
+
+        for col, dtype in df.dtypes.items():
+            if col not in columns:
+                con.execute(f'ALTER TABLE {_quote(table)} ADD COLUMN '
+                            f'{_quote(col)} {_sql_type(dtype)}')
+
+    def ingest(self, root):
+        '''Load every result CSV under root (a results_folder) that is new or
+        changed since the last ingest, and drop the files that were deleted 
+        since. Files are read with their registered schema. Returns the 
+        number of files loaded.'''
+        root = os.path.abspath(root)
+        con = self._connect()
+        if self.root not in (None, root):
+            raise ValueError(f'{self.path} holds the results of {self.root}')
+
+        ingested = {row[:4] : row[4:] for row in con.execute(
+            'SELECT RUN, SCENARIO, FOLDER, TABLE_NAME, SIZE, MTIME_NS FROM files')}
+
+        loaded = 0
+        found = set()
+        for file_path in _find_csv_files([root]):
+            keys = _file_keys(root, file_path)
+            if keys is None:
+                continue
+
+            found.add(keys)
+            stat = os.stat(file_path)
+            if ingested.get(keys) == (stat.st_size, stat.st_mtime_ns):
+                continue
+
+            run, scenario, folder, table = keys
+            df = _read_csv_with_schema(file_path, _schema_for(file_path))
+
+            with con:
+                self._add_table(table, df)
+                con.execute(f'DELETE FROM {_quote(table)} WHERE RUN = ? AND '
+                            'SCENARIO = ? AND FOLDER = ?', (run, scenario, folder))
+
+                columns = ', '.join(_quote(col) for col in
+                                    ['RUN', 'SCENARIO', 'FOLDER', *df.columns])
+                values = ', '.join(['?'] * (len(df.columns) + 3))
+                rows = df.astype(object).where(df.notna(), None).itertuples(index = False)
+                con.executemany(f'INSERT INTO {_quote(table)} ({columns}) VALUES ({values})',
+                                ((run, scenario, folder, *row) for row in rows))
+
+                con.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                            (*keys, ','.join(df.columns), stat.st_size,
+                             stat.st_mtime_ns))
+            loaded += 1
+
+        with con:
+            for run, scenario, folder, table in set(ingested) - found:
+                con.execute(f'DELETE FROM {_quote(table)} WHERE RUN = ? AND '
+                            'SCENARIO = ? AND FOLDER = ?', (run, scenario, folder))
+                con.execute('DELETE FROM files WHERE RUN = ? AND SCENARIO = ? AND '
+                            'FOLDER = ? AND TABLE_NAME = ?', (run, scenario, folder, table))
+
+            con.execute("INSERT OR REPLACE INTO meta VALUES ('root', ?)", (root,))
+        self.root = root
+
+        return loaded
+
+    def keys(self, path):
+        '''(RUN, SCENARIO, FOLDER) of a result folder (e.g. the path given to
+        the read.py readers), None if it is not in this store.'''
+        if self.root is None:
+            return None
+
+        keys = _file_keys(self.root, os.path.join(os.path.abspath(path), 'x.csv'))
+
+        return keys[:3] if keys else None
+
+    def holds(self, path, file_name):
+        '''Whether the file path/file_name is in this store.'''
+        keys = self.keys(path)
+
+        return keys is not None and self._file_columns(
+            *keys, os.path.splitext(file_name)[0]) is not None
+
+    def _file_columns(self, run, scenario, folder, table):
+        row = self._connect().execute(
+            'SELECT COLUMNS FROM files WHERE RUN = ? AND SCENARIO = ? AND '
+            'FOLDER = ? AND TABLE_NAME = ?', (run, scenario, folder, table)).fetchone()
+
+        return row[0].split(',') if row else None
+
+    def read(self, path, file_name):
+        '''The result file path/file_name as read_csv with its schema would
+        return it, None if the store does not hold it.'''
+        keys = self.keys(path)
+        table = os.path.splitext(file_name)[0]
+        columns = self._file_columns(*keys, table) if keys else None
+        if columns is None:
+            return None
+
+        df = pd.read_sql_query(
+            f'SELECT {", ".join(_quote(col) for col in columns)} FROM {_quote(table)} '
+            'WHERE RUN = ? AND SCENARIO = ? AND FOLDER = ? ORDER BY rowid',
+            self._connect(), params = keys)
+
+        schema = RESULT_SCHEMAS.get(file_name)
+
+        return df.astype(schema) if schema else df
+
+    def aggregate(self, table, run, scenarios : list, by : dict,
+                  where = '', params = ()):
+        '''SUM(VALUE) of table for run and scenarios, grouped by SCENARIO and
+        by ({column : SQL expression}), filtered by where (a SQL condition
+        with params), computed in the database and ordered by the groups.'''
+        groups = ', '.join(f'{expression} AS {_quote(col)}'
+                           for col, expression in by.items())
+        keys = ', '.join(['SCENARIO'] + [_quote(col) for col in by])
+        placeholders = ', '.join(['?'] * len(scenarios))
+
+        return pd.read_sql_query(
+            f'SELECT SCENARIO, {groups}, SUM(VALUE) AS VALUE FROM {_quote(table)} '
+            f'WHERE RUN = ? AND SCENARIO IN ({placeholders}) '
+            + (f'AND {where} ' if where else '') +
+            f'GROUP BY {keys} ORDER BY {keys}',
+            self._connect(), params = (run, *scenarios, *params))
+
+    def power_totals(self, table, run, scenarios : list, spatial = 'COUNTRY'):
+        '''VALUE of the power technologies of table summed by SCENARIO, TECH,
+        spatial (COUNTRY or NODE) and YEAR in the database, in the format of
+        utils.format_technology_col. Rows are filtered as in
+        read.POWER_FILTER (PWR, without transmission, within the YEAR
+        window), as by the power technology readers.'''
+        # A range on TECHNOLOGY, unlike LIKE 'PWR%', can use the index.
+        prefixes = POWER_FILTER['prefixes']
+        where = ('(' + ' OR '.join(['(TECHNOLOGY >= ? AND TECHNOLOGY < ?)'] * len(prefixes))
+                 + ') AND instr(TECHNOLOGY, ?) = 0')
+        params = [bound for prefix in prefixes
+                  for bound in (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))]
+        params.append(POWER_FILTER['exclude'])
+
+        if POWER_FILTER['years'] is not None:
+            where += ' AND YEAR BETWEEN ? AND ?'
+            params.extend(POWER_FILTER['years'])
+
+        df = self.aggregate(table, run, scenarios,
+                            {'TECH' : TECHNOLOGY_COLUMNS['TECH'],
+                             spatial : TECHNOLOGY_COLUMNS[spatial],
+                             'YEAR' : 'YEAR'},
+                            where = where, params = params)
+
+        return df.astype({'TECH' : 'category', spatial : 'category',
+                          'YEAR' : 'int16', 'VALUE' : 'float64'})
+
+if __name__ == '__main__':
+    # python store.py [results_folder] [database], defaults to the
+    # results_folder in user_config and results.sqlite inside it
+    args = sys.argv[1:]
+    if args:
+        folder = args[0]
+    else:
+        from user_config import results_folder as folder
+
+    store = ResultStore(args[1] if len(args) > 1 else
+                        os.path.join(folder, 'results.sqlite'))
+    print(f'Loaded {store.ingest(folder)} result files into {store.path}')
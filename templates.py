@@ -0,0 +1,174 @@
+'''Figure templates of the charts drawn for every country, scenario and run'''
+from figures import (
+    subplots,
+    FigureTemplate,
+    StackedBars,
+    frame_layout
+    )
+
+from utils import make_space_above
+
+def _colors(df, color_dict):
+    return tuple(color_dict.get(col) for col in df.columns)
+
+class StackedBarChart(FigureTemplate):
+    '''Stacked bars of a pivoted frame (YEAR x TECH, FUEL, ...), used by
+    format_stacked_bar_pwr, format_stacked_bar_demand and
+    format_stacked_bar_gen_shares.'''
+
+    def layout(self, df, color_dict, chart_title, legend_title, unit):
+        return frame_layout(df) + (_colors(df, color_dict),)
+
+    def build(self, df, color_dict, chart_title, legend_title, unit):
+        self.fig, self.ax = subplots()
+        self.bars = StackedBars(self.ax, df, color_dict)
+
+        self.ax.margins(x=0)
+        self._set_labels(chart_title, legend_title, unit)
+
+    def update(self, df, color_dict, chart_title, legend_title, unit):
+        self.bars.update(df)
+        self._set_labels(chart_title, legend_title, unit)
+
+    def _set_labels(self, chart_title, legend_title, unit):
+        self.ax.set_title(chart_title)
+        self.ax.set_ylabel(unit)
+        self.ax.legend(bbox_to_anchor=(1, 1.02), frameon = False,
+                       reverse = True, title = legend_title)
+
+class BarLineChart(FigureTemplate):
+    '''Bars of df1 with a line of df2 on a secondary axis (both indexed by
+    YEAR), used by format_bar_line.'''
+
+    def layout(self, df1, df2, color_dict, chart_title, legend_title, unit1, unit2):
+        return (tuple(df1.index), tuple(df2.index), unit1, color_dict.get('bar'),
+                color_dict.get('line'))
+
+    def build(self, df1, df2, color_dict, chart_title, legend_title, unit1, unit2):
+        self.fig, self.ax1 = subplots()
+        self.bars = StackedBars(self.ax1, self._bar_frame(df1, unit1),
+                                {unit1 : color_dict.get('bar')})
+
+        self.ax2 = self.ax1.twinx()
+        self.line, = self.ax2.plot(df2.index, df2['VALUE'],
+                                   color = color_dict.get('line'))
+
+        self.ax1.margins(x=0)
+        self._set_labels(chart_title, legend_title, unit1, unit2)
+
+    def update(self, df1, df2, color_dict, chart_title, legend_title, unit1, unit2):
+        self.bars.update(self._bar_frame(df1, unit1))
+
+        # ax2 shares the x axis, only its y axis is rescaled.
+        self.line.set_ydata(df2['VALUE'])
+        self.ax2.relim()
+        self.ax2.autoscale_view(scalex = False)
+
+        self._set_labels(chart_title, legend_title, unit1, unit2)
+
+    def _bar_frame(self, df1, unit1):
+        # The bars are labelled with the unit in the legend.
+        return df1[['VALUE']].rename(columns = {'VALUE' : unit1})
+
+    def _set_labels(self, chart_title, legend_title, unit1, unit2):
+        self.line.set_label(unit2)
+
+        self.ax1.set_title(chart_title)
+        self.ax1.set_ylabel(unit1)
+        self.ax2.set_ylabel(unit2)
+        self.ax1.legend(bbox_to_anchor=(0.5, -0.05), frameon = False,
+                        title = legend_title)
+
+        self.ax2.legend(bbox_to_anchor=(0.8, -0.05), frameon = False,
+                        title = legend_title)
+
+class MultiPlotCountryChart(FigureTemplate):
+    '''Capacity, generation, generation shares and emissions of a country in
+    four panels, used by format_multi_plot_country_charts.'''
+
+    def layout(self, df1, df2, df3, df4, df5, units, color_dicts, country):
+        return (frame_layout(df1), frame_layout(df2), frame_layout(df3),
+                frame_layout(df4), tuple(df5.index), units,
+                _colors(df1, color_dicts[0]), _colors(df2, color_dicts[0]),
+                _colors(df3, color_dicts[1]), tuple(color_dicts[2].items()))
+
+    def build(self, df1, df2, df3, df4, df5, units, color_dicts, country):
+        unit1, unit2, unit3, unit4, unit5 = units
+        color_dict1, color_dict2, color_dict3 = color_dicts
+
+        # SET PLOT BASE
+        fig, axs = subplots(2, 2, squeeze = False,
+                                gridspec_kw = {'height_ratios' : [1, 1],
+                                               'width_ratios' : [1, 1]},
+                                figsize = (10, 6)
+                                )
+
+        # SET CAPACITY AND GENERATION GRAPHS
+        self.bars1 = StackedBars(axs[0, 0], df1, color_dict1)
+        self.bars2 = StackedBars(axs[0, 1], df2, color_dict1, label = False)
+
+        axs[0, 0].set_ylabel(unit1)
+        axs[0, 1].set_ylabel(unit2)
+
+        # SET GEN SHARES GRAPH
+        self.bars3 = StackedBars(axs[1, 0], df3, color_dict2)
+
+        axs[1, 0].set_ylabel(unit3)
+        axs[1, 0].legend(bbox_to_anchor=(1.05, -0.1), frameon = False,
+                  ncols = 3)
+
+        # SET EMISSIONS GRAPH
+        self.bars4 = StackedBars(axs[1, 1], df4, {unit4 : color_dict3.get('bar')})
+
+        self.ax2 = axs[1, 1].twinx()
+
+        self.line, = self.ax2.plot(df5.index, df5['VALUE'], label= unit5,
+                                   color = color_dict3.get('line'))
+
+        axs[1, 1].set_ylabel(unit4)
+        self.ax2.set_ylabel(unit5)
+        axs[1, 1].legend(bbox_to_anchor=(0.5, -0.1), frameon = False)
+
+        self.ax2.legend(bbox_to_anchor=(0.9, -0.1), frameon = False)
+
+        # PLT ADJUSTMENTS
+        for ax in axs.ravel():
+            ax.margins(x = 0)
+
+        axs[0, 0].text(-0.16, 0, 'a', transform=axs[0, 0].transAxes,
+                  name = 'Calibri', fontsize = 15, weight = 'bold')
+
+        axs[0, 1].text(1.05, 0, 'b', transform=axs[0, 0].transAxes,
+                  name = 'Calibri', fontsize = 15, weight = 'bold')
+
+        axs[1, 0].text(-0.16, -1.43, 'c', transform=axs[0, 0].transAxes,
+                  name = 'Calibri', fontsize = 15, weight = 'bold')
+
+        axs[1, 1].text(1.05, -1.43, 'd', transform=axs[0, 0].transAxes,
+                  name = 'Calibri', fontsize = 15, weight = 'bold')
+
+        fig.subplots_adjust(wspace=0.22, hspace = 0.42)
+
+        make_space_above(axs, topmargin=0.45)
+
+        self.fig, self.axs = fig, axs
+        self._set_labels(country)
+
+    def update(self, df1, df2, df3, df4, df5, units, color_dicts, country):
+        for bars, df in zip([self.bars1, self.bars2, self.bars3, self.bars4],
+                            [df1, df2, df3, df4]):
+            bars.update(df)
+
+        # ax2 shares the x axis, only its y axis is rescaled.
+        self.line.set_ydata(df5['VALUE'])
+        self.ax2.relim()
+        self.ax2.autoscale_view(scalex = False)
+
+        self._set_labels(country)
+
+    def _set_labels(self, country):
+        # The capacity legend lists the technologies of the current country.
+        self.axs[0, 0].legend(bbox_to_anchor=(2.23, -0.1), frameon = False,
+                  ncols = 8)
+
+        self.fig.suptitle(country, weight = 'bold')
@@ -0,0 +1,106 @@
+'''The out-of-core sums match those of the loaded tables, with chunks sized
+from the memory ceiling, the ceiling enforced and missing keys dropped.'''
+import numpy as np
+import pandas as pd
+import pytest
+
+import chunked
+from benchmark import activity_csv
+from chunked import (
+    CodeAccumulator,
+    MemoryLimitError,
+    OUT_OF_CORE,
+    _factorized,
+    chunk_rows,
+    emission_totals,
+    technology_totals
+    )
+from read import _read_csv_with_schema, _schema_for
+from utils import format_annual_emissions, format_technology_col
+
+@pytest.fixture(autouse = True)
+def settings():
+    settings = OUT_OF_CORE.copy()
+    yield
+
+    OUT_OF_CORE.update(settings)
+
+@pytest.fixture
+def activity(tmp_path):
+    path = str(tmp_path / 'TotalTechnologyAnnualActivity.csv')
+    activity_csv(path, 200000)
+
+    return path
+
+def test_chunk_rows_follow_ceiling(activity):
+    OUT_OF_CORE.update(max_mb = 8, chunksize = None)
+    rows = chunk_rows(activity)
+    OUT_OF_CORE['max_mb'] = 16
+
+    assert chunk_rows(activity) == pytest.approx(2 * rows, abs = 1)
+
+    OUT_OF_CORE['chunksize'] = 5000
+    assert chunk_rows(activity) == 5000
+
+@pytest.mark.parametrize('node', [False, True])
+def test_technology_totals(activity, node):
+    OUT_OF_CORE.update(max_mb = 4, chunksize = None)
+    assert chunk_rows(activity) < 200000
+
+    expected = format_technology_col(
+        _read_csv_with_schema(activity, _schema_for(activity)), node = node)
+
+    pd.testing.assert_frame_equal(technology_totals(activity, node = node),
+                                  expected, check_categorical = False)
+
+def test_ceiling_counts_temporaries(activity, monkeypatch):
+    # Chunks of 20000 rows fit in 1 MB, their temporaries do not.
+    OUT_OF_CORE.update(max_mb = 1, chunksize = 20000)
+    with pytest.raises(MemoryLimitError):
+        technology_totals(activity, node = True)
+
+    monkeypatch.setattr(chunked, 'TEMPORARY_BYTES', 0)
+    technology_totals(activity, node = True)
+
+def emissions_csv(path, emissions):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame([(emission, year) for emission in emissions
+                       for year in range(2021, 2051)], columns = ['EMISSION', 'YEAR'])
+    df.insert(0, 'REGION', 'GLOBAL')
+    df['VALUE'] = rng.random(len(df))
+    df.to_csv(path, index = False)
+
+    return _read_csv_with_schema(path, _schema_for(path))
+
+@pytest.mark.parametrize('emissions', [['CO2MYS', 'CO2IDN', 'CO2THA'],
+                                       ['CO2MYS', 'CO2IDN', 'CH4IDN', None]])
+def test_emission_totals(tmp_path, emissions):
+    path = str(tmp_path / 'AnnualEmissions.csv')
+    df = emissions_csv(path, emissions)
+    OUT_OF_CORE.update(max_mb = 1, chunksize = 25)
+
+    pd.testing.assert_frame_equal(emission_totals(path, country = False),
+                                  format_annual_emissions(df.copy(), country = False))
+
+    expected = format_annual_emissions(df.copy(), country = True)
+    if None not in emissions:
+        # One emission per country, the rows are those of the formatter.
+        pd.testing.assert_frame_equal(
+            emission_totals(path, country = True),
+            expected.sort_values(['COUNTRY', 'YEAR']).reset_index(drop = True))
+
+    pd.testing.assert_frame_equal(
+        emission_totals(path, country = True),
+        expected.groupby(['COUNTRY', 'YEAR'], as_index = False)['VALUE'].sum())
+
+def test_missing_keys_are_dropped():
+    df = pd.DataFrame({'TECH' : ['COA', None, 'SPV', 'COA', None],
+                       'YEAR' : [2030, 2030, 2031, 2031, 2031],
+                       'VALUE' : [1.0, 2.0, 3.0, 4.0, 5.0]})
+    accumulator = CodeAccumulator(['TECH', 'YEAR'])
+    accumulator.add([_factorized(df['TECH']), _factorized(df['YEAR'])],
+                    df['VALUE'].to_numpy())
+
+    pd.testing.assert_frame_equal(
+        accumulator.frame(categorical = False),
+        df.groupby(['TECH', 'YEAR'], as_index = False)['VALUE'].sum())
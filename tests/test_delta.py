@@ -0,0 +1,171 @@
+'''The delta helpers and the formatters built on them leave their inputs
+untouched, so cached tables can be passed to several charts.'''
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from constants import BAR_TECH_COLOR_DICT
+from delta import (
+    horizon_delta,
+    multi_scenario_delta,
+    sensitivity_delta,
+    geo_sensitivity_delta,
+    gen_shares_delta
+    )
+from data import (
+    format_bar_delta_multi_scenario,
+    format_bar_delta_multi_scenario_sensitivities,
+    format_bar_delta_multi_scenario_geo_sensitivity,
+    format_headline_metrics_global,
+    format_stacked_bar_gen_shares_delta,
+    format_stacked_bar_gen_shares_delta_multi_scenario
+    )
+
+RUNS = ['Base', 'CoalPhaseOut']
+SCENARIOS = ['IDNJWIDNSM', 'MYSPETHASO']
+
+def yearly(seed):
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({'YEAR' : np.arange(2023, 2051, dtype = np.int16),
+                         'VALUE' : rng.random(28) * 100})
+
+def metrics(renewable, fossil):
+    return pd.DataFrame({'Metric' : ['Renewable energy share', 'Fossil energy share',
+                                     'Cost'],
+                         'Unit' : ['%', '%', '$'],
+                         'Value' : [renewable, fossil, 6500.0]})
+
+def shares(seed):
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({'YEAR' : np.arange(2023, 2051, dtype = np.int16),
+                         'RENEWABLE' : rng.random(28) * 50,
+                         'FOSSIL' : rng.random(28) * 50})
+
+def tech_delta(seed):
+    rng = np.random.default_rng(seed)
+    techs = list(BAR_TECH_COLOR_DICT)[:6]
+    df = pd.DataFrame({'Base' : rng.random(6) * 10, 'IDNJWIDNSM' : rng.random(6) * 10},
+                      index = pd.Index(techs, name = 'TECH'))
+    df['DELTA'] = round(df['IDNJWIDNSM'] - df['Base'], 2)
+
+    return df
+
+def assert_unchanged(before, after):
+    if isinstance(before, pd.DataFrame):
+        pd.testing.assert_frame_equal(after, before)
+    elif isinstance(before, dict):
+        assert list(after) == list(before)
+        for key in before:
+            assert_unchanged(before[key], after[key])
+    else:
+        assert after == before
+
+def call_unchanged(func, *args):
+    '''Call func and check that none of args was modified.'''
+    before = copy.deepcopy(args)
+    result = func(*args)
+    for arg_before, arg in zip(before, args):
+        assert_unchanged(arg_before, arg)
+
+    return result
+
+@pytest.fixture
+def inputs():
+    base = yearly(0)
+    scen = {scenario : yearly(i) for i, scenario in enumerate(SCENARIOS, start = 1)}
+
+    return {'base' : base, 'scen' : scen,
+            'base_runs' : {run : yearly(10 + i) for i, run in enumerate(RUNS)},
+            'scen_runs' : {run : {scenario : yearly(20 + 10 * i + j)
+                                  for j, scenario in enumerate(SCENARIOS)}
+                           for i, run in enumerate(RUNS)}}
+
+def test_horizon_delta(inputs):
+    value = call_unchanged(horizon_delta, inputs['base'], inputs['scen']['IDNJWIDNSM'])
+
+    assert value == pytest.approx(inputs['scen']['IDNJWIDNSM']['VALUE'].sum() - 
+                                  inputs['base']['VALUE'].sum())
+
+def test_multi_scenario_delta(inputs):
+    df = call_unchanged(multi_scenario_delta, inputs['base'], inputs['scen'])
+    assert list(df.index) == SCENARIOS
+
+    call_unchanged(multi_scenario_delta, inputs['scen'], inputs['scen'])
+
+def test_sensitivity_delta(inputs):
+    df = call_unchanged(sensitivity_delta, inputs['base_runs'], inputs['scen_runs'], RUNS)
+
+    assert list(df.columns) == RUNS
+
+def test_geo_sensitivity_delta(inputs):
+    df = call_unchanged(geo_sensitivity_delta, inputs['base'], inputs['scen'],
+                        inputs['scen'], inputs['scen'], 'Base')
+
+    assert list(df.columns) == ['Base', 'Bilateral']
+
+def test_gen_shares_delta():
+    df = call_unchanged(gen_shares_delta, metrics(40.0, 35.0), metrics(45.0, 30.0))
+
+    assert list(df.columns) == ['Renewable', 'Fossil', 'Other']
+
+def test_format_bar_delta_multi_scenario(inputs, tmp_path):
+    call_unchanged(lambda df1, df2_dict: format_bar_delta_multi_scenario(
+        df1, df2_dict, tmp_path, 'title', 'chart', {'bar' : 'grey'}, 'unit', False, False),
+                   inputs['base'], inputs['scen'])
+
+def test_format_bar_delta_multi_scenario_sensitivities(inputs, tmp_path):
+    colors = {run : 'grey' for run in RUNS}
+    call_unchanged(lambda df1_dict, df2_dict: format_bar_delta_multi_scenario_sensitivities(
+        df1_dict, df2_dict, tmp_path, 'title', 'chart', colors, 'unit', True, RUNS, 'Base'),
+                   inputs['base_runs'], inputs['scen_runs'])
+
+def test_format_bar_delta_multi_scenario_geo_sensitivity(inputs, tmp_path):
+    colors = {'Base' : 'grey', 'Bilateral' : 'blue'}
+    call_unchanged(lambda *args: format_bar_delta_multi_scenario_geo_sensitivity(
+        *args, tmp_path, 'title', 'chart', colors, 'unit', False, 'Base'),
+                   inputs['base'], inputs['scen'], inputs['scen'], inputs['scen'])
+
+def test_format_stacked_bar_gen_shares_delta(tmp_path):
+    colors = {'Renewable' : 'green', 'Fossil' : 'black', 'Other' : 'grey'}
+    call_unchanged(lambda *args: format_stacked_bar_gen_shares_delta(
+        *args, tmp_path, 'title', '', 'chart', colors, '%'),
+                   shares(0), shares(1), metrics(40.0, 35.0), metrics(45.0, 30.0))
+
+    assert (tmp_path / 'chart.png').exists()
+
+def test_format_stacked_bar_gen_shares_delta_multi_scenario(tmp_path):
+    colors = {'Renewable' : 'green', 'Fossil' : 'black', 'Other' : 'grey'}
+    scen = {scenario : metrics(45.0 + i, 30.0 - i) for i, scenario in enumerate(SCENARIOS)}
+    call_unchanged(lambda df1, df2_dict: format_stacked_bar_gen_shares_delta_multi_scenario(
+        df1, df2_dict, tmp_path, 'title', 'chart', colors, '%', True),
+                   metrics(40.0, 35.0), scen)
+
+    assert (tmp_path / 'chart.png').exists()
+
+def test_format_headline_metrics_global(inputs, tmp_path):
+    trn = pd.DataFrame({'TECHNOLOGY' : ['TRNIDNJWIDNSM', 'PWRCOAIDNJW01'],
+                        'YEAR' : [2030, 2030], 'VALUE' : [3.5, 1.0]})
+    max_trn = pd.DataFrame({'TECHNOLOGY' : ['TRNIDNJWIDNSM', 'TRNIDNJWIDNSM'],
+                            'YEAR' : [2030, 2031], 'VALUE' : [5.0, 0.0]})
+
+    def render(capacity, production, shares1, shares2, emissions1, emissions2,
+               costs1, costs2, capacity_trn, max_capacity_trn):
+        format_headline_metrics_global(
+            capacity, production, 'Capacity', 'Generation',
+            BAR_TECH_COLOR_DICT, BAR_TECH_COLOR_DICT,
+            shares1, shares2, 'Shares',
+            {'Renewable' : 'green', 'Fossil' : 'black', 'Other' : 'grey'},
+            emissions1, emissions2, 'Emissions', {'bar' : 'grey'},
+            costs1, costs2, 'Costs', {'bar' : 'grey'},
+            capacity_trn, max_capacity_trn, 'Transmission',
+            {'new' : 'blue', 'max' : 'red'}, tmp_path, '', 'chart', 'IDNJWIDNSM')
+
+    call_unchanged(render, tech_delta(0), tech_delta(1),
+                   metrics(40.0, 35.0), metrics(45.0, 30.0),
+                   yearly(2), yearly(3), yearly(4), yearly(5), trn, max_trn)
+
+    assert (tmp_path / 'chart.png').exists()
@@ -0,0 +1,77 @@
+'''The power technology rows are the same whether they are streamed from the
+CSV, read from its Parquet sidecar or filtered from the cached file, and a
+file is parsed once.'''
+import pandas as pd
+import pytest
+
+import read
+from read import (
+    POWER_FILTER,
+    RESULT_CACHE,
+    read_new_capacity,
+    read_new_capacity_power,
+    set_sidecar_cache,
+    stream_filtered,
+    warm_cache
+    )
+
+TECHNOLOGIES = ['PWRSOLIDNJW01', 'PWRCOAIDNJW01', 'TRNIDNJWIDNSM', 'MINCOAIDN']
+
+@pytest.fixture
+def results(tmp_path):
+    df = pd.DataFrame([(technology, year) for technology in TECHNOLOGIES
+                       for year in range(2020, 2031)], columns = ['TECHNOLOGY', 'YEAR'])
+    df.insert(0, 'REGION', 'ASEAN')
+    df['VALUE'] = range(len(df))
+    df.to_csv(tmp_path / 'NewCapacity.csv', index = False)
+
+    sidecar, years = read.SIDECAR_CACHE['enabled'], POWER_FILTER['years']
+    RESULT_CACHE.clear()
+    yield tmp_path
+
+    RESULT_CACHE.clear()
+    set_sidecar_cache(sidecar)
+    POWER_FILTER['years'] = years
+
+def stream(path, years = None, chunksize = 5):
+    return stream_filtered(str(path / 'NewCapacity.csv'), ['PWR'], 'TRN', years = years,
+                           columns = POWER_FILTER['columns'], chunksize = chunksize)
+
+@pytest.mark.parametrize('chunksize', [5, 1000])
+@pytest.mark.parametrize('years', [None, (2023, 2027)])
+def test_sidecar_matches_csv(results, years, chunksize):
+    set_sidecar_cache(False)
+    expected = stream(results, years, chunksize)
+
+    set_sidecar_cache(True)
+    if not read.SIDECAR_CACHE['enabled']:
+        pytest.skip('pyarrow is not installed')
+    warm_cache([str(results)])
+
+    pd.testing.assert_frame_equal(stream(results, years), expected)
+    assert list(expected['TECHNOLOGY'].cat.categories) == ['PWRCOAIDNJW01', 'PWRSOLIDNJW01']
+
+def test_empty_csv(tmp_path):
+    (tmp_path / 'NewCapacity.csv').write_text('REGION,TECHNOLOGY,YEAR,VALUE\n')
+    df = stream(tmp_path)
+
+    assert df.empty
+    assert df.dtypes.astype(str).tolist() == ['category', 'int16', 'float64']
+
+def test_power_rows_from_cached_file(results, monkeypatch):
+    set_sidecar_cache(False)
+    expected = read_new_capacity_power(str(results))
+    RESULT_CACHE.clear()
+
+    # Once the whole file is cached, its power rows are filtered from it.
+    read_new_capacity(str(results))
+    monkeypatch.setattr(read, 'stream_filtered', None)
+    pd.testing.assert_frame_equal(read_new_capacity_power(str(results)), expected)
+
+def test_streamed_rows_are_cached(results):
+    set_sidecar_cache(False)
+    expected = read_new_capacity_power(str(results))
+    misses = RESULT_CACHE.info()['misses']
+
+    pd.testing.assert_frame_equal(read_new_capacity_power(str(results)), expected)
+    assert RESULT_CACHE.info()['misses'] == misses
@@ -0,0 +1,48 @@
+'''Frames passed to the render workers are shared once per table, and only
+for jobs that are rendered. Job names, the manifest keys, are unique.'''
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from render import RenderScheduler
+
+def write_sum(df, out_dir, file_name):
+    with open(os.path.join(out_dir, f'{file_name}.txt'), 'w') as f:
+        f.write(str(df['VALUE'].sum()))
+
+def table(seed):
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({'TECH' : pd.Categorical(rng.choice(['COA', 'SPV', 'WON'], 1000)),
+                         'VALUE' : rng.random(1000)})
+
+def test_equal_frames_share_a_segment(tmp_path):
+    df = table(0)
+    charts = RenderScheduler(max_workers = 2, shared_mb = 0)
+    for i in range(3):
+        charts.submit(write_sum, df.copy(), str(tmp_path), f'sum{i}')
+    charts.submit(write_sum, table(1), str(tmp_path), 'other')
+
+    assert len(charts.shared._segments) == 2
+
+    summary = charts.run()
+    assert (summary['STATUS'] == 'ok').all()
+    assert (tmp_path / 'sum2.txt').read_text() == str(df['VALUE'].sum())
+
+def test_skipped_jobs_are_not_shared(tmp_path):
+    manifest = str(tmp_path / 'manifest.json')
+    for expected in ['ok', 'skipped']:
+        charts = RenderScheduler(max_workers = 2, manifest = manifest, shared_mb = 0)
+        charts.submit(write_sum, table(0), str(tmp_path), 'sum')
+
+        assert (charts.shared.nbytes > 0) == (expected == 'ok')
+        assert charts.run()['STATUS'].tolist() == [expected]
+
+def test_duplicate_jobs_are_rejected(tmp_path):
+    charts = RenderScheduler(max_workers = 1)
+    charts.submit(write_sum, table(0), str(tmp_path), 'sum')
+
+    with pytest.raises(ValueError):
+        charts.submit(write_sum, table(1), str(tmp_path), 'sum')
@@ -0,0 +1,77 @@
+'''The power technology tables summed in the result store match those read
+from the CSV files, with the same POWER_FILTER applied, and deleted files
+are dropped from the store.'''
+import numpy as np
+import pandas as pd
+import pytest
+
+import read
+from read import POWER_FILTER, set_result_store, set_sidecar_cache, set_year_window
+from results import ResultSet
+from store import ResultStore
+
+TECHNOLOGIES = ['PWRCOAIDNJW01', 'PWRSOLIDNJW01', 'PWRSOLIDNSM01', 'PWRWONMYSPE01',
+                'TRNIDNJWIDNSM', 'PWRTRNIDNJWIDNSM', 'MINCOAIDN']
+
+def write_results(folder, seed):
+    rng = np.random.default_rng(seed)
+    results = folder / 'results'
+    results.mkdir(parents = True)
+    for file_name in ['NewCapacity.csv', 'TotalTechnologyAnnualActivity.csv']:
+        df = pd.DataFrame([(technology, year) for technology in TECHNOLOGIES
+                           for year in range(2020, 2056)],
+                          columns = ['TECHNOLOGY', 'YEAR'])
+        df.insert(0, 'REGION', 'ASEAN')
+        df['VALUE'] = rng.random(len(df)) * 10
+        df.to_csv(results / file_name, index = False)
+
+@pytest.fixture
+def results_folder(tmp_path):
+    for i, scenario in enumerate(['Base', 'IDNJWIDNSM']):
+        write_results(tmp_path / 'Run' / scenario, i)
+
+    sidecar = read.SIDECAR_CACHE['enabled']
+    years = POWER_FILTER['years']
+    set_sidecar_cache(False)
+    yield tmp_path
+
+    set_result_store(None)
+    set_sidecar_cache(sidecar)
+    POWER_FILTER['years'] = years
+
+@pytest.mark.parametrize('years', [None, (2023, 2050)])
+@pytest.mark.parametrize('table', ['capacity', 'capacity_nodal',
+                                   'generation', 'generation_nodal'])
+def test_store_matches_csv(results_folder, tmp_path, table, years):
+    POWER_FILTER['years'] = None
+    if years is not None:
+        set_year_window(*years)
+
+    path = str(results_folder / 'Run' / 'IDNJWIDNSM')
+
+    set_result_store(None)
+    expected = getattr(ResultSet(path, 'Run', 'IDNJWIDNSM'), table)
+
+    store = ResultStore(str(tmp_path / 'results.sqlite'))
+    store.ingest(str(results_folder))
+    set_result_store(store)
+    df = getattr(ResultSet(path, 'Run', 'IDNJWIDNSM'), table)
+
+    pd.testing.assert_frame_equal(df, expected, check_categorical = False)
+    if years is not None:
+        assert df['YEAR'].between(*years).all()
+        assert df['YEAR'].min() == years[0] and df['YEAR'].max() == years[1]
+
+def test_deleted_files_are_dropped(results_folder, tmp_path):
+    path = results_folder / 'Run' / 'IDNJWIDNSM' / 'results'
+    store = ResultStore(str(tmp_path / 'results.sqlite'))
+    assert store.ingest(str(results_folder)) == 4
+
+    (path / 'NewCapacity.csv').unlink()
+    assert store.ingest(str(results_folder)) == 0
+
+    assert not store.holds(str(path), 'NewCapacity.csv')
+    assert store.holds(str(path), 'TotalTechnologyAnnualActivity.csv')
+    assert store.holds(str(results_folder / 'Run' / 'Base' / 'results'), 'NewCapacity.csv')
+    assert store._connect().execute(
+        "SELECT COUNT(*) FROM NewCapacity WHERE SCENARIO = 'IDNJWIDNSM'").fetchone() == (0,)
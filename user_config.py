@@ -59,6 +59,12 @@ scenarios = {
 start_year = 2023
 end_year = 2050
 
+'''Set to True to read only the years from start_year to end_year of the 
+capacity and generation of the power technologies. The totals and deltas 
+over the model horizon in the charts then cover these years only, by 
+default they cover every year of the result files.'''
+trim_to_horizon = False
+
 scen_dir_data = {}
 scen_dir_results = {}
 scen_dir_results_summaries = {}
@@ -213,4 +219,51 @@ system_delta = True
 
 '''Set to True if the axis labels need to be ordered by absolute size of the Delta.
 Set to False if the labels need to be ordered alphabetically.'''
-axis_sort_delta = False
\ No newline at end of file
+axis_sort_delta = False
+
+'''Set the memory budget (in MB) of the in-memory cache of parsed result files.
+Each result file is parsed once per run; the least recently used files are 
+dropped from the cache when the budget is exceeded.'''
+cache_memory_budget = 2048
+
+'''Set to True to keep a Parquet copy next to each result CSV that is read, 
+which is much faster to load on later runs (requires pyarrow). Run 
+'python read.py' to convert a full results_folder up front.'''
+sidecar_cache = True
+
+'''Set the path of a result store, a database of every result file under 
+results_folder built with 'python store.py', to read the results from it and 
+sum the capacity and generation tables in the database. Set to None to read 
+the result CSVs.'''
+result_store = None
+
+'''Set to True to sum the capacity, generation and emission tables over 
+chunks of their result files instead of loading them whole, for result sets 
+too large to keep in memory (e.g. the full OSeMOSYS Global model). Only 
+these totals are computed out of core: the deltas between the base model 
+and the scenarios are computed in memory from them, as they are the size of 
+the charts rather than of the result files. memory_ceiling (in MB) caps the 
+memory of parsing a chunk, the sums and the temporaries of adding a chunk to 
+them, the chunks are sized from it. Exceeding it raises a MemoryLimitError.'''
+out_of_core = False
+memory_ceiling = 512
+
+'''Set the number of threads used to load the result files of the enabled 
+charts before they are computed. Set to 0 to load each file when a chart 
+first needs it.'''
+load_workers = 8
+
+'''Set the number of processes used to render the charts. Set to None to use 
+all available cores, or to 1 to render the charts one by one in the main 
+process.'''
+render_workers = None
+
+'''Set the size (in MB) from which a table passed to the render processes is 
+placed in shared memory once, for the processes to read it without a copy of 
+their own. Set to None to pass all tables as copies.'''
+shared_table_mb = 64
+
+'''Set to True to only render charts whose inputs or formatting code changed 
+since the previous run. Fingerprints of the rendered charts are kept in 
+Figures/{base_model}/manifest.json, delete it to render all charts again.'''
+incremental_build = True
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def get_years(start: int, end: int) -> range:
@@ -13,31 +14,62 @@ def convert_million_to_billion(df):
     
     return df
 
+'''Decoded technology codes (e.g. PWRCOAIDNJW01 -> PWR, COA, IDN, IDNJW), 
+filled once per unique TECHNOLOGY string and reused across calls.'''
+_TECHNOLOGY_CODES = {}
+
+def _decode_technology_code(code):
+    return (code[:3], code[3:6], code[6:9], code[6:11], 'TRN' in code)
+
+def decode_technology(technology):
+    '''Decode a TECHNOLOGY column into SECTOR, TECH, COUNTRY, NODE and TRN 
+    columns aligned with its rows. Only the unique codes are decoded, the rows 
+    are filled by broadcasting through the category codes.'''
+    if isinstance(technology.dtype, pd.CategoricalDtype):
+        codes = technology.cat.codes.to_numpy()
+        uniques = technology.cat.categories
+    else:
+        codes, uniques = pd.factorize(technology)
+    
+    for code in uniques:
+        if code not in _TECHNOLOGY_CODES:
+            _TECHNOLOGY_CODES[code] = _decode_technology_code(code)
+            
+    decoded = pd.DataFrame([_TECHNOLOGY_CODES[code] for code in uniques], 
+                           columns = ['SECTOR', 'TECH', 'COUNTRY', 'NODE', 'TRN'])
+    
+    df = pd.DataFrame(index = technology.index)
+    for col in ['SECTOR', 'TECH', 'COUNTRY', 'NODE']:
+        col_codes, col_uniques = pd.factorize(decoded[col], sort = True)
+        df[col] = pd.Categorical.from_codes(
+            np.append(col_codes, -1)[codes], col_uniques)
+        
+    df['TRN'] = np.append(decoded['TRN'].to_numpy(dtype = bool), False)[codes]
+    
+    return df
+
 def format_technology_col(df, node : bool):
     
-    df = df.loc[(df['TECHNOLOGY'].str.startswith('PWR')) & 
-                ~(df['TECHNOLOGY'].str.contains('TRN'))
-    ].copy()
+    decoded = decode_technology(df['TECHNOLOGY'])
+    keep = ((decoded['SECTOR'] == 'PWR') & ~decoded['TRN']).to_numpy()
     
-    df['TECH'] = df['TECHNOLOGY'].str[3:6]
+    spatial = 'NODE' if node else 'COUNTRY'
     
-    if not node:
-        df['COUNTRY'] = df['TECHNOLOGY'].str[6:9]
-        df = df.groupby(['TECH', 'COUNTRY', 'YEAR'])[
-            'VALUE'].sum().reset_index(drop = False)
-        
-    else:
-        df['NODE'] = df['TECHNOLOGY'].str[6:11]
-        df = df.groupby(['TECH', 'NODE', 'YEAR'])[
-            'VALUE'].sum().reset_index(drop = False)
+    df = pd.DataFrame({'TECH' : decoded['TECH'][keep], 
+                       spatial : decoded[spatial][keep],
+                       'YEAR' : df['YEAR'][keep], 
+                       'VALUE' : df['VALUE'][keep]})
+
+    df = df.groupby(['TECH', spatial, 'YEAR'], observed = True)[
+        'VALUE'].sum().reset_index(drop = False)
     
     return df
 
 def get_node_list(df):
     df = df.loc[(df['TECHNOLOGY'].str.startswith('PWR'))
-                ].replace({'01' : ''}, regex = True)
+                ]['TECHNOLOGY'].astype(str).str.replace('01', '')
     
-    df = sorted(list(df['TECHNOLOGY'].str.strip().str[-5:].unique()))
+    df = sorted(list(df.str.strip().str[-5:].unique()))
     
     return df
 
@@ -63,21 +95,40 @@ def calculate_power_costs(df1, df2, storage_list):
     return df2
     
 
+def display_nodes(node, prefixes):
+    '''Map a NODE column to the nodes shown in the nodal charts: nodes that 
+    start with one of prefixes (nodal_results of a scenario, e.g. ['IDN']) 
+    are kept, all others become their country (e.g. MYSPE -> MYSXX). The 
+    lookup is built once over the unique nodes and applied through the 
+    category codes, node itself is not modified.'''
+    if isinstance(node.dtype, pd.CategoricalDtype):
+        codes = node.cat.codes.to_numpy()
+        uniques = node.cat.categories.astype(str)
+    else:
+        codes, uniques = pd.factorize(node.astype(str))
+    
+    keep = uniques.str.startswith(tuple(prefixes))
+    lookup = np.where(keep, uniques, uniques.str[:3] + 'XX')
+    
+    display, display_codes = np.unique(lookup, return_inverse = True)
+    display_codes = np.append(display_codes, -1)[codes]
+    
+    return pd.Series(pd.Categorical.from_codes(display_codes, display), 
+                     index = node.index, name = node.name)
+
 def calculate_results_delta(df1, df2, cols : list, scenario, 
                             nodal_results,  node : bool):
 
     if node:
         '''Only keep nodal level values for required countries.'''
-        for df in [df1, df2]:
-            data = df.loc[~df['NODE'].str.startswith(
-                tuple(nodal_results.get(scenario)))]
-            data.loc[:, 'NODE'] = data['NODE'].str[:3] + 'XX'
-            df.update(data)
+        prefixes = nodal_results.get(scenario)
+        df1 = df1.assign(NODE = display_nodes(df1['NODE'], prefixes))
+        df2 = df2.assign(NODE = display_nodes(df2['NODE'], prefixes))
     
-    df1 = df1.groupby(cols)['VALUE'].sum().reset_index(
+    df1 = df1.groupby(cols, observed = True)['VALUE'].sum().reset_index(
         drop = False).set_index(cols).rename(columns = {'VALUE' : 'Base'})
         
-    df2 = df2.groupby(cols)['VALUE'].sum().reset_index(
+    df2 = df2.groupby(cols, observed = True)['VALUE'].sum().reset_index(
         drop = False).set_index(cols).rename(columns = {'VALUE' : scenario})
 
     df = pd.merge(df1, df2, left_index = True, 
@@ -88,6 +139,66 @@ def calculate_results_delta(df1, df2, cols : list, scenario,
 
     return df
 
+def calculate_results_deltas(df1, df2_dict : dict, cols_list : list):
+    '''Deltas of several scenarios to the same base model, returned as
+    {scenario : {tuple(cols) : df}} for every cols in cols_list, each df as
+    returned by calculate_results_delta(df1, df2_dict[scenario], cols, ...)
+    without node.
+
+    The base model and all scenarios are stacked into one frame and summed
+    in a single groupby over the finest cols, with one column per scenario.
+    The other cols must be subsets of the finest and are summed from that
+    table instead of the raw data.'''
+    finest = list(max(cols_list, key = len))
+    for cols in cols_list:
+        if not set(cols) <= set(finest):
+            raise ValueError(f'{cols} is not a subset of {finest}')
+
+    frames = [df1] + list(df2_dict.values())
+    df = pd.concat([frame[finest + ['VALUE']] for frame in frames],
+                   keys = range(len(frames)), names = ['SCENARIO', None])
+    df = df.reset_index(level = 'SCENARIO')
+
+    # Categories differ between result sets, concat falls back to object.
+    for col in finest:
+        if any(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            df[col] = df[col].astype('category')
+
+    finest_sums = df.groupby(finest + ['SCENARIO'], observed = True)[
+        'VALUE'].sum().unstack('SCENARIO')
+
+    deltas = {scenario : {} for scenario in df2_dict}
+    for cols in cols_list:
+        if list(cols) == finest:
+            sums = finest_sums
+        else:
+            sums = finest_sums.groupby(level = list(cols), observed = True).sum()
+
+        for i, scenario in enumerate(df2_dict, start = 1):
+            df = sums.reindex(columns = [0, i]).dropna(how = 'all').fillna(0)
+            df.columns = ['Base', scenario]
+
+            df['DELTA'] = round(df[scenario] - df['Base'], 2)
+            deltas[scenario][tuple(cols)] = df.loc[df['DELTA'] != 0]
+
+    return deltas
+
+def calculate_nodal_deltas(df1, df2_dict : dict, cols_list : list, 
+                           nodal_results):
+    '''As calculate_results_deltas for nodal tables, with the NODE codes of 
+    the base model and every scenario mapped by display_nodes for the 
+    nodal_results of that scenario. df1 is shared by all scenarios and is 
+    not modified.'''
+    deltas = {}
+    for scenario, df2 in df2_dict.items():
+        prefixes = nodal_results.get(scenario)
+        deltas.update(calculate_results_deltas(
+            df1.assign(NODE = display_nodes(df1['NODE'], prefixes)),
+            {scenario : df2.assign(NODE = display_nodes(df2['NODE'], prefixes))},
+            cols_list))
+
+    return deltas
+
 def geo_filter_tech_emissions(df, scenario):
     
     geo1, geo2 = scenario[:5], scenario[5:]
@@ -99,6 +210,22 @@ def geo_filter_tech_emissions(df, scenario):
     
     return df[['REGION', 'EMISSION', 'YEAR', 'VALUE']]
 
+def pivot_by_country(df, columns = 'TECH', index = 'YEAR'):
+    '''Sum VALUE by COUNTRY, index and columns in a single groupby and split 
+    the result into a dict of country : frame (index x columns). All frames 
+    share the same columns, a column is all NaN for countries without rows
+    for it.'''
+    df = df.groupby(['COUNTRY', index, columns], observed = True)['VALUE'].sum().unstack(columns)
+
+    return {country : frame.droplevel('COUNTRY') 
+            for country, frame in df.groupby(level = 'COUNTRY', observed = True)}
+
+def split_by_country(df, columns : list, index = 'YEAR'):
+    '''Split df into a dict of country : df[columns] indexed by index, in a 
+    single groupby.'''
+    return {country : frame.set_index(index)[columns]
+            for country, frame in df.groupby('COUNTRY', observed = True)}
+
 def make_space_above(axes, topmargin=1):
     """ increase figure size to make topmargin (in inches) space for 
         titles, without changing the axes sizes"""